@@ -0,0 +1,98 @@
+"""Blocking I/O in a bounded thread pool
+
+API handlers are coroutines on a single event loop so a slow file
+system read or database query stalls every request and websocket in
+the process. `run` calls a blocking function in a thread pool and
+awaits its result.
+
+The function may use the quest, because the handler awaits the
+result before using the quest again. Do not use `run` for functions
+which share state with other coroutines without synchronization.
+
+`start_loop_lag_monitor` records how late the event loop runs a
+periodic callback in the metric ``event_loop.lag``.
+
+:copyright: Copyright (c) 2026 RadiaSoft LLC.  All Rights Reserved.
+:license: http://www.apache.org/licenses/LICENSE-2.0.html
+"""
+
+from pykern import pkconfig
+from pykern.pkcollections import PKDict
+from pykern.pkdebug import pkdc, pkdexc, pkdlog, pkdp
+import asyncio
+import concurrent.futures
+import contextvars
+import functools
+import sirepo.metrics
+import tornado.ioloop
+
+_cfg = None
+
+_executor = None
+
+_lag_monitor = False
+
+
+async def run(func, *args, **kwargs):
+    """Call `func` in the thread pool
+
+    Args:
+        func (callable): blocking function
+        args (list): passed to `func`
+        kwargs (dict): passed to `func`
+    Returns:
+        object: result of `func` (or raises its exception)
+    """
+    global _executor
+
+    if _executor is None:
+        _executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=_cfg.max_threads,
+            thread_name_prefix="sirepo_io",
+        )
+    return await asyncio.get_running_loop().run_in_executor(
+        _executor,
+        functools.partial(contextvars.copy_context().run, func, *args, **kwargs),
+    )
+
+
+def start_loop_lag_monitor():
+    """Record lag of the current IOLoop every ``loop_lag_secs``"""
+    global _lag_monitor
+
+    if _lag_monitor or not _cfg.loop_lag_secs:
+        return
+    _lag_monitor = True
+    _lag_schedule(tornado.ioloop.IOLoop.current())
+
+
+def _init():
+    global _cfg
+
+    _cfg = pkconfig.init(
+        loop_lag_secs=(
+            1.0,
+            float,
+            "how often to measure event loop lag (0 is never)",
+        ),
+        max_threads=(
+            8,
+            pkconfig.parse_positive_int,
+            "threads for blocking I/O in the server",
+        ),
+    )
+
+
+def _lag_check(loop, expect):
+    l = max(0.0, loop.time() - expect)
+    sirepo.metrics.timing("event_loop.lag", l)
+    sirepo.metrics.gauge("event_loop.lag_secs", l)
+    _lag_schedule(loop)
+
+
+def _lag_schedule(loop):
+    t = loop.time() + _cfg.loop_lag_secs
+    loop.call_at(t, _lag_check, loop, t)
+
+
+_init()
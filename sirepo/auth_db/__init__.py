@@ -9,6 +9,7 @@ from pykern.pkdebug import pkdc, pkdexc, pkdlog, pkdp
 import functools
 import importlib
 import inspect
+import os
 import pykern.pkconfig
 import pykern.pkinspect
 import sirepo.quest
@@ -140,6 +141,8 @@ def init_module():
         # echo=True,
         # echo_pool=True,
     )
+    # Connections must not be shared with forked servers (see uri_router)
+    os.register_at_fork(after_in_child=lambda: _engine.dispose(close=False))
 
 
 def init_quest(qcall):
@@ -162,6 +165,7 @@ def primary_key_column(prefix):
 class _AuthDb(sirepo.quest.Attr):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
+        self._end_callbacks = PKDict()
         self._orm_session = None
 
     def add_column_if_not_exists(self, model, column, column_type):
@@ -182,6 +186,20 @@ class _AuthDb(sirepo.quest.Attr):
     def all_uids(self):
         return list(self.model("UserRegistration").search_all_for_column("uid"))
 
+    def call_at_end(self, key, func):
+        """Call `func` after the current transaction commits or rolls back
+
+        Args:
+            key (hashable): only one `func` per key is called
+            func (callable): called with no arguments
+        Returns:
+            bool: True if `key` was not already registered
+        """
+        if key in self._end_callbacks:
+            return False
+        self._end_callbacks[key] = func
+        return True
+
     def commit(self):
         self._commit_or_rollback(commit=True)
 
@@ -258,11 +276,17 @@ class _AuthDb(sirepo.quest.Attr):
             return
         s = self._orm_session
         self._orm_session = None
-        if commit:
-            s.commit()
-        else:
-            s.rollback()
-        s.close()
+        try:
+            if commit:
+                s.commit()
+            else:
+                s.rollback()
+            s.close()
+        finally:
+            c = self._end_callbacks
+            self._end_callbacks = PKDict()
+            for f in c.values():
+                f()
 
     def init_quest_for_child(self, *args, **kwargs):
         # TODO(robnagler): Consider nested transactions
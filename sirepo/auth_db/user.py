@@ -6,11 +6,21 @@
 
 from pykern.pkcollections import PKDict
 from pykern.pkdebug import pkdc, pkdlog, pkdp
+import collections
+import os
+import pykern.pkconfig
 import sirepo.auth_db
 import sirepo.auth_role
+import sirepo.metrics
 import sirepo.srtime
 import sirepo.util
 import sqlalchemy
+import time
+
+_cfg = None
+
+#: see `_RoleCache`
+_role_cache = None
 
 
 class UserRegistration(sirepo.auth_db.UserDbBase):
@@ -63,6 +73,7 @@ class UserRole(sirepo.auth_db.UserDbBase):
                 self.set_role_expiration(r, uid, expiration)
             else:
                 self.new(uid=uid, role=r, expiration=expiration).save()
+        self._role_cache_clear(uid)
         sim_data.audit_proprietary_lib_files(qcall=self.auth_db.qcall, uid=uid)
 
     def delete_roles(self, roles, uid):
@@ -78,35 +89,34 @@ class UserRole(sirepo.auth_db.UserDbBase):
                 cls.role.in_(roles),
             )
         )
+        self._role_cache_clear(uid)
         sim_data.audit_proprietary_lib_files(qcall=self.auth_db.qcall, uid=uid)
 
     def expire_role(self, role, uid):
         self.set_role_expiration(role, uid, sirepo.srtime.utc_now())
 
     def get_roles(self, uid):
-        return self.search_all_for_column("role", uid=uid)
+        return [r.role for r in self._cached_roles(uid)]
 
     def get_roles_and_expiration(self, uid):
-        return [
-            PKDict(role=r.role, expiration=r.expiration)
-            for r in self.query().filter_by(uid=uid)
-        ]
+        return [r.copy() for r in self._cached_roles(uid)]
 
     def has_active_plan(self, uid):
         return bool(self.unchecked_active_plan(uid))
 
     def has_active_role(self, role, uid):
-        r = self._has_role(role, uid)
+        r = self._cached_role(role, uid)
         return r and not self._is_expired_role(r)
 
     def has_expired_role(self, role, uid):
-        r = self._has_role(role, uid)
+        r = self._cached_role(role, uid)
         return r and self._is_expired_role(r)
 
     def set_role_expiration(self, role, uid, expiration):
         r = self.search_by(uid=uid, role=role)
         r.expiration = expiration
         r.save()
+        self._role_cache_clear(uid)
 
     def uids_of_paid_users(self):
         return self.uids_with_roles(sirepo.auth_role.PLAN_ROLES_PAID)
@@ -127,18 +137,26 @@ class UserRole(sirepo.auth_db.UserDbBase):
         ]
 
     def unchecked_active_plan(self, uid):
-        cls = self.__class__
-        return (
-            self.query()
-            .filter(
-                cls.role.in_(sirepo.auth_role.PLAN_ROLES),
-                cls.uid == uid,
-                sqlalchemy.or_(
-                    cls.expiration.is_(None),
-                    cls.expiration > sirepo.srtime.utc_now(),
-                ),
-            )
-            .first()
+        for r in self._cached_roles(uid):
+            if r.role in sirepo.auth_role.PLAN_ROLES and not self._is_expired_role(r):
+                return r.copy()
+        return None
+
+    def _cached_role(self, role, uid):
+        # role may be a tuple of alternatives (see auth.is_premium_user)
+        x = role if isinstance(role, tuple) else (role,)
+        for r in self._cached_roles(uid):
+            if r.role in x:
+                return r
+        return None
+
+    def _cached_roles(self, uid):
+        return _role_cache.get(
+            uid,
+            lambda: [
+                PKDict(role=r.role, expiration=r.expiration)
+                for r in self.query().filter_by(uid=uid).order_by(self.__class__.role)
+            ],
         )
 
     def _has_role(self, role, uid):
@@ -149,6 +167,14 @@ class UserRole(sirepo.auth_db.UserDbBase):
             role_record.expiration and role_record.expiration < sirepo.srtime.utc_now()
         )
 
+    def _role_cache_clear(self, uid):
+        if self.auth_db.call_at_end(
+            (self.__class__.__name__, uid),
+            lambda: _role_cache.end_write(uid),
+        ):
+            _role_cache.begin_write(uid)
+        _role_cache.clear(uid)
+
 
 class UserRoleModeration(sirepo.auth_db.UserDbBase):
     __tablename__ = "user_role_moderation_t"
@@ -194,3 +220,84 @@ class UserRoleModeration(sirepo.auth_db.UserDbBase):
         if moderator_uid:
             s.moderator_uid = moderator_uid
         s.save()
+
+
+class _RoleCache:
+    """Roles and expirations of recently used uids
+
+    Expirations are checked when the roles are used so entries are
+    valid until another process changes the database, which is
+    detected by a change in the database file's mtime or size. Roles
+    of a uid are not cached while a transaction in this process is
+    modifying them.
+    """
+
+    def __init__(self):
+        self._db_path = None
+        self._values = sirepo.util.LRU(_cfg.role_cache_max)
+        self._writers = collections.Counter()
+
+    def begin_write(self, uid):
+        self._writers[uid] += 1
+
+    def clear(self, uid):
+        self._values.pop(uid)
+
+    def end_write(self, uid):
+        self._writers[uid] -= 1
+        if self._writers[uid] <= 0:
+            del self._writers[uid]
+        self.clear(uid)
+
+    def get(self, uid, query):
+        """Cached roles for `uid` or result of `query`
+
+        Args:
+            uid (str): user
+            query (callable): returns roles from the database
+        Returns:
+            list: PKDict(role, expiration); must not be modified
+        """
+        if uid in self._writers or _cfg.role_cache_secs <= 0:
+            return query()
+        # stat before query so a concurrent commit invalidates the entry
+        s = self._db_stat()
+        t = time.monotonic()
+        if (r := self._values.get(uid)) and r.db_stat == s and r.expiry > t:
+            sirepo.metrics.inc("role_cache.hit")
+            return r.roles
+        sirepo.metrics.inc("role_cache.miss")
+        return self._values.set(
+            uid,
+            PKDict(db_stat=s, expiry=t + _cfg.role_cache_secs, roles=query()),
+        ).roles
+
+    def _db_stat(self):
+        if self._db_path is None:
+            self._db_path = str(sirepo.auth_db.db_filename())
+        try:
+            s = os.stat(self._db_path)
+        except FileNotFoundError:
+            return None
+        return (s.st_mtime_ns, s.st_size)
+
+
+def _init():
+    global _cfg, _role_cache
+
+    _cfg = pykern.pkconfig.init(
+        role_cache_max=(
+            10000,
+            pykern.pkconfig.parse_positive_int,
+            "number of uids whose roles are cached",
+        ),
+        role_cache_secs=(
+            300,
+            int,
+            "seconds roles are cached per process (0 disables)",
+        ),
+    )
+    _role_cache = _RoleCache()
+
+
+_init()
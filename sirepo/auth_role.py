@@ -6,7 +6,6 @@
 
 from pykern import pkconfig
 from pykern import pkinspect
-from pykern import pkunit
 from pykern.pkdebug import pkdp
 import aenum
 import sirepo.feature_config
@@ -55,6 +54,7 @@ def for_moderated_sim_types():
 
 
 def for_new_user(auth_method):
+    from pykern import pkunit
     from sirepo import auth
 
     if pkconfig.in_dev_mode:
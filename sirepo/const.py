@@ -44,6 +44,7 @@ SCHEMA_COMMON = PKDict(
             asyncMsg=4,
         ),
         method=PKDict(
+            runStatusUpdate="runStatusUpdate",
             setCookies="setCookies",
         ),
         version=1,
@@ -265,6 +265,11 @@ def _init():
             bool,
             "Trust Bash env to run Python and agents",
         ),
+        typed_array_frames=(
+            False,
+            bool,
+            "send large plot arrays as typed arrays to clients which request them",
+        ),
         ui_websocket=(
             True,
             bool,
@@ -194,7 +194,6 @@ def agent_cmd_stdin_env(cmd, env, uid, cwd=".", source_bashrc=""):
     Returns:
         tuple: new cmd (tuple), stdin (file), env (PKDict or None)
     """
-    import os
     import tempfile
 
     if sirepo.feature_config.cfg().trust_sh_env:
@@ -218,13 +217,25 @@ cd '{}'
         ).encode()
     )
     t.seek(0)
+    c, e = agent_cmd_shell()
+    return c, t, e
+
+
+def agent_cmd_shell():
+    """Shell which runs the script from `agent_cmd_stdin_env`
+
+    Returns:
+        tuple: cmd (tuple) and env (PKDict or None)
+    """
+    import os
+
     if sirepo.feature_config.cfg().trust_sh_env:
         # Trust the local environment
-        return ("bash", t, None)
+        return ("bash",), None
     # it's reasonable to hardwire this path, even though we don't
     # do that with others. We want to make sure the subprocess starts
     # with a clean environment (no $PATH). You have to pass HOME.
-    return ("/bin/bash", "-l"), t, PKDict(HOME=os.environ["HOME"])
+    return ("/bin/bash", "-l"), PKDict(HOME=os.environ["HOME"])
 
 
 def agent_env(uid, env=None):
@@ -268,6 +279,10 @@ def agent_env(uid, env=None):
         .pksetdefault(
             PYTHONUNBUFFERED="1",
             SIREPO_AUTH_LOGGED_IN_USER=uid,
+            SIREPO_JOB_FASTCGI_MAX_REQUESTS=_cfg.fastcgi_max_requests,
+            SIREPO_JOB_FASTCGI_MAX_RSS_GROWTH=_cfg.fastcgi_max_rss_growth,
+            SIREPO_JOB_FASTCGI_MSGPACK=_cfg.fastcgi_msgpack,
+            SIREPO_JOB_FASTCGI_WORKERS=_cfg.fastcgi_workers,
             SIREPO_JOB_MAX_MESSAGE_BYTES=_cfg.max_message_bytes,
             SIREPO_JOB_PING_INTERVAL_SECS=_cfg.ping_interval_secs,
             SIREPO_JOB_PING_TIMEOUT_SECS=_cfg.ping_timeout_secs,
@@ -301,6 +316,26 @@ def init_module():
     if _cfg:
         return _cfg
     _cfg = pkconfig.init(
+        fastcgi_max_requests=(
+            1000,
+            int,
+            "replace a job_cmd fastcgi worker after this many requests (0 is never)",
+        ),
+        fastcgi_max_rss_growth=(
+            int(1e9),
+            pkconfig.parse_bytes,
+            "replace a job_cmd fastcgi worker when its memory grows by this much (0 is never)",
+        ),
+        fastcgi_msgpack=(
+            False,
+            bool,
+            "use msgpack for job_cmd fastcgi messages (see sirepo.job_frame)",
+        ),
+        fastcgi_workers=(
+            1,
+            pkconfig.parse_positive_int,
+            "job_cmd fastcgi processes per agent serving analysis and io ops concurrently",
+        ),
         max_message_bytes=(
             int(2e8),
             pkconfig.parse_bytes,
@@ -9,21 +9,27 @@ from pykern.pkcollections import PKDict
 from pykern.pkdebug import pkdc, pkdexc, pkdlog, pkdp, pkdpretty, pkdformat
 from sirepo import simulation_db
 from sirepo.template import template_common
+import aiohttp
 import asyncio
 import contextlib
 import inspect
 import pykern.pkconfig
 import pykern.pkio
 import re
+import sirepo.async_io
 import sirepo.auth
+import sirepo.const
 import sirepo.feature_config
 import sirepo.job
+import sirepo.metrics
 import sirepo.quest
+import sirepo.reply
+import sirepo.result_cache
 import sirepo.sim_data
 import sirepo.sim_run
 import sirepo.uri_router
 import sirepo.util
-import tornado.httpclient
+import time
 
 
 #: how many call frames to search backwards to find the api_.* caller
@@ -34,10 +40,20 @@ _MUST_HAVE_METHOD = ("api_analysisJob", "api_statefulCompute", "api_statelessCom
 _JSON_TYPE = re.compile(f"^{pkjson.MIME_TYPE}")
 
 _HTTP_CLIENT_CONNECTION_ERRORS = (
-    tornado.httpclient.HTTPClientError,
+    aiohttp.ClientError,
+    asyncio.TimeoutError,
     ConnectionRefusedError,
 )
 
+_CONNECT_TIMEOUT_SECS = 60
+
+_READ_CHUNK_BYTES = 1 << 16
+
+#: Shared by all requests to the supervisor by purpose (see `_http_session`)
+_sessions = PKDict()
+
+_session_loop = None
+
 
 class API(sirepo.quest.API):
     @sirepo.quest.Spec("internal_test", days="TimeDeltaDays")
@@ -164,6 +180,7 @@ class API(sirepo.quest.API):
             k = sirepo.util.unique_key()
             r = await self._request_api(
                 _request_content=PKDict(ping=k),
+                _request_timeout=_cfg.ping_timeout_secs,
                 _request_uri=self._supervisor_uri(sirepo.job.SERVER_PING_URI),
             )
             if r.get("state") != "ok":
@@ -201,16 +218,53 @@ class API(sirepo.quest.API):
 
     @sirepo.quest.Spec("require_plan")
     async def api_runSimulation(self):
-        return await self._request_api(_request_content=self._request_content(PKDict()))
+        c = await sirepo.async_io.run(self._request_content, PKDict())
+        if r := await sirepo.async_io.run(sirepo.result_cache.get, c, qcall=self):
+            return r
+        return sirepo.result_cache.put(await self._request_api(_request_content=c))
 
     @sirepo.quest.Spec("require_plan")
     async def api_runStatus(self):
         # runStatus receives models when an animation status if first queried
-        return await self._request_api(_request_content=self._request_content(PKDict()))
+        return sirepo.result_cache.put(
+            await self._request_api(
+                _request_content=await sirepo.async_io.run(
+                    self._request_content, PKDict()
+                ),
+            ),
+        )
+
+    @sirepo.quest.Spec("require_plan")
+    async def api_runStatusSubscribe(self):
+        """Reply with status and push changes until the job exits
+
+        Only websocket clients receive pushes. Others (and jobs which
+        are not running or pending) get the same reply as runStatus.
+        """
+        c = await sirepo.async_io.run(self._request_content, PKDict())
+        r = sirepo.result_cache.put(
+            await self._request_api(api_name="api_runStatus", _request_content=c),
+        )
+        h = self.sreq.websocket_handler()
+        if not h or r.get("state") not in (sirepo.job.RUNNING, sirepo.job.PENDING):
+            return r
+        i = sirepo.util.random_base62()
+        # POSIT: reply is for jid so subscribing again replaces the push
+        h.sr_create_task(
+            f"runStatus {c.computeJid}",
+            _run_status_push(c.pkupdate(api="api_runStatusWait"), h, i, PKDict(r)),
+        )
+        return r.pkupdate(
+            runStatusSubscription=PKDict(
+                id=i,
+                fallbackSeconds=_cfg.run_status_subscribe_fallback_secs,
+            ),
+        )
 
     @sirepo.quest.Spec("require_plan")
     async def api_sbatchLogin(self):
-        r = self._request_content(
+        r = await sirepo.async_io.run(
+            self._request_content,
             PKDict(computeJobHash="unused", jobRunMode=sirepo.job.SBATCH),
         )
         # SECURITY: Don't include credentials so the agent can't see them.
@@ -223,13 +277,18 @@ class API(sirepo.quest.API):
         if sirepo.job.SBATCH not in simulation_db.JOB_RUN_MODE_MAP:
             raise AssertionError(f"{sirepo.job.SBATCH} jobRunMode is not enabled")
         return await self._request_api(
-            _request_content=self._request_content(
+            _request_content=await sirepo.async_io.run(
+                self._request_content,
                 PKDict(computeJobHash="unused", jobRunMode=sirepo.job.SBATCH),
             )
         )
 
-    @sirepo.quest.Spec("require_plan", frame_id="SimFrameId")
-    async def api_simulationFrame(self, frame_id):
+    @sirepo.quest.Spec(
+        "require_plan",
+        frame_id="SimFrameId",
+        typed_arrays="Bool optional",
+    )
+    async def api_simulationFrame(self, frame_id, typed_arrays=None):
         return await template_common.sim_frame(
             frame_id,
             lambda a: self._request_api(
@@ -237,7 +296,10 @@ class API(sirepo.quest.API):
                 # simulation frames are always sequential requests even though
                 # the report name has 'animation' in it.
                 isParallel=False,
-                req_data=PKDict(**a),
+                # client decodes typed arrays (see job_cmd)
+                req_data=PKDict(
+                    **a, typedArrays=pykern.pkconfig.parse_bool(typed_arrays)
+                ),
             ),
             self,
         )
@@ -275,18 +337,19 @@ class API(sirepo.quest.API):
                     "{}: max frame search depth reached".format(f.f_code)
                 )
 
-        def _args(kwargs):
+        async def _args(kwargs):
             res = PKDict()
             k = PKDict(kwargs)
             res.uri = k.pkdel("_request_uri") or self._supervisor_uri(
                 sirepo.job.SERVER_URI
             )
             res.ignore_reply = k.pkdel("_ignore_reply")
+            res.timeout = k.pkdel("_request_timeout") or _cfg.request_timeout_secs
             res.api = _api_name(k.pkdel("api_name"))
             c = (
                 k.pkdel("_request_content")
                 if "_request_content" in k
-                else self._request_content(k)
+                else await sirepo.async_io.run(self._request_content, k)
             )
             c.pkupdate(
                 api=res.api,
@@ -302,31 +365,13 @@ class API(sirepo.quest.API):
             res.content = c
             return res
 
-        a = _args(kwargs)
+        a = await _args(kwargs)
         with self._reply_maybe_file(a.content) as d:
-            r = tornado.httpclient.AsyncHTTPClient(
-                max_buffer_size=sirepo.job.cfg().max_message_bytes,
-                force_instance=True,
-            ).fetch(
-                tornado.httpclient.HTTPRequest(
-                    body=pkjson.dump_bytes(a.content),
-                    connect_timeout=60,
-                    headers=PKDict({"Content-type": pkjson.MIME_TYPE}),
-                    method="POST",
-                    request_timeout=0,
-                    url=a.uri,
-                    validate_cert=sirepo.job.cfg().verify_tls,
-                ),
-            )
+            r = _post(a)
             if a.ignore_reply:
                 asyncio.ensure_future(r)
                 return self.reply_ok()
-            r = await r
-            if not _JSON_TYPE.search(r.headers["content-type"]):
-                raise AssertionError(
-                    f"expected json content-type={r.headers['content-type']}"
-                )
-            j = pkjson.load_any(r.body)
+            j = await r
             if d and (
                 sirepo.job.is_ok_reply(j) or j.get("state") == sirepo.job.COMPLETED
             ):
@@ -478,6 +523,128 @@ class API(sirepo.quest.API):
         return _cfg.supervisor_uri + path
 
 
+def _http_session(is_wait=False):
+    """Pooled keep-alive connections to the supervisor
+
+    A new client per request meant a new connection for every
+    runStatus poll. The session is created lazily, because it must be
+    bound to the running loop.
+
+    runStatusWait requests are held by the supervisor until the
+    job's status changes so they have their own session. Otherwise,
+    ``max_connections`` subscriptions would block all other requests.
+
+    Args:
+        is_wait (bool): session for long polls [False]
+    Returns:
+        aiohttp.ClientSession: shared session
+    """
+    global _session_loop
+
+    x = asyncio.get_running_loop()
+    # pkcli and tests may run more than one loop
+    if _session_loop is not x:
+        _sessions_close()
+        _session_loop = x
+    k = "wait" if is_wait else "request"
+    rv = _sessions.get(k)
+    if rv is None or rv.closed:
+        rv = _sessions[k] = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(
+                keepalive_timeout=_cfg.keepalive_secs,
+                limit=_cfg.max_wait_connections if is_wait else _cfg.max_connections,
+                ssl=sirepo.job.cfg().verify_tls,
+            ),
+        )
+    return rv
+
+
+async def _post(args):
+    s = time.perf_counter()
+    async with _http_session(args.get("is_wait", False)).post(
+        args.uri,
+        data=pkjson.dump_bytes(args.content),
+        headers=PKDict({"Content-type": pkjson.MIME_TYPE}),
+        raise_for_status=True,
+        timeout=aiohttp.ClientTimeout(
+            total=args.timeout or None,
+            sock_connect=_CONNECT_TIMEOUT_SECS,
+        ),
+    ) as r:
+        m = sirepo.job.cfg().max_message_bytes
+        if r.content_length is not None and r.content_length > m:
+            raise AssertionError(f"reply content-length={r.content_length} too large")
+        t = r.headers.get("content-type", "")
+        # content_length is not set when the reply is chunked
+        b = bytearray()
+        async for x in r.content.iter_chunked(_READ_CHUNK_BYTES):
+            b.extend(x)
+            if len(b) > m:
+                raise AssertionError(f"reply length={len(b)} exceeds max={m}")
+    sirepo.metrics.timing(f"job_api.{args.api}", time.perf_counter() - s)
+    if not _JSON_TYPE.search(t):
+        raise AssertionError(f"expected json content-type={t}")
+    return pkjson.load_any(b)
+
+
+def _sessions_close():
+    """Close `_sessions`, which were created on another loop
+
+    A session can only be closed on its own loop. If that loop is
+    not running, the transports cannot be closed, so the connector is
+    detached and the sockets are released when collected.
+    """
+    for s in _sessions.values():
+        if s.closed:
+            continue
+        if _session_loop.is_running():
+            asyncio.run_coroutine_threadsafe(s.close(), _session_loop)
+        else:
+            s.detach()
+    _sessions.clear()
+
+
+async def _run_status_push(content, handler, subscription_id, prev):
+    """Push status deltas to `handler` until job is no longer running
+
+    The supervisor holds each request until the job's status changes
+    (or it times out), which replaces a poll per client per
+    nextRequestSeconds with one request per change.
+    """
+    a = PKDict(
+        api=content.api,
+        content=content,
+        is_wait=True,
+        timeout=0,
+        uri=_cfg.supervisor_uri + sirepo.job.SERVER_URI,
+    )
+    try:
+        while True:
+            content.statusSerial = prev.pkdel("statusSerial")
+            r = sirepo.result_cache.put(await _post(a))
+            u = PKDict({k: v for k, v in r.items() if prev.get(k) != v})
+            u.pkdel("statusSerial")
+            x = [k for k in prev if k not in r]
+            if u or x:
+                sirepo.metrics.inc("job_api.run_status_push")
+                await sirepo.reply.websocket_async_msg(
+                    handler,
+                    sirepo.const.SCHEMA_COMMON.websocketMsg.method.runStatusUpdate,
+                    PKDict(subscriptionId=subscription_id, changed=u, removed=x),
+                )
+            if r.get("state") not in (sirepo.job.RUNNING, sirepo.job.PENDING):
+                return
+            prev = r
+    except Exception as e:
+        # Socket closed or supervisor went away; client falls back to polling
+        pkdlog(
+            "subscription={} jid={} error={}",
+            subscription_id,
+            content.computeJid,
+            e,
+        )
+
+
 def init_apis(*args, **kwargs):
     # TODO(robnagler) if we recover connections with agents and running jobs remove this
     pykern.pkio.unchecked_remove(sirepo.job.DATA_FILE_ROOT)
@@ -485,5 +652,27 @@ def init_apis(*args, **kwargs):
 
 
 _cfg = pykern.pkconfig.init(
+    keepalive_secs=(60, int, "how long idle connections to the supervisor are kept"),
+    max_connections=(
+        100,
+        pykern.pkconfig.parse_positive_int,
+        "concurrent connections to the supervisor (requests beyond this wait)",
+    ),
+    max_wait_connections=(
+        1000,
+        pykern.pkconfig.parse_positive_int,
+        "concurrent runStatusWait long polls, which do not count against max_connections",
+    ),
+    ping_timeout_secs=(10, int, "max time for a supervisor ping"),
+    request_timeout_secs=(
+        0,
+        int,
+        "max time for a supervisor request (0 is no limit, since runSimulation waits for sequential runs)",
+    ),
+    run_status_subscribe_fallback_secs=(
+        120,
+        pykern.pkconfig.parse_positive_int,
+        "how long a subscribed client waits for a push before subscribing again",
+    ),
     supervisor_uri=sirepo.job.DEFAULT_SUPERVISOR_URI_DECL,
 )
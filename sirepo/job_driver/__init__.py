@@ -17,10 +17,12 @@ import sirepo.const
 import sirepo.events
 import sirepo.feature_config
 import sirepo.global_resources
+import sirepo.metrics
 import sirepo.sim_db_file
 import sirepo.simulation_db
 import sirepo.tornado
 import sirepo.util
+import time
 import tornado.ioloop
 import tornado.locks
 
@@ -37,6 +39,9 @@ _DEFAULT_MODULE = "local"
 
 _cfg = None
 
+#: ops which found their agent parked (hit) or had to start one (miss)
+_reuse = PKDict(hit=0, miss=0)
+
 _UNTIMED_OPS = frozenset(
     (job.OP_ALIVE, job.OP_CANCEL, job.OP_ERROR, job.OP_KILL, job.OP_OK)
 )
@@ -70,15 +75,25 @@ class DriverBase(PKDict):
         super().__init__(
             driver_details=PKDict({"type": self.__class__.__name__}),
             kind=op.kind,
-            # TODO(robnagler) sbatch could override OP_RUN, but not OP_ANALYSIS
-            # because OP_ANALYSIS touches the directory sometimes. Reasonably
-            # there should only be one OP_ANALYSIS running on an agent at one time.
-            op_slot_q=PKDict({k: job_supervisor.SlotQueue() for k in job.SLOT_OPS}),
+            # TODO(robnagler) sbatch could override OP_RUN. OP_ANALYSIS and
+            # OP_IO run in the agent's job_cmd fastcgi workers, which the
+            # run_dir_slot keeps from touching the same directory.
+            op_slot_q=PKDict(
+                {
+                    k: job_supervisor.SlotQueue(
+                        1 if k == job.OP_RUN else job.cfg().fastcgi_workers,
+                    )
+                    for k in job.SLOT_OPS
+                }
+            ),
             uid=op.msg.uid,
             _agent_id=sirepo.util.unique_key(),
             _agent_life_change_lock=tornado.locks.Lock(),
+            _agent_start_time=None,
             _idle_timer=None,
+            _parked_at=None,
             _prepared_sends=PKDict(),
+            _preparing_sends=PKDict(),
             _websocket=None,
             _websocket_ready=sirepo.tornado.Event(),
             _websocket_ready_timeout=None,
@@ -102,20 +117,38 @@ class DriverBase(PKDict):
     def destroy_op(self, op):
         """Remove op from our list of sends"""
         self._prepared_sends.pkdel(op.op_id)
+        self._agent_park_if_idle()
 
-    async def free_resources(self, caller):
-        """Remove holds on all resources and remove self from data structures"""
+    async def free_resources(self, caller, if_idle=False):
+        """Remove holds on all resources and remove self from data structures
+
+        Args:
+            caller (str): for logging
+            if_idle (bool): only free if no ops are using the agent [False]
+        Returns:
+            bool: False if not idle so not freed
+        """
         try:
             async with self._agent_life_change_lock:
+                if if_idle and not self._agent_is_idle():
+                    pkdlog("{} caller={} not idle, not freeing", self, caller)
+                    return False
+                # New ops must start a new agent, which waits for the lock
+                self._websocket_ready.clear()
+                if self._websocket:
+                    # closed by the kill, which must not free the next agent
+                    self._websocket.sr_driver_set(None)
                 await self.kill()
                 self._websocket_ready_timeout_cancel()
-                self._websocket_ready.clear()
                 self._websocket_close()
+                self._parked_at = None
+                self._parked_gauge()
                 e = f"job_driver.free_resources caller={caller}"
                 for o in list(self._prepared_sends.values()):
                     o.destroy(internal_error=e)
         except Exception as e:
             pkdlog("{} caller={} error={} stack={}", self, caller, e, pkdexc())
+        return True
 
     async def kill(self):
         raise NotImplementedError(
@@ -148,18 +181,24 @@ class DriverBase(PKDict):
         # If the agent is not ready after awaiting on slots, we need
         # to recheck the agent, because agent can die (asynchronously) at any point
         # while waiting for slots.
-        if not await self._agent_ready(op):
-            return False
-        r = await self._slots_ready(op)
-        if r == job_supervisor.SlotAllocStatus.OP_IS_DESTROYED:
-            return False
-        if r == job_supervisor.SlotAllocStatus.HAD_TO_AWAIT:
+        # Not idle while preparing so the agent is not parked or collected
+        self._preparing_sends[op.op_id] = op
+        try:
             if not await self._agent_ready(op):
                 return False
-        elif r != job_supervisor.SlotAllocStatus.DID_NOT_AWAIT:
-            raise AssertionError(f"slots_ready invalid return={r}")
-        self._prepared_sends[op.op_id] = op
-        return True
+            r = await self._slots_ready(op)
+            if r == job_supervisor.SlotAllocStatus.OP_IS_DESTROYED:
+                return False
+            if r == job_supervisor.SlotAllocStatus.HAD_TO_AWAIT:
+                if not await self._agent_ready(op):
+                    return False
+            elif r != job_supervisor.SlotAllocStatus.DID_NOT_AWAIT:
+                raise AssertionError(f"slots_ready invalid return={r}")
+            self._prepared_sends[op.op_id] = op
+            return True
+        finally:
+            self._preparing_sends.pkdel(op.op_id)
+            self._agent_park_if_idle()
 
     def _mpi_cores(self, op, base):
         if op.msg.isParallel and (c := op.msg.get("parallelCores")):
@@ -232,6 +271,14 @@ class DriverBase(PKDict):
         except Exception as e:
             pkdlog("exception={} stack={}", e, pkdexc())
 
+    def _agent_alive_load(self, load):
+        """Load of the agent's host (see `sirepo.job_placement.live_load`)
+
+        Args:
+            load (PKDict): reported in ALIVE
+        """
+        pass
+
     def _agent_cmd_stdin_env(self, op, **kwargs):
         return job.agent_cmd_stdin_env(
             ("sirepo", "job_agent", "start"),
@@ -285,10 +332,32 @@ class DriverBase(PKDict):
         )
 
     def _agent_is_idle(self):
-        return not self._prepared_sends and not self._websocket_ready_timeout
+        return (
+            not self._prepared_sends
+            and not self._preparing_sends
+            and not self._websocket_ready_timeout
+        )
+
+    def _agent_park(self):
+        """Keep the idle agent for the user's next op
+
+        It is killed when it has been parked for ``idle_check_secs`` or
+        by `_parked_gc`.
+        """
+        if self._parked_at is None:
+            self._parked_at = time.monotonic()
+        self._parked_gauge()
+        self._parked_gc()
+
+    def _agent_park_if_idle(self):
+        if self._websocket_ready.is_set() and self._agent_is_idle():
+            self._agent_park()
 
     async def _agent_ready(self, op):
         if self._websocket_ready.is_set():
+            if self._parked_at is not None:
+                self._parked_at = None
+                _reuse_inc("hit")
             return True
         await self._agent_start(op)
         if op.is_destroyed:
@@ -363,7 +432,8 @@ class DriverBase(PKDict):
     def _agent_receive_alive(self, msg):
         """Receive an ALIVE message from our agent
 
-        Save the websocket and register self with the websocket
+        Save the websocket and register self with the websocket. Agents
+        resend ALIVE periodically with the load of their host.
         """
 
         def _ignore():
@@ -378,10 +448,17 @@ class DriverBase(PKDict):
             pkdlog("{} websocket already set but not ready", self)
             return False
 
+        if l := msg.content.get("load"):
+            self._agent_alive_load(l)
         self._websocket_ready_timeout_cancel()
         if self._websocket and _ignore():
             return
         self._websocket = msg.handler
+        if self._agent_start_time is not None:
+            sirepo.metrics.timing(
+                "agent.start", time.monotonic() - self._agent_start_time
+            )
+            self._agent_start_time = None
         self._websocket_ready.set()
         self._websocket.sr_driver_set(self)
         self._start_idle_timeout()
@@ -399,6 +476,9 @@ class DriverBase(PKDict):
                 if self.agent_is_ready_or_starting():
                     return
                 pkdlog("{} {} await=_do_agent_start", self, op)
+                _reuse_inc("miss")
+                self._agent_start_time = time.monotonic()
+                self._parked_gc()
                 # All awaits must be after this. If a call hangs the timeout
                 # handler will cancel this task
                 self._websocket_ready_timeout = (
@@ -479,25 +559,78 @@ class DriverBase(PKDict):
             "Waiting for CPU resources await=cpu_slot",
         )
 
-    def _start_free_resources(self, caller):
+    def _parked_gauge(self):
+        sirepo.metrics.gauge(
+            "agent.parked",
+            sum(1 for d in self.__instances.values() if d._parked_at is not None),
+        )
+
+    def _parked_gc(self):
+        """Kill least recently parked agents which share our cpu slots
+
+        Parked agents hold no slots so they only cost the processes
+        (or containers) they run. At most ``1 + parked_per_slot`` agents
+        per slot (running, starting, or parked) share a cpu slot queue.
+        Agents with ops, including ops waiting for a slot, are not
+        collected.
+        """
+        q = self.get("cpu_slot_q")
+        if q is None:
+            return
+        a = [
+            d
+            for d in self.__instances.values()
+            if d.get("cpu_slot_q") is q
+            and (d is self or d.agent_is_ready_or_starting())
+        ]
+        n = len(a) - int((1 + _cfg.parked_per_slot) * q.maxsize)
+        if n <= 0:
+            return
+        for d in sorted(
+            (d for d in a if d._parked_at is not None and d._agent_is_idle()),
+            key=lambda d: d._parked_at,
+        )[:n]:
+            pkdlog("{} parked_secs={}", d, int(time.monotonic() - d._parked_at))
+            d._parked_at = None
+            sirepo.metrics.inc("agent.parked_gc")
+            # an op may arrive before the free so only free if still idle
+            d._start_free_resources(caller="_parked_gc", if_idle=True)
+        self._parked_gauge()
+
+    def _start_free_resources(self, caller, if_idle=False):
         pkdlog("{} caller={}", self, caller)
-        tornado.ioloop.IOLoop.current().add_callback(self.free_resources, caller=caller)
+        tornado.ioloop.IOLoop.current().add_callback(
+            self.free_resources, caller=caller, if_idle=if_idle
+        )
 
-    def _start_idle_timeout(self):
+    def _start_idle_timeout(self, secs=None):
         async def _kill_if_idle():
             try:
                 self._idle_timer = None
-                if self._agent_is_idle():
-                    pkdlog("{}", self)
-                    self._start_free_resources(caller="_kill_if_idle")
-                else:
+                if not self.agent_is_ready_or_starting():
+                    # freed so nothing to park or kill
+                    return
+                if not self._agent_is_idle():
                     self._start_idle_timeout()
+                    return
+                if self._parked_at is None:
+                    self._agent_park()
+                    if self._parked_at is None:
+                        # killed by _parked_gc
+                        return
+                s = _cfg.idle_check_secs - (time.monotonic() - self._parked_at)
+                if s > 0:
+                    # recently parked so check when it expires
+                    self._start_idle_timeout(secs=s)
+                    return
+                pkdlog("{}", self)
+                self._start_free_resources(caller="_kill_if_idle", if_idle=True)
             except Exception as e:
                 pkdlog("{} error={} stack={}", self, e, pkdexc())
 
         if not self._idle_timer:
             self._idle_timer = tornado.ioloop.IOLoop.current().call_later(
-                _cfg.idle_check_secs,
+                _cfg.idle_check_secs if secs is None else secs,
                 _kill_if_idle,
             )
 
@@ -514,7 +647,12 @@ def init_module(**imports):
         idle_check_secs=(
             1800,
             pkconfig.parse_seconds,
-            "how many seconds to wait between checks",
+            "how long an idle agent is parked for reuse before it is killed",
+        ),
+        parked_per_slot=(
+            2.0,
+            float,
+            "idle agents parked for reuse per cpu slot in addition to the agent using the slot",
         ),
     )
     _CLASSES = PKDict()
@@ -529,3 +667,11 @@ def init_module(**imports):
 
 async def terminate():
     await DriverBase.terminate()
+
+
+def _reuse_inc(which):
+    _reuse[which] += 1
+    sirepo.metrics.inc(f"agent.reuse.{which}")
+    sirepo.metrics.gauge(
+        "agent.reuse.hit_rate", _reuse.hit / (_reuse.hit + _reuse.miss)
+    )
@@ -1,4 +1,16 @@
-"""TODO(e-carlin): Doc
+"""Runs agents in docker containers on one or more hosts
+
+Creating a container over TLS takes seconds, so the containers for
+the kinds a user has not used yet are created (not started) ahead of
+time on the user's host. The agent's environment, including tokens,
+is sent on stdin when the container is started, so a standby
+container only binds the user's directory. It has a unique name until
+it is claimed and renamed.
+
+The containers are created when the user's first driver on the host is
+created, which is usually for the ``begin_session`` op when the user
+first shows up. That op always misses, because the container of its
+kind has to exist right away.
 
 :copyright: Copyright (c) 2019 RadiaSoft LLC.  All Rights Reserved.
 :license: http://www.apache.org/licenses/LICENSE-2.0.html
@@ -14,9 +26,14 @@ import io
 import os
 import re
 import sirepo.const
+import sirepo.job_placement
+import sirepo.job_scheduler
+import sirepo.metrics
 import sirepo.util
 import subprocess
+import time
 import tornado.ioloop
+import tornado.locks
 import tornado.process
 
 #: prefix all container names. Full format looks like: srj-p-uid
@@ -39,6 +56,12 @@ _DOCKER_CMD_TIMEOUT = 10
 _DEFAULT_PLAN = "default"
 _ENTERPRISE_PLAN = sirepo.auth_role.ROLE_PLAN_ENTERPRISE
 
+#: label of containers created ahead of time, which are pruned on startup
+_STANDBY_LABEL = "sirepo.standby"
+
+#: part of the name of a container created ahead of time (see _standby_cname)
+_STANDBY_CNAME = "standby"
+
 # do not use a "name", but a uid, because /etc/password is image specific,
 # and we enforce uid's to be consistent in builds
 _PROCESS_USER_ID = os.getuid()
@@ -52,13 +75,9 @@ class DockerDriver(job_driver.DriverBase):
     __users = PKDict()
 
     def __init__(self, op, host):
-        def _cname_join():
-            # POSIT: matches _CNAME_RE
-            return _CNAME_SEP.join([_CNAME_PREFIX, self.kind[0], self.uid])
-
         super().__init__(op)
         self.update(
-            _cname=_cname_join(),
+            _cname=_cname(self.kind, self.uid),
             _user_dir=pkio.py_path(op.msg.userDir),
             host=host,
         )
@@ -74,9 +93,10 @@ class DockerDriver(job_driver.DriverBase):
 
     async def free_resources(self, *args, **kwargs):
         # TODO(robnagler) free_resources does the kill, which is problematic
-        await super().free_resources(*args, **kwargs)
+        if not await super().free_resources(*args, **kwargs):
+            return False
         if self.host is None:
-            return
+            return True
         try:
             h = self.host
             self.host = None
@@ -84,9 +104,12 @@ class DockerDriver(job_driver.DriverBase):
             self.__users[self.uid].pkdel(self.kind)
             if not self.__users[self.uid]:
                 self.__users.pkdel(self.uid)
+                for k in h.kinds.values():
+                    if x := k.standby.pkdel(self.uid):
+                        asyncio.create_task(_standby_remove(h, x))
         except Exception as e:
             pkdlog("{} error={} stack={}", self, e, pkdexc())
-        return
+        return True
 
     @classmethod
     def get_instance(cls, op):
@@ -110,9 +133,10 @@ class DockerDriver(job_driver.DriverBase):
             # jobs need to go to the same host to avoid NFS caching problems.
             h = list(u.values())[0].host
         else:
-            # least used host
-            h = min(_hosts(), key=lambda h: len(h.kinds[op.kind].instances))
-        return cls(op, h)
+            h = sirepo.job_placement.choose(_hosts(), op.kind)
+        rv = cls(op, h)
+        rv._standby_create_others()
+        return rv
 
     @classmethod
     def init_class(cls, job_supervisor):
@@ -188,12 +212,22 @@ class DockerDriver(job_driver.DriverBase):
             ),
             enterprise=_plan_cfg(_ENTERPRISE_PLAN),
             image=("radiasoft/sirepo", str, "docker image to run all jobs"),
+            load_report_secs=(
+                30,
+                pkconfig.parse_seconds,
+                "how often agents report host load for placement (0 only on connect)",
+            ),
             mpich_shm_clean_up=(False, bool, "mpich4 orphans shm; see sirepo#7741"),
             no_hdf5_do_mpi_file_sync=(
                 False,
                 bool,
                 "turn off HDF5_DO_MPI_FILE_SYNC for NFS",
             ),
+            standby_per_host=(
+                4,
+                int,
+                "containers created ahead of time per host and kind; a user's first op always misses (0 disables)",
+            ),
             supervisor_uri=job.DEFAULT_SUPERVISOR_URI_DECL,
             tls_dir=pkconfig.RequiredUnlessDev(
                 None, _cfg_tls_dir, "directory containing host certs"
@@ -227,30 +261,50 @@ class DockerDriver(job_driver.DriverBase):
             op.msg.mpiCores = self._mpi_cores(op, self.cfg[self.kind].get("cores", 1))
         return await super().prepare_send(op)
 
+    def _agent_alive_load(self, load):
+        if self.host is not None:
+            self.host.load = load.pkupdate(time=time.monotonic())
+
     def _agent_env(self, op):
         def _env():
-            for x in "mpich_shm_clean_up", "no_hdf5_do_mpi_file_sync":
+            for x in (
+                "load_report_secs",
+                "mpich_shm_clean_up",
+                "no_hdf5_do_mpi_file_sync",
+            ):
                 yield f"SIREPO_PKCLI_JOB_AGENT_{x.upper()}", str(self.cfg[x])
 
         return super()._agent_env(op, env=PKDict(_env()))
 
-    async def _do_agent_start(self, op):
-        def _create():
-            return self.host.kinds[self.kind].create_prefix + (
+    def _create_cmd(self, kind, cmd, cname, standby=False):
+        return (
+            self.host.kinds[kind].create_prefix
+            + ((f"--label={_STANDBY_LABEL}",) if standby else ())
+            + (
                 # SECURITY: Must only mount the user's directory
                 self._volume_arg(self._user_dir),
-                f"--name={self._cname}",
+                f"--name={cname}",
                 self._image,
             )
+            + tuple(cmd)
+        )
 
+    async def _do_agent_start(self, op):
         cmd, stdin, _ = self._agent_cmd_stdin_env(op, cwd=self._agent_exec_dir)
         pkdlog("{} agent_exec_dir={}", self, self._agent_exec_dir)
         pkio.mkdir_parent(self._agent_exec_dir)
         self.driver_details.pkupdate(host=self.host.name)
-        o, e = await _DockerCmd(cmd=_create() + cmd, driver=self).start()
-        if e:
-            # Logging in _DockerCmd
-            return
+        if o := await self._standby_claim():
+            pkdlog("{} standby cid={:.12}", self, o)
+        else:
+            t = time.monotonic()
+            o, e = await _DockerCmd(
+                cmd=self._create_cmd(self.kind, cmd, self._cname), driver=self
+            ).start()
+            if e:
+                # Logging in _DockerCmd
+                return
+            sirepo.metrics.timing("docker.create", time.monotonic() - t)
         self._cid = o
         asyncio.create_task(
             _DockerCmd(
@@ -300,6 +354,7 @@ class DockerDriver(job_driver.DriverBase):
                 cmd_prefix=_host_cmd_prefix(host, cls.cfg.tls_dir.join(host)),
                 name=host,
                 kinds=PKDict({k: _kind(k, plan_cfg, plan_cfg[k]) for k in job.KINDS}),
+                standby_pruned=tornado.locks.Event(),
             )
 
         def _host_cmd_prefix(host, tls_d):
@@ -321,10 +376,11 @@ class DockerDriver(job_driver.DriverBase):
 
         def _kind(kind, plan_cfg, kind_cfg):
             return PKDict(
-                cpu_slot_q=job_supervisor.SlotQueue(kind_cfg.slots_per_host),
+                cpu_slot_q=sirepo.job_scheduler.SlotQueue(kind_cfg.slots_per_host),
                 instances=[],
                 kind_cfg=kind_cfg,
                 create_prefix=_kind_create_prefix(plan_cfg, kind_cfg),
+                standby=PKDict(),
             )
 
         def _kind_create_prefix(plan_cfg, kind_cfg):
@@ -379,6 +435,85 @@ class DockerDriver(job_driver.DriverBase):
             raise AssertionError("no docker hosts")
         if d := x[_ENTERPRISE_PLAN].intersection(x[_DEFAULT_PLAN]):
             raise AssertionError("enterprise and default docker hosts overlap={d}")
+        if cls.cfg.standby_per_host:
+            tornado.ioloop.IOLoop.current().add_callback(cls._standby_prune)
+
+    async def _standby_claim(self):
+        """Container created by `_standby_create_others` for this user and kind
+
+        The container is renamed to the driver's name, which also checks
+        that it still exists.
+
+        Returns:
+            str: cid or None if there is no standby container
+        """
+        if not self.cfg.standby_per_host:
+            return None
+        if s := self.host.kinds[self.kind].standby.pkdel(self.uid):
+            if rv := await s.task:
+                _, e = await _DockerCmd(
+                    cmd=("rename", s.cname, self._cname), driver=self
+                ).start()
+                if not e:
+                    sirepo.metrics.inc("docker.standby.hit")
+                    return rv
+            asyncio.create_task(_standby_remove(self.host, s))
+        sirepo.metrics.inc("docker.standby.miss")
+        return None
+
+    def _standby_create_others(self):
+        """Create containers for the user's other kinds on this host
+
+        Jobs of different kinds for the same user go to the same host
+        (see `get_instance`) so the containers are created while the
+        user works with this kind, for example, analysis before the
+        first parallel run. They are created after the host's leftover
+        containers are pruned so the prune cannot remove them.
+        """
+
+        async def _create(cmd):
+            try:
+                await cmd.host.standby_pruned.wait()
+                o, e = await cmd.start()
+                return None if e else o
+            except Exception as e:
+                pkdlog("{} error={} stack={}", cmd.error_prefix, e, pkdexc())
+                return None
+
+        if not self.cfg.standby_per_host:
+            return
+        for k in job.KINDS:
+            if k == self.kind or k in self.__users[self.uid]:
+                continue
+            s = self.host.kinds[k].standby
+            if self.uid not in s and len(s) < self.cfg.standby_per_host:
+                n = _standby_cname(k, self.uid)
+                c = _DockerCmd(
+                    cmd=self._create_cmd(k, job.agent_cmd_shell()[0], n, standby=True),
+                    cname=n,
+                    host=self.host,
+                )
+                s[self.uid] = PKDict(cname=n, task=asyncio.create_task(_create(c)))
+
+    @classmethod
+    async def _standby_prune(cls):
+        for p in cls.__hosts.values():
+            for h in p.values():
+                try:
+                    await _DockerCmd(
+                        cmd=(
+                            "container",
+                            "prune",
+                            "--force",
+                            f"--filter=label={_STANDBY_LABEL}",
+                        ),
+                        cname=_CNAME_PREFIX,
+                        host=h,
+                    ).start()
+                except Exception as e:
+                    pkdlog("host={} error={} stack={}", h.name, e, pkdexc())
+                finally:
+                    h.standby_pruned.set()
 
     @classmethod
     def _volume_arg(cls, vol, mode=None):
@@ -396,11 +531,13 @@ class _DockerCmd(PKDict):
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
         self.pksetdefault(
+            cname=lambda: self.driver._cname,
+            host=lambda: self.driver.host,
             stdin=subprocess.DEVNULL,
             timeout=_DOCKER_CMD_TIMEOUT,
             log_output=False,
         )
-        self.error_prefix = f"cmd={self.cmd[0]} cname={self.driver._cname}"
+        self.error_prefix = f"cmd={self.cmd[0]} cname={self.cname}"
         self.stdout = ""
         self.stderr = ""
         self.timer = None
@@ -421,8 +558,8 @@ class _DockerCmd(PKDict):
                 )
 
         def _subprocess():
-            self.cmd = self.driver.host.cmd_prefix + self.cmd
-            pkdc("{} subprocess: {}", self.driver, " ".join(self.cmd))
+            self.cmd = self.host.cmd_prefix + self.cmd
+            pkdc("{} subprocess: {}", self.cname, " ".join(self.cmd))
             try:
                 self.proc = tornado.process.Subprocess(
                     self.cmd,
@@ -480,7 +617,7 @@ class _DockerCmd(PKDict):
             rv = l.pop() if buf[-1] == "\n" else ""
             for x in l:
                 # Good enough for logging case, because only used with start
-                pkdlog("{} {}", self.driver._cname, x)
+                pkdlog("{} {}", self.cname, x)
             return rv
 
         s = getattr(self.proc, which)
@@ -520,3 +657,23 @@ def _cfg_tls_dir(value):
     res = pkio.py_path(value)
     assert res.check(dir=True), "directory does not exist; value={}".format(value)
     return res
+
+
+def _cname(kind, uid):
+    # POSIT: matches _CNAME_RE
+    return _CNAME_SEP.join([_CNAME_PREFIX, kind[0], uid])
+
+
+def _standby_cname(kind, uid):
+    # unique so a create which timed out (but succeeded) cannot conflict
+    return _CNAME_SEP.join(
+        [_cname(kind, uid), _STANDBY_CNAME, sirepo.util.random_base62(8)]
+    )
+
+
+async def _standby_remove(host, standby):
+    await standby.task
+    # by name, because the create may have timed out and still succeeded
+    await _DockerCmd(
+        cmd=("rm", "--force", standby.cname), cname=standby.cname, host=host
+    ).start()
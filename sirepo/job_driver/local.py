@@ -9,6 +9,7 @@ from pykern.pkcollections import PKDict
 from pykern.pkdebug import pkdp, pkdlog
 from sirepo import job
 from sirepo import job_driver
+import sirepo.job_scheduler
 import sirepo.mpi
 import subprocess
 import tornado.ioloop
@@ -37,17 +38,10 @@ class LocalDriver(job_driver.DriverBase):
 
     @classmethod
     def get_instance(cls, op):
-        # TODO(robnagler) need to introduce concept of parked drivers for reallocation.
-        # a driver is freed as soon as it completes all its outstanding ops. For
-        # _run(), this is an outstanding op, which holds the driver until the _run()
-        # is complete. Same for analysis. Once all runs and analyses are compelte,
-        # free the driver, but park it. Allocation then is trying to find a parked
-        # driver then a free cpu slot. If there are no free slots, we garbage collect
-        # parked drivers. We can park more drivers than are available for compute
-        # so has to connect to the max slots. Parking is only needed for resources
-        # we have to manage (local, docker). For NERSC, AWS, etc. parking is not
-        # necessary. You would allocate as many parallel slots. We can park more
-        # slots than are in_use, just can't use more slots than are actually allowed.
+        # Drivers are never freed. When all of a driver's ops are complete,
+        # its agent is parked (see DriverBase._agent_park) so the user's
+        # next op does not have to start an agent. Parked agents are
+        # garbage collected when there are too many agents for the cpu slots.
 
         # TODO(robnagler) drivers are not organized by uid, because there can be more
         # than one per user, rather, we can have a list here, not just self.
@@ -75,7 +69,7 @@ class LocalDriver(job_driver.DriverBase):
             supervisor_uri=job.DEFAULT_SUPERVISOR_URI_DECL,
         )
         cls.__cpu_slot_q.update(
-            {k: job_supervisor.SlotQueue(cls.cfg.slots[k]) for k in job.KINDS}
+            {k: sirepo.job_scheduler.SlotQueue(cls.cfg.slots[k]) for k in job.KINDS}
         )
         return cls
 
@@ -278,6 +278,14 @@ disown
             ),
         )
 
+    def _agent_park(self):
+        """Sbatch agents should be kept alive as long as possible"""
+        pass
+
+    def _parked_gc(self):
+        """Sbatch agents should be kept alive as long as possible"""
+        pass
+
     def _start_idle_timeout(self):
         """Sbatch agents should be kept alive as long as possible"""
         pass
@@ -0,0 +1,138 @@
+"""Length-prefixed messages between job_agent and the job_cmd fastcgi process
+
+A frame is a header followed by the encoded message. The header is
+the encoding (`JSON` or `MSGPACK`) and the length of the message as a
+big-endian unsigned int. The receiver reads the header then reads the
+message into a buffer allocated once at its final size, so large
+replies are not copied as they arrive and the size is checked before
+anything is read.
+
+The sender chooses the encoding (see ``sirepo.job.cfg().fastcgi_msgpack``)
+and the job_cmd replies in the encoding of the request.
+
+:copyright: Copyright (c) 2026 RadiaSoft LLC.  All Rights Reserved.
+:license: http://www.apache.org/licenses/LICENSE-2.0.html
+"""
+
+from pykern import pkcollections
+from pykern import pkjson
+from pykern.pkcollections import PKDict
+from pykern.pkdebug import pkdc, pkdexc, pkdlog, pkdp
+import struct
+
+#: message is json
+JSON = b"j"
+
+#: message is msgpack
+MSGPACK = b"m"
+
+_HEADER = struct.Struct("!cI")
+
+#: bytes in a frame header
+HEADER_SIZE = _HEADER.size
+
+_ENCODINGS = frozenset((JSON, MSGPACK))
+
+
+class AbruptCloseError(Exception):
+    """Socket closed before a complete frame was received"""
+
+    pass
+
+
+def decode(encoding, message):
+    """Parse `message`
+
+    Args:
+        encoding (bytes): `JSON` or `MSGPACK`
+        message (bytes-like): encoded message
+    Returns:
+        object: usually a PKDict
+    """
+    if encoding == JSON:
+        return pkjson.load_any(message)
+    import msgpack
+
+    return msgpack.unpackb(
+        message,
+        object_pairs_hook=pkcollections.object_pairs_hook,
+        raw=False,
+        strict_map_key=False,
+    )
+
+
+def encode(value, encoding=JSON):
+    """Serialize `value` as a frame
+
+    Like `pkjson.dump_bytes`, values which cannot be encoded are
+    converted with `str`.
+
+    Args:
+        value (object): to serialize
+        encoding (bytes): `JSON` or `MSGPACK` [JSON]
+    Returns:
+        bytes: header and message
+    """
+    return frame(encoding, _dump(value, encoding))
+
+
+def frame(encoding, message):
+    """Prepend a header to `message`
+
+    Args:
+        encoding (bytes): `JSON` or `MSGPACK`
+        message (bytes): encoded message
+    Returns:
+        bytes: header and message
+    """
+    return _HEADER.pack(encoding, len(message)) + message
+
+
+def parse_header(header, max_bytes):
+    """Validate `header`
+
+    Args:
+        header (bytes): `HEADER_SIZE` bytes
+        max_bytes (int): largest message allowed
+    Returns:
+        tuple: encoding and length of the message
+    """
+    e, n = _HEADER.unpack(header)
+    if e not in _ENCODINGS:
+        raise AssertionError(f"invalid frame encoding={e}")
+    if n > max_bytes:
+        raise AssertionError(f"frame length={n} larger than max_bytes={max_bytes}")
+    return e, n
+
+
+def recv(sock, max_bytes):
+    """Read one frame from a blocking socket
+
+    Args:
+        sock (socket.socket): stream socket
+        max_bytes (int): largest message allowed
+    Returns:
+        tuple: encoding and decoded message
+    """
+    e, n = parse_header(_recv_exactly(sock, HEADER_SIZE), max_bytes)
+    return e, decode(e, _recv_exactly(sock, n))
+
+
+def _dump(value, encoding):
+    if encoding == JSON:
+        return pkjson.dump_bytes(value)
+    import msgpack
+
+    return msgpack.packb(value, default=str, use_bin_type=True)
+
+
+def _recv_exactly(sock, length):
+    rv = bytearray(length)
+    v = memoryview(rv)
+    i = 0
+    while i < length:
+        n = sock.recv_into(v[i:])
+        if n == 0:
+            raise AbruptCloseError()
+        i += n
+    return rv
@@ -0,0 +1,298 @@
+"""Choose the docker host for a new agent
+
+Each host is modeled by the resources committed to it. A slot held or
+waited for costs the cores and gigabytes configured for its kind.
+An agent with nothing running or waiting costs ``idle_share`` of that
+so that agents placed in a burst do not all land on the same host.
+Capacity is the sum of ``slots_per_host`` times cores (1 for
+sequential) and gigabytes over the kinds of the host.
+
+Agents report the load average and memory of their host in
+`sirepo.job.OP_ALIVE` (see ``job_agent.load_report_secs``). A host
+with a report younger than ``live_load_secs`` is at least as utilized
+as the report says, which accounts for work the supervisor does not
+know about.
+
+Utilization is the largest fraction of cores or gigabytes in use or,
+when placing a job, of the slots of its kind. The
+``pack`` policy puts a job on the most utilized host it fits on, which
+keeps other hosts free for large jobs. The ``spread`` policy puts a
+job on the least utilized host. The ``count`` policy is the old
+behavior, fewest agents of the kind. By default, parallel jobs are
+packed and sequential jobs are spread.
+
+`simulate` runs a queueing model of a set of hosts to compare policies
+(see ``sirepo profile placement``).
+
+:copyright: Copyright (c) 2026 RadiaSoft LLC.  All Rights Reserved.
+:license: http://www.apache.org/licenses/LICENSE-2.0.html
+"""
+
+from pykern import pkconfig
+from pykern.pkcollections import PKDict
+from pykern.pkdebug import pkdc, pkdexc, pkdlog, pkdp
+import collections
+import heapq
+import os
+import random
+import sirepo.job
+import time
+
+_cfg = None
+
+#: policies by name
+POLICIES = None
+
+
+class _SimSlots:
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self.running = []
+        self.waiters = collections.deque()
+
+    def demand(self):
+        rv = PKDict()
+        for j in self.running + list(self.waiters):
+            rv[j.uid] = rv.get(j.uid, 0) + 1
+        return rv
+
+
+def choose(hosts, kind, policy=None, now=None):
+    """Host to start an agent of `kind` on
+
+    Args:
+        hosts (iterable): host PKDicts (see `sirepo.job_driver.docker`)
+        kind (str): `sirepo.job.PARALLEL` or `sirepo.job.SEQUENTIAL`
+        policy (str): name in `POLICIES` [configured for `kind`]
+        now (float): monotonic time [time.monotonic()]
+    Returns:
+        PKDict: host
+    """
+    h = list(hosts)
+    if not h:
+        raise AssertionError(f"no hosts for kind={kind}")
+    if now is None:
+        now = time.monotonic()
+    return POLICIES[policy or _cfg[kind]](h, kind, now)
+
+
+def live_load():
+    """Load of this host for `sirepo.job.OP_ALIVE`
+
+    Returns:
+        PKDict: cpus, loadavg (one minute), mem_available_gb, mem_total_gb
+    """
+    import psutil
+
+    m = psutil.virtual_memory()
+    return PKDict(
+        cpus=os.cpu_count(),
+        loadavg=os.getloadavg()[0],
+        mem_available_gb=m.available / 2**30,
+        mem_total_gb=m.total / 2**30,
+    )
+
+
+def simulate(
+    policy=None, hosts=4, jobs=2000, load=0.8, parallel_fraction=0.3, seed=1, kinds=None
+):
+    """Queueing model of docker hosts placing jobs with `policy`
+
+    Jobs arrive at random, each from a new user, at a rate which keeps
+    `load` of the slots busy on average. Durations are exponential.
+    A job waits in the queue of the host it is placed on (first in
+    first out) as it would in the supervisor.
+
+    Args:
+        policy (str): name in `POLICIES` [configured for each kind]
+        hosts (int): number of hosts [4]
+        jobs (int): number of jobs [2000]
+        load (float): offered load as fraction of all slots [0.8]
+        parallel_fraction (float): fraction of jobs which are parallel [0.3]
+        seed (int): random seed [1]
+        kinds (PKDict): kind to cores, gigabytes, mean_secs, slots_per_host
+    Returns:
+        PKDict: mean_wait_secs, p95_wait_secs, max_wait_secs, and empty_hosts (time average of hosts with nothing running)
+    """
+
+    def _arrive(job):
+        h = choose(s.hosts, job.kind, policy=policy, now=s.now)
+        k = h.kinds[job.kind]
+        job.host = h
+        k.instances.append(job)
+        k.cpu_slot_q.waiters.append(job)
+        _start(k)
+
+    def _empty_hosts():
+        return sum(
+            1
+            for h in s.hosts
+            if not any(k.cpu_slot_q.running for k in h.kinds.values())
+        )
+
+    def _finish(job):
+        k = job.host.kinds[job.kind]
+        k.instances.remove(job)
+        k.cpu_slot_q.running.remove(job)
+        _start(k)
+
+    def _host(index):
+        return PKDict(
+            name=f"h{index}",
+            kinds=PKDict(
+                {
+                    n: PKDict(
+                        cpu_slot_q=_SimSlots(c.slots_per_host),
+                        instances=[],
+                        kind_cfg=c,
+                    )
+                    for n, c in kinds.items()
+                }
+            ),
+        )
+
+    def _schedule(when, handler, job):
+        s.seq += 1
+        heapq.heappush(s.events, (when, s.seq, handler, job))
+
+    def _start(kind):
+        q = kind.cpu_slot_q
+        while q.waiters and len(q.running) < q.maxsize:
+            j = q.waiters.popleft()
+            q.running.append(j)
+            s.waits.append(s.now - j.arrival)
+            _schedule(s.now + j.secs, _finish, j)
+
+    if kinds is None:
+        kinds = PKDict(
+            parallel=PKDict(cores=4, gigabytes=4, mean_secs=600, slots_per_host=2),
+            sequential=PKDict(cores=1, gigabytes=1, mean_secs=60, slots_per_host=8),
+        )
+    r = random.Random(seed)
+    s = PKDict(
+        events=[],
+        hosts=[_host(i) for i in range(hosts)],
+        now=0.0,
+        seq=0,
+        waits=[],
+    )
+    f = PKDict(parallel=parallel_fraction, sequential=1 - parallel_fraction)
+    # arrivals per second so slot seconds demanded is load times those available
+    a = (
+        load
+        * hosts
+        / sum(f[n] * c.mean_secs / c.slots_per_host for n, c in kinds.items())
+    )
+    t = 0.0
+    for i in range(jobs):
+        t += r.expovariate(a)
+        n = sirepo.job.PARALLEL if r.random() < f.parallel else sirepo.job.SEQUENTIAL
+        _schedule(
+            t,
+            _arrive,
+            PKDict(
+                arrival=t,
+                kind=n,
+                secs=r.expovariate(1 / kinds[n].mean_secs),
+                uid=f"u{i}",
+            ),
+        )
+    e = 0.0
+    while s.events:
+        w, _, h, j = heapq.heappop(s.events)
+        e += _empty_hosts() * (w - s.now)
+        s.now = w
+        h(j)
+    x = sorted(s.waits)
+    return PKDict(
+        empty_hosts=e / s.now if s.now else 0,
+        max_wait_secs=x[-1],
+        mean_wait_secs=sum(x) / len(x),
+        p95_wait_secs=x[int(0.95 * (len(x) - 1))],
+    )
+
+
+def utilization(host, now, kind=None):
+    """Fraction of the most used resource of `host`
+
+    Args:
+        host (PKDict): see `choose`
+        now (float): monotonic time
+        kind (str): include one more job of this kind [None]
+    Returns:
+        float: 0 is idle, 1 is full, and may be more than 1
+    """
+    c = PKDict(cores=0.0, gigabytes=0.0)
+    u = PKDict(cores=0.0, gigabytes=0.0)
+    rv = 0.0
+    for n, k in host.kinds.items():
+        r = PKDict(cores=k.kind_cfg.get("cores", 1), gigabytes=k.kind_cfg.gigabytes)
+        d = k.cpu_slot_q.demand()
+        s = sum(d.values()) + _cfg.idle_share * sum(
+            1 for i in k.instances if i.uid not in d
+        )
+        if n == kind:
+            s += 1
+            # the job waits if the kind's slots are full
+            rv = s / k.cpu_slot_q.maxsize
+        for x in c.keys():
+            c[x] += k.cpu_slot_q.maxsize * r[x]
+            u[x] += s * r[x]
+    rv = max(rv, u.cores / c.cores, u.gigabytes / c.gigabytes)
+    l = host.get("load")
+    if not l or now - l.time > _cfg.live_load_secs:
+        return rv
+    if kind:
+        k = host.kinds[kind].kind_cfg
+        a = PKDict(cores=k.get("cores", 1), gigabytes=k.gigabytes)
+    else:
+        a = PKDict(cores=0, gigabytes=0)
+    return max(
+        rv,
+        (l.loadavg + a.cores) / l.cpus,
+        1 - (l.mem_available_gb - a.gigabytes) / l.mem_total_gb,
+    )
+
+
+def _count(hosts, kind, now):
+    return min(hosts, key=lambda h: len(h.kinds[kind].instances))
+
+
+def _init():
+    global _cfg, POLICIES
+
+    _cfg = pkconfig.init(
+        idle_share=(
+            0.25,
+            float,
+            "fraction of a job's resources charged for an agent with no job",
+        ),
+        live_load_secs=(
+            60,
+            pkconfig.parse_seconds,
+            "ignore load reported by agents older than this",
+        ),
+        parallel=("pack", str, "placement policy of parallel agents"),
+        sequential=("spread", str, "placement policy of sequential agents"),
+    )
+    POLICIES = PKDict(count=_count, pack=_pack, spread=_spread)
+    for k in sirepo.job.KINDS:
+        if _cfg[k] not in POLICIES:
+            raise AssertionError(
+                f"invalid {k}={_cfg[k]} must be one of {sorted(POLICIES)}"
+            )
+
+
+def _pack(hosts, kind, now):
+    u = [(utilization(h, now, kind), i, h) for i, h in enumerate(hosts)]
+    if f := [x for x in u if x[0] <= 1]:
+        # most utilized which fits, first host configured on ties
+        return max(f, key=lambda x: (x[0], -x[1]))[2]
+    return min(u, key=lambda x: x[:2])[2]
+
+
+def _spread(hosts, kind, now):
+    return min(enumerate(hosts), key=lambda x: (utilization(x[1], now, kind), x[0]))[1]
+
+
+_init()
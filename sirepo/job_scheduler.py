@@ -0,0 +1,230 @@
+"""Order ops waiting for supervisor CPU slots
+
+A `SlotQueue` hands out CPU slots like `job_supervisor.SlotQueue`, but
+when a slot is freed the waiter is chosen by the configured scheduler
+instead of strictly first in first out.
+
+The ``fair_share`` scheduler ranks each waiter by the slots its user
+already holds divided by the weight of the user's plan. Interactive
+ops (analysis, that is, frames and computes the user is looking at)
+are ranked ahead of batch runs. Waiters age so nobody waits forever:
+every ``aging_secs`` waited is worth one held slot. Ties are broken
+by arrival. The ``fifo`` scheduler is the old behavior.
+
+:copyright: Copyright (c) 2026 RadiaSoft LLC.  All Rights Reserved.
+:license: http://www.apache.org/licenses/LICENSE-2.0.html
+"""
+
+from pykern import pkconfig
+from pykern.pkcollections import PKDict
+from pykern.pkdebug import pkdc, pkdexc, pkdlog, pkdp
+import asyncio
+import math
+import sirepo.const
+import sirepo.job
+import sirepo.job_supervisor
+import sirepo.metrics
+import time
+import tornado.queues
+
+_cfg = None
+
+_scheduler = None
+
+#: weight of recent hold times in the estimate of the next one
+_HOLD_SECS_DECAY = 0.2
+
+
+class FairShare:
+    """Weighted fair share by uid and plan with priority and aging"""
+
+    def order(self, queue, waiters, now):
+        def _score(waiter):
+            return (
+                queue.held_by(waiter.uid) / _plan_weight(waiter.plan)
+                - (_cfg.interactive_priority if waiter.is_interactive else 0)
+                - (now - waiter.queued) / _cfg.aging_secs,
+                waiter.queued,
+            )
+
+        return sorted(waiters, key=_score)
+
+
+class Fifo:
+    """First in first out"""
+
+    def order(self, queue, waiters, now):
+        return sorted(waiters, key=lambda w: w.queued)
+
+
+class SlotQueue:
+    """CPU slots allocated by the configured scheduler
+
+    Same interface as `job_supervisor.SlotQueue` so a
+    `job_supervisor.SlotProxy` can use either.
+
+    Args:
+        maxsize (int): number of slots [1]
+    """
+
+    def __init__(self, maxsize=1):
+        self.maxsize = maxsize
+        self._free = list(range(maxsize, 0, -1))
+        self._holders = PKDict()
+        self._hold_secs = None
+        self._waiters = []
+
+    def demand(self):
+        """Slots held and waited for by each user
+
+        Returns:
+            PKDict: uid to number of slots
+        """
+        rv = PKDict()
+        for x in list(self._holders.values()) + self._live_waiters():
+            rv[x.uid] = rv.get(x.uid, 0) + 1
+        return rv
+
+    def held_by(self, uid):
+        """Number of slots held by `uid`
+
+        Args:
+            uid (str): user
+        Returns:
+            int: slots in use
+        """
+        return sum(1 for h in self._holders.values() if h.uid == uid)
+
+    async def sr_get(self, op):
+        """Wait for the scheduler to choose `op`
+
+        Args:
+            op (job_supervisor._Op): requester
+        Returns:
+            int: slot
+        """
+        w = PKDict(
+            future=asyncio.get_running_loop().create_future(),
+            is_interactive=op.op_name == sirepo.job.OP_ANALYSIS,
+            op=op,
+            plan=op.msg.get("activePlan"),
+            queued=time.monotonic(),
+            uid=op.msg.get("uid"),
+        )
+        self._waiters.append(w)
+        try:
+            return await w.future
+        except sirepo.const.ASYNC_CANCELED_ERROR:
+            if w.future.done() and not w.future.cancelled():
+                # slot was handed over before the cancel was delivered
+                self.sr_put(op, w.future.result())
+            elif w in self._waiters:
+                self._waiters.remove(w)
+            raise
+
+    def sr_get_nowait(self, op):
+        """Take a free slot if nobody is waiting
+
+        Args:
+            op (job_supervisor._Op): requester
+        Returns:
+            int: slot
+        """
+        if not self._free or self._live_waiters():
+            raise tornado.queues.QueueEmpty()
+        return self._take(self._free.pop(), op)
+
+    def sr_put(self, op, value):
+        """Return slot and give it to the next waiter (if any)
+
+        Args:
+            op (job_supervisor._Op): holder
+            value (int): slot
+        """
+        if h := self._holders.pkdel(value):
+            s = time.monotonic() - h.start
+            self._hold_secs = (
+                s
+                if self._hold_secs is None
+                else _HOLD_SECS_DECAY * s + (1 - _HOLD_SECS_DECAY) * self._hold_secs
+            )
+        if w := self._live_waiters():
+            w = _scheduler.order(self, w, time.monotonic())[0]
+            self._waiters.remove(w)
+            sirepo.metrics.timing("cpu_slot.wait", time.monotonic() - w.queued)
+            w.future.set_result(self._take(value, w.op))
+            return
+        self._free.append(value)
+
+    def sr_queue_info(self, op):
+        """Position of `op` in the queue and estimated wait
+
+        Args:
+            op (job_supervisor._Op): requester
+        Returns:
+            PKDict: position (1 is next) and estimated_secs (None if no slot has been freed yet) or None if not waiting
+        """
+        w = self._live_waiters()
+        for i, x in enumerate(_scheduler.order(self, w, time.monotonic())):
+            if x.op is op:
+                return PKDict(
+                    estimated_secs=(
+                        None
+                        if self._hold_secs is None
+                        else math.ceil(
+                            (i // self.maxsize + 1) * self._hold_secs,
+                        )
+                    ),
+                    position=i + 1,
+                )
+        return None
+
+    def sr_slot_proxy(self, op):
+        return sirepo.job_supervisor.SlotProxy(_op=op, _q=self)
+
+    def _live_waiters(self):
+        self._waiters = [w for w in self._waiters if not w.future.done()]
+        return self._waiters
+
+    def _take(self, value, op):
+        self._holders[value] = PKDict(start=time.monotonic(), uid=op.msg.get("uid"))
+        return value
+
+
+def _init():
+    global _cfg, _scheduler
+
+    _cfg = pkconfig.init(
+        aging_secs=(
+            60,
+            pkconfig.parse_positive_int,
+            "seconds waited which are worth one held slot",
+        ),
+        interactive_priority=(
+            1.0,
+            float,
+            "slots of share given to analysis ops over runs",
+        ),
+        plan_weight=dict(
+            basic=(1.0, float, "share weight of basic plan"),
+            enterprise=(4.0, float, "share weight of enterprise plan"),
+            premium=(2.0, float, "share weight of premium plan"),
+            trial=(1.0, float, "share weight of trial plan"),
+        ),
+        scheduler=(
+            "fair_share",
+            str,
+            "order of ops waiting for a CPU slot: fair_share or fifo",
+        ),
+    )
+    s = PKDict(fair_share=FairShare, fifo=Fifo).get(_cfg.scheduler)
+    if s is None:
+        raise AssertionError(f"invalid scheduler={_cfg.scheduler}")
+    _scheduler = s()
+
+
+def _plan_weight(plan):
+    return _cfg.plan_weight.get(plan) or 1.0
+
+
+_init()
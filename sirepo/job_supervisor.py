@@ -10,31 +10,27 @@ from pykern import pkjson
 from pykern.pkcollections import PKDict
 from pykern.pkdebug import pkdp, pkdc, pkdformat, pkdlog, pkdexc
 from sirepo import job
-import aiofiles.os
 import asyncio
 import contextlib
 import copy
 import enum
-import pykern.pkio
+import itertools
 import pykern.pkjson
-import re
 import sirepo.auth_role
-import sirepo.const
 import sirepo.global_resources
+import sirepo.job_supervisor_db
+import sirepo.metrics
 import sirepo.quest
 import sirepo.simulation_db
-import sirepo.srdb
 import sirepo.srtime
 import sirepo.tornado
 import sirepo.util
+import time
 import tornado.ioloop
 
 _PARALLEL_PREMIUM_PLANS = PLAN_ROLES_PAID = frozenset(
     (sirepo.auth_role.ROLE_PLAN_ENTERPRISE, sirepo.auth_role.ROLE_PLAN_PREMIUM)
 )
-#: where supervisor state is persisted to disk
-_DB_DIR = None
-
 _NEXT_REQUEST_SECONDS = None
 
 _HISTORY_FIELDS = frozenset(
@@ -101,6 +97,10 @@ _REPLY_SR_EXCEPTION_STATE = "srException"
 _REPLY_ERROR_STATE = "error"
 _REPLY_STATE = "state"
 
+#: seeded from the clock so serials are not repeated when a job is
+#: evicted and recreated or the supervisor restarts
+_status_serials = itertools.count(time.time_ns())
+
 
 class InvalidRequest(Exception):
     pass
@@ -138,12 +138,12 @@ class SlotProxy(PKDict):
         if self._value is not None:
             return SlotAllocStatus.DID_NOT_AWAIT
         try:
-            self._value = self._q.get_nowait()
+            self._value = self._q.sr_get_nowait(self._op)
             return SlotAllocStatus.DID_NOT_AWAIT
         except tornado.queues.QueueEmpty:
             pkdlog("{} enter={} {}", self._op, situation, self._op._supervisor)
             with self._op.set_job_situation(situation):
-                self._value = await self._q.get()
+                self._value = await self._q.sr_get(self._op)
                 pkdlog("{} exit={} {}", self._op, situation, self._op._supervisor)
                 if self._op.is_destroyed:
                     self.free()
@@ -153,17 +153,44 @@ class SlotProxy(PKDict):
     def free(self):
         if self._value is None:
             return
-        self._q.task_done()
-        self._q.put_nowait(self._value)
+        self._q.sr_put(self._op, self._value)
         self._value = None
 
+    def queue_info(self):
+        """Position and estimated wait if op is waiting for this slot
+
+        Returns:
+            PKDict: see `sirepo.job_scheduler.SlotQueue.sr_queue_info` or None
+        """
+        if self._value is not None:
+            return None
+        return self._q.sr_queue_info(self._op)
+
 
 class SlotQueue(sirepo.tornado.Queue):
+    """First in first out slots
+
+    See `sirepo.job_scheduler.SlotQueue` for CPU slots.
+    """
+
     def __init__(self, maxsize=1):
         super().__init__(maxsize=maxsize)
         for i in range(1, maxsize + 1):
             self.put_nowait(i)
 
+    def sr_get(self, op):
+        return self.get()
+
+    def sr_get_nowait(self, op):
+        return self.get_nowait()
+
+    def sr_put(self, op, value):
+        self.task_done()
+        self.put_nowait(value)
+
+    def sr_queue_info(self, op):
+        return None
+
     def sr_slot_proxy(self, op):
         return SlotProxy(_op=op, _q=self)
 
@@ -178,13 +205,23 @@ def agent_receive(msg):
 
 
 def init_module(**imports):
-    global _cfg, _DB_DIR, _NEXT_REQUEST_SECONDS
+    global _cfg, _NEXT_REQUEST_SECONDS
 
     if _cfg:
         return
     # import sirepo.job_driver
     sirepo.util.setattr_imports(imports)
     _cfg = pkconfig.init(
+        db_write_behind_secs=(
+            0,
+            int,
+            "coalesce non-terminal job status writes for this long (0 writes immediately)",
+        ),
+        history_max=(
+            20,
+            pkconfig.parse_positive_int,
+            "previous runs kept in a job's history; older runs are rolled into historySummary",
+        ),
         job_cache_secs=(300, int, "when to re-read job state from disk"),
         max_secs=dict(
             analysis=(
@@ -218,6 +255,11 @@ def init_module(**imports):
             pkconfig.parse_seconds,
             "time interval to clean up simulation runs of non-premium users, value of 0 means no checks are performed",
         ),
+        run_status_wait_secs=(
+            60,
+            pkconfig.parse_positive_int,
+            "max time a runStatusWait is held before replying with an unchanged status",
+        ),
         run_dir_lifetime=(
             "1d",
             pkconfig.parse_seconds,
@@ -225,8 +267,7 @@ def init_module(**imports):
         ),
         sbatch_poll_secs=(15, int, "how often to poll squeue and parallel status"),
     )
-    _DB_DIR = sirepo.srdb.supervisor_dir()
-    pykern.pkio.mkdir_parent(_DB_DIR)
+    sirepo.job_supervisor_db.init_module()
     _NEXT_REQUEST_SECONDS = PKDict(
         {
             job.PARALLEL: 2,
@@ -234,10 +275,13 @@ def init_module(**imports):
             job.SEQUENTIAL: 1,
         }
     )
+    _ComputeJob.cancel_after_restart()
     _call_later(0, _ComputeJob.purge_non_paid)
+    sirepo.metrics.start_logging()
 
 
 async def terminate():
+    _DbWriteBehind.flush()
     await job_driver.terminate()
 
 
@@ -250,7 +294,7 @@ class _Supervisor(PKDict):
 
     @classmethod
     async def receive(cls, req):
-        if req.content.api != "api_runStatus":
+        if req.content.api not in ("api_runStatus", "api_runStatusWait"):
             pkdlog("{}", req)
         try:
             with _Supervisor._process_request(req) as s:
@@ -344,47 +388,70 @@ class _Supervisor(PKDict):
                     title="Plan",
                     type="String",
                 )
+                h.queuePosition = PKDict(
+                    title="Queue position",
+                    type="String",
+                )
+                h.estimatedWait = PKDict(
+                    title="Estimated wait",
+                    type="Time",
+                )
             return h
 
         def _get_jobs():
+            def _get_queue_info(db):
+                if j := _ComputeJob.instances.get(db.computeJid):
+                    return j.cpu_slot_queue_info()
+                return None
+
             def _get_queued_time(db):
                 m = (
-                    i.db.computeJobStart
-                    if i.db.status == job.RUNNING
+                    db.computeJobStart
+                    if db.status == job.RUNNING
                     else sirepo.srtime.utc_now_as_int()
                 )
                 return m - db.computeJobQueued
 
+            def _dbs():
+                rv = PKDict(
+                    (i.db.computeJid, i.db)
+                    for i in filter(_filter_jobs, _ComputeJob.instances.values())
+                )
+                # Jobs not in memory (e.g. sbatch after a restart) are only
+                # visible when the backend can query them cheaply.
+                for d in sirepo.job_supervisor_db.running_pending(uid=uid) or ():
+                    rv.setdefault(d.computeJid, d)
+                return rv.values()
+
             r = []
             with sirepo.quest.start() as qcall:
-                for i in filter(_filter_jobs, _ComputeJob.instances.values()):
+                for db in _dbs():
                     d = PKDict(
-                        simulationType=i.db.simulationType,
-                        simulationId=i.db.simulationId,
-                        startTime=i.db.computeJobStart,
-                        lastUpdateTime=i.db.lastUpdateTime,
-                        elapsedTime=i.elapsed_time(),
-                        statusMessage=i.db.get("jobStatusMessage", ""),
-                        computeModel=sirepo.job.split_jid(
-                            i.db.computeJid
-                        ).compute_model,
+                        simulationType=db.simulationType,
+                        simulationId=db.simulationId,
+                        startTime=db.computeJobStart,
+                        lastUpdateTime=db.lastUpdateTime,
+                        elapsedTime=_elapsed_time(db),
+                        statusMessage=db.get("jobStatusMessage", ""),
+                        computeModel=sirepo.job.split_jid(db.computeJid).compute_model,
                     )
                     if uid:
-                        d.simName = i.db.simName
+                        d.simName = db.simName
                     else:
-                        d.uid = i.db.uid
+                        d.uid = db.uid
                         d.displayName = (
                             # TODO(robnagler) pull these out with a single query
                             qcall.auth_db.model("UserRegistration")
-                            .search_by(uid=i.db.uid)
+                            .search_by(uid=db.uid)
                             .display_name
                             or "n/a"
                         )
-                        d.queuedTime = _get_queued_time(i.db)
-                        d.driverDetails = " | ".join(
-                            sorted(i.db.driverDetails.values())
-                        )
-                        d.activePlan = i.db.activePlan
+                        d.queuedTime = _get_queued_time(db)
+                        d.driverDetails = " | ".join(sorted(db.driverDetails.values()))
+                        d.activePlan = db.activePlan
+                        q = _get_queue_info(db)
+                        d.queuePosition = q.position if q else ""
+                        d.estimatedWait = q.estimated_secs if q else None
                     r.append(d)
             return r
 
@@ -437,6 +504,9 @@ class _ComputeJob(_Supervisor):
             ops=[],
             run_dir_slot_q=SlotQueue(),
             _run_status_op=None,
+            # in memory only; tells runStatusWait when db status has changed
+            _status_serial=next(_status_serials),
+            _status_waiters=[],
         )
         # At start we don't know anything about the run_dir so assume ready
         if d := self._db_load(req.content.computeJid):
@@ -463,6 +533,7 @@ class _ComputeJob(_Supervisor):
             self.cache_timeout_set()
         else:
             # No ops or reqs so nothing to destroy
+            _DbWriteBehind.write(self)
             del self.instances[self.db.computeJid]
 
     def cache_timeout_set(self):
@@ -475,14 +546,38 @@ class _ComputeJob(_Supervisor):
             self._run_status_op = None
         super().destroy_op(op)
 
+    @classmethod
+    def cancel_after_restart(cls):
+        """Cancel jobs left running or pending by a previous supervisor
+
+        `_create` does this lazily for each job. Indexed backends
+        allow doing it all at startup so the admin view is accurate.
+        sbatch jobs continue to run so their status is checked by
+        the first runStatus.
+        """
+        for d in sirepo.job_supervisor_db.running_pending() or ():
+            if d.jobRunMode == job.SBATCH or d.computeJid in cls.instances:
+                continue
+            # _create cancels through _db_status_update
+            cls._create(
+                PKDict(
+                    content=PKDict(api="cancel_after_restart", computeJid=d.computeJid)
+                ),
+            )
+
+    def cpu_slot_queue_info(self):
+        """Queue position of an op waiting for a CPU slot
+
+        Returns:
+            PKDict: see `SlotProxy.queue_info` or None if not waiting
+        """
+        for o in self.ops:
+            if (s := o.get("cpu_slot")) and (rv := s.queue_info()):
+                return rv
+        return None
+
     def elapsed_time(self):
-        if not self.db.computeJobStart:
-            return 0
-        return (
-            sirepo.srtime.utc_now_as_int()
-            if self._is_running_pending()
-            else int(self.db.dbUpdateTime)
-        ) - self.db.computeJobStart
+        return _elapsed_time(self.db)
 
     async def op_send_timeout(self, op):
         if op.is_destroyed:
@@ -563,25 +658,13 @@ class _ComputeJob(_Supervisor):
             pkdlog("jid={}", jid)
 
         async def _uids_to_jids(too_old, qcall):
-            paid_users = qcall.auth_db.model("UserRole").uids_of_paid_users()
-            is_json = re.compile(rf"^(\w.+){sirepo.const.JSON_SUFFIX}$")
-            rv = PKDict()
-            for e in await aiofiles.os.scandir(_DB_DIR):
-                m = is_json.search(e.name)
-                if not m:
-                    continue
-                j = m.group(1)
-                u = sirepo.job.split_jid(jid=j).uid
-                if (
-                    u not in paid_users
-                    and e.stat(follow_symlinks=False).st_mtime <= too_old
-                    and j not in cls._purged_jids_cache
-                ):
-                    if u in rv:
-                        rv[u].append(j)
-                    else:
-                        rv[u] = [j]
-            return rv
+            return await sirepo.job_supervisor_db.purge_candidates(
+                too_old=too_old,
+                exclude_uids=set(
+                    qcall.auth_db.model("UserRole").uids_of_paid_users(),
+                ),
+                exclude_jids=cls._purged_jids_cache,
+            )
 
         if not _cfg.purge_check_interval:
             return
@@ -616,7 +699,7 @@ class _ComputeJob(_Supervisor):
             if not str(exception):
                 exception = repr(exception)
             situation = f"{p}{exception}, while {s}"
-        self._db_update(jobStatusMessage=situation)
+        self._db_update(jobStatusMessage=situation, write_behind=True)
 
     async def _cancel_op_or_job(self, timed_out_op=None, is_run_cancel=False):
         def _create_op(msg):
@@ -723,13 +806,6 @@ class _ComputeJob(_Supervisor):
         self.ops.append(o)
         return o
 
-    @classmethod
-    def _db_file(cls, computeJid):
-        return _DB_DIR.join(
-            sirepo.simulation_db.assert_sim_db_basename(computeJid)
-            + sirepo.const.JSON_SUFFIX,
-        )
-
     def _db_init(self, req, prev_db=None):
         self.db = self._db_init_new(req.content, prev_db)
         return self.db
@@ -751,10 +827,11 @@ class _ComputeJob(_Supervisor):
             dbUpdateTime=sirepo.srtime.utc_now_as_float(),
             driverDetails=PKDict(),
             error=None,
-            history=cls._db_init_history(prev_db),
             isParallel=data.isParallel,
             jobStatusMessage=None,
             lastUpdateTime=0,
+            # set by job_api when the result may be shared (see sirepo.result_cache)
+            resultCacheKey=data.get("resultCacheKey"),
             simName=None,
             simulationId=data.simulationId,
             simulationType=data.simulationType,
@@ -780,13 +857,19 @@ class _ComputeJob(_Supervisor):
             db.parallelStatus = PKDict(
                 ((k, 0) for k in _PARALLEL_STATUS_FIELDS),
             )
-        return db
+        return cls._db_init_history(db, prev_db)
 
     @classmethod
-    def _db_init_history(cls, prev_db):
+    def _db_init_history(cls, db, prev_db):
+        """Append prev_db to history keeping at most history_max entries
+
+        Older entries are rolled into historySummary so the size of
+        the record (and the cost of each write) is bounded no matter
+        how many times the report is run.
+        """
         if prev_db is None:
-            return []
-        return prev_db.history + [
+            return db.pkupdate(history=[], historySummary=None)
+        h = prev_db.history + [
             PKDict(
                 (
                     (k, copy.deepcopy(v))
@@ -795,6 +878,12 @@ class _ComputeJob(_Supervisor):
                 )
             ),
         ]
+        s = copy.deepcopy(prev_db.historySummary)
+        if (n := len(h) - _cfg.history_max) > 0:
+            for x in h[:n]:
+                s = _history_summary_add(s, x)
+            h = h[n:]
+        return db.pkupdate(history=h, historySummary=s)
 
     @classmethod
     def _db_load(cls, compute_jid):
@@ -804,9 +893,7 @@ class _ComputeJob(_Supervisor):
                 computeModel=lambda: sirepo.job.split_jid(compute_jid).compute_model,
                 queueState=None,
             )
-            if "dbUpdateTime" not in old:
-                old.dbUpdateTime = float(p.mtime())
-            elif isinstance(old.dbUpdateTime, int):
+            if isinstance(old.dbUpdateTime, int):
                 # make type compatible
                 old.dbUpdateTime = float(old.dbUpdateTime)
             if "cancelledAfterSecs" in old:
@@ -816,14 +903,8 @@ class _ComputeJob(_Supervisor):
                     h.canceledAfterSecs = old.pkdel("cancelledAfterSecs", default=None)
             return old
 
-        p = cls._db_file(compute_jid)
-        try:
-            d = p.read_binary()
-        except Exception as e:
-            if pykern.pkio.exception_is_not_found(e):
-                return None
-            raise
-        d = pkjson.load_any(d)
+        if (d := sirepo.job_supervisor_db.load(compute_jid)) is None:
+            return None
         if "activePlan" not in d:
             d.activePlan = "premium" if d.get("isPremiumUser") else "basic"
         for k in [
@@ -836,21 +917,36 @@ class _ComputeJob(_Supervisor):
             d.setdefault(k, None)
             for h in d.history:
                 h.setdefault(k, None)
+        d.pksetdefault(historySummary=None, resultCacheKey=None)
         return _fixup(d)
 
-    def _db_status_update(self, **kwargs):
+    def _db_status_update(self, write_behind=False, **kwargs):
         if not self._is_running_pending(kwargs["status"]) and self._run_status_op:
             self._run_status_op.destroy()
-        self._db_update(**kwargs)
-
-    def _db_update(self, **kwargs):
+        self._db_update(
+            # Only coalesce if the status is not changing (see _DbWriteBehind)
+            write_behind=write_behind and kwargs["status"] == self.db.status,
+            **kwargs,
+        )
+        self._status_serial = next(_status_serials)
+        w = self._status_waiters
+        self._status_waiters = []
+        for f in w:
+            if not f.done():
+                f.set_result(None)
+
+    def _db_update(self, write_behind=False, **kwargs):
         self.db.pkupdate(**kwargs)
-        self._db_write_file(self.db)
+        if write_behind and _cfg.db_write_behind_secs and self._is_running_pending():
+            _DbWriteBehind.add(self)
+        else:
+            _DbWriteBehind.discard(self)
+            self._db_write_file(self.db)
 
     @classmethod
     def _db_write_file(cls, db):
         db.dbUpdateTime = sirepo.srtime.utc_now_as_float()
-        sirepo.util.json_dump(db, path=cls._db_file(db.computeJid))
+        sirepo.job_supervisor_db.write(db)
 
     def _db_copy_to_dest(self, dest, fields):
         for f in fields:
@@ -909,7 +1005,7 @@ class _ComputeJob(_Supervisor):
             d.lastUpdateTime = (
                 msg.get("lastUpdateTime") or sirepo.srtime.utc_now_as_int()
             )
-        self._db_status_update(**d)
+        self._db_status_update(write_behind=True, **d)
 
     def _raise_if_purged_or_missing(self, req):
         if self.db.status in (job.MISSING, job.JOB_RUN_PURGED):
@@ -958,9 +1054,7 @@ class _ComputeJob(_Supervisor):
                 simName=req.content.data.models.simulation.name,
                 status=job.PENDING,
             )
-            self._purged_jids_cache.discard(
-                self._db_file(self.db.computeJid).purebasename
-            )
+            self._purged_jids_cache.discard(self.db.computeJid)
             return t
 
         async def _valid_or_reply(force_run):
@@ -1056,8 +1150,33 @@ class _ComputeJob(_Supervisor):
         if r.state == job.ERROR and "errorCode" not in r:
             # TODO(robnagler) this seems wrong. Should be explicit
             return self._init_db_missing_response(req)
+        if r.state == job.COMPLETED and self.db.resultCacheKey:
+            # POSIT: job_api removes before replying to client
+            r.resultCacheKey = self.db.resultCacheKey
         return r
 
+    async def _receive_api_runStatusWait(self, req):
+        """runStatus once status has changed since `statusSerial`
+
+        Used by server to push status to subscribed clients.
+        """
+        if (
+            req.content.get("statusSerial") == self._status_serial
+            and self._is_running_pending()
+        ):
+            f = asyncio.get_running_loop().create_future()
+            self._status_waiters.append(f)
+            try:
+                await asyncio.wait_for(f, _cfg.run_status_wait_secs)
+            except asyncio.TimeoutError:
+                pass
+            finally:
+                if f in self._status_waiters:
+                    self._status_waiters.remove(f)
+        # Serial before reply so a change while replying is not lost
+        s = self._status_serial
+        return (await self._receive_api_runStatus(req)).pkupdate(statusSerial=s)
+
     async def _receive_api_sbatchLoginStatus(self, req):
         return PKDict(ready=self._is_sbatch_login_ok(req))
 
@@ -1262,6 +1381,58 @@ class _ComputeJob(_Supervisor):
         )
 
 
+class _DbWriteBehind:
+    """Coalesce job db writes which do not change status
+
+    Agents send a steady stream of progress updates (parallelStatus,
+    lastUpdateTime, queueState) for running jobs. Writing each one
+    synchronously blocks the loop. When db_write_behind_secs is set,
+    these updates are kept in memory and flushed together on a timer.
+    Status transitions (including terminal states) are written
+    immediately, which also writes any coalesced updates.
+    """
+
+    _jobs = PKDict()
+    _timer = None
+
+    @classmethod
+    def add(cls, compute_job):
+        # dbUpdateTime is a transaction timestamp (see _start_run_status_op)
+        # so it must change even though the write is deferred.
+        compute_job.db.dbUpdateTime = sirepo.srtime.utc_now_as_float()
+        cls._jobs[compute_job.db.computeJid] = compute_job
+        sirepo.metrics.gauge("supervisor.db_write_behind.depth", len(cls._jobs))
+        if cls._timer is None:
+            cls._timer = _call_later(_cfg.db_write_behind_secs, cls.flush)
+
+    @classmethod
+    def discard(cls, compute_job):
+        cls._jobs.pkdel(compute_job.db.computeJid)
+
+    @classmethod
+    def flush(cls):
+        if cls._timer is not None:
+            tornado.ioloop.IOLoop.current().remove_timeout(cls._timer)
+            cls._timer = None
+        j = cls._jobs
+        if not j:
+            return
+        cls._jobs = PKDict()
+        sirepo.metrics.gauge("supervisor.db_write_behind.depth", 0)
+        with sirepo.metrics.timer("supervisor.db_write_behind.flush"):
+            for x in j.values():
+                try:
+                    # Not _db_write_file, which would change dbUpdateTime
+                    sirepo.job_supervisor_db.write(x.db)
+                except Exception as e:
+                    pkdlog("{} error={} stack={}", x, e, pkdexc())
+
+    @classmethod
+    def write(cls, compute_job):
+        if cls._jobs.pkdel(compute_job.db.computeJid):
+            sirepo.job_supervisor_db.write(compute_job.db)
+
+
 class _Op(PKDict):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
@@ -1405,6 +1576,16 @@ def _call_later(*args, **kwargs):
     return tornado.ioloop.IOLoop.current().call_later(*args, **kwargs)
 
 
+def _elapsed_time(db):
+    if not db.computeJobStart:
+        return 0
+    return (
+        sirepo.srtime.utc_now_as_int()
+        if db.status in (job.RUNNING, job.PENDING)
+        else int(db.dbUpdateTime)
+    ) - db.computeJobStart
+
+
 def _canceled_reply():
     return PKDict(state=job.CANCELED)
 
@@ -1416,6 +1597,37 @@ def _copy_truthy(src, dst, keys):
     return dst
 
 
+def _history_summary_add(summary, entry):
+    """Aggregate a history entry that no longer fits in history
+
+    Args:
+        summary (PKDict): previous summary or None
+        entry (PKDict): history entry being dropped
+    Returns:
+        PKDict: updated summary
+    """
+    rv = summary or PKDict(
+        count=0,
+        firstComputeJobQueued=entry.get("computeJobQueued"),
+        lastError=None,
+        meanRunSecs=0,
+        runCount=0,
+        statusCounts=PKDict(),
+    )
+    rv.count += 1
+    s = entry.get("status")
+    rv.statusCounts[s] = rv.statusCounts.get(s, 0) + 1
+    if e := entry.get("error"):
+        rv.lastError = e
+    b = entry.get("computeJobStart")
+    u = entry.get("lastUpdateTime")
+    if b and u and u >= b:
+        rv.runCount += 1
+        # incremental mean so the summary stays a fixed size
+        rv.meanRunSecs += (u - b - rv.meanRunSecs) / rv.runCount
+    return rv
+
+
 def _exception_reply(exc):
     if isinstance(exc, sirepo.util.SRException):
         return PKDict(
@@ -0,0 +1,246 @@
+"""Persistent job state for `sirepo.job_supervisor`
+
+Two backends are supported. ``json`` (default) keeps one file per
+computeJid in `sirepo.srdb.supervisor_dir`. ``sqlite`` keeps one row
+per computeJid in a single table indexed by uid, status,
+lastUpdateTime and dbUpdateTime so purges and admin queries do not
+have to walk the directory.
+
+:copyright: Copyright (c) 2026 RadiaSoft LLC.  All Rights Reserved.
+:license: http://www.apache.org/licenses/LICENSE-2.0.html
+"""
+
+from pykern import pkconfig
+from pykern import pkjson
+from pykern.pkcollections import PKDict
+from pykern.pkdebug import pkdc, pkdexc, pkdlog, pkdp
+import aiofiles.os
+import pykern.pkio
+import re
+import sirepo.const
+import sirepo.job
+import sirepo.simulation_db
+import sirepo.srdb
+import sirepo.util
+import sqlite3
+
+#: sqlite file located in `sirepo.srdb.supervisor_dir`
+_SQLITE3_BASENAME = "job.db"
+
+_JSON_RE = re.compile(rf"^(\w.+){sirepo.const.JSON_SUFFIX}$")
+
+_BACKENDS = ("json", "sqlite")
+
+_RUNNING_PENDING = (sirepo.job.RUNNING, sirepo.job.PENDING)
+
+_backend = None
+
+_cfg = None
+
+
+def init_module():
+    global _backend, _cfg
+
+    if _backend:
+        return
+    _cfg = pkconfig.init(
+        backend=(
+            "json",
+            _cfg_backend,
+            "how job state is stored: json (file per job) or sqlite (indexed table)",
+        ),
+    )
+    d = sirepo.srdb.supervisor_dir()
+    pykern.pkio.mkdir_parent(d)
+    _backend = PKDict(json=_Json, sqlite=_Sqlite)[_cfg.backend](d)
+
+
+def is_indexed():
+    """Whether `running_pending` is a cheap query
+
+    Returns:
+        bool: True if backend maintains indexes
+    """
+    return _backend.IS_INDEXED
+
+
+def load(compute_jid):
+    """Read job state
+
+    Args:
+        compute_jid (str): job
+    Returns:
+        PKDict: db or None if not found
+    """
+    return _backend.load(compute_jid)
+
+
+async def purge_candidates(too_old, exclude_uids, exclude_jids):
+    """Jobs which have not been updated since `too_old`
+
+    Args:
+        too_old (float): dbUpdateTime cutoff (inclusive)
+        exclude_uids (set): users whose jobs are never purged
+        exclude_jids (set): jobs already purged
+    Returns:
+        PKDict: uid to list of computeJids
+    """
+    rv = PKDict()
+    for u, j in await _backend.purge_candidates(too_old):
+        if u in exclude_uids or j in exclude_jids:
+            continue
+        rv.setdefault(u, []).append(j)
+    return rv
+
+
+def running_pending(uid=None):
+    """Jobs in a running or pending state
+
+    Only supported by indexed backends, since the directory
+    walk is too expensive to do on demand.
+
+    Args:
+        uid (str): restrict to user [None]
+    Returns:
+        list: dbs or None if not `is_indexed`
+    """
+    return _backend.running_pending(uid)
+
+
+def write(db):
+    """Save job state
+
+    Args:
+        db (PKDict): job state with computeJid
+    """
+    _backend.write(db)
+
+
+class _Json(PKDict):
+    IS_INDEXED = False
+
+    def __init__(self, db_dir):
+        super().__init__(_dir=db_dir)
+
+    def load(self, compute_jid):
+        p = self._path(compute_jid)
+        try:
+            d = p.read_binary()
+        except Exception as e:
+            if pykern.pkio.exception_is_not_found(e):
+                return None
+            raise
+        rv = pkjson.load_any(d)
+        if "dbUpdateTime" not in rv:
+            rv.dbUpdateTime = float(p.mtime())
+        return rv
+
+    async def purge_candidates(self, too_old):
+        rv = []
+        for e in await aiofiles.os.scandir(self._dir):
+            m = _JSON_RE.search(e.name)
+            if not m:
+                continue
+            if e.stat(follow_symlinks=False).st_mtime <= too_old:
+                j = m.group(1)
+                rv.append((sirepo.job.split_jid(jid=j).uid, j))
+        return rv
+
+    def running_pending(self, uid):
+        return None
+
+    def write(self, db):
+        sirepo.util.json_dump(db, path=self._path(db.computeJid))
+
+    def _path(self, compute_jid):
+        return self._dir.join(
+            sirepo.simulation_db.assert_sim_db_basename(compute_jid)
+            + sirepo.const.JSON_SUFFIX,
+        )
+
+
+class _Sqlite(PKDict):
+    IS_INDEXED = True
+
+    def __init__(self, db_dir):
+        super().__init__(_dir=db_dir)
+        # Supervisor is single threaded; autocommit so every write is durable
+        self._conn = sqlite3.connect(
+            str(db_dir.join(_SQLITE3_BASENAME)),
+            isolation_level=None,
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS job (
+                computeJid TEXT PRIMARY KEY NOT NULL,
+                uid TEXT NOT NULL,
+                status TEXT NOT NULL,
+                lastUpdateTime INTEGER NOT NULL,
+                dbUpdateTime REAL NOT NULL,
+                content TEXT NOT NULL
+            )""",
+        )
+        for c in "uid", "status", "lastUpdateTime", "dbUpdateTime":
+            self._conn.execute(f"CREATE INDEX IF NOT EXISTS job_{c} ON job ({c})")
+        if self._conn.execute("SELECT COUNT(*) FROM job").fetchone()[0] == 0:
+            self._import_json()
+
+    def load(self, compute_jid):
+        r = self._conn.execute(
+            "SELECT content FROM job WHERE computeJid = ?",
+            (compute_jid,),
+        ).fetchone()
+        return pkjson.load_any(r[0]) if r else None
+
+    async def purge_candidates(self, too_old):
+        return self._conn.execute(
+            "SELECT uid, computeJid FROM job WHERE dbUpdateTime <= ? AND status != ?",
+            (too_old, sirepo.job.JOB_RUN_PURGED),
+        ).fetchall()
+
+    def running_pending(self, uid):
+        q = "SELECT content FROM job WHERE status IN (?, ?)"
+        a = _RUNNING_PENDING
+        if uid:
+            q += " AND uid = ?"
+            a += (uid,)
+        return [pkjson.load_any(r[0]) for r in self._conn.execute(q, a)]
+
+    def write(self, db):
+        self._conn.execute(
+            """INSERT OR REPLACE INTO job
+            (computeJid, uid, status, lastUpdateTime, dbUpdateTime, content)
+            VALUES (?, ?, ?, ?, ?, ?)""",
+            (
+                db.computeJid,
+                db.uid,
+                db.status,
+                db.lastUpdateTime or 0,
+                db.dbUpdateTime,
+                pkjson.dump_str(db),
+            ),
+        )
+
+    def _import_json(self):
+        """One time migration from `_Json` files"""
+        j = _Json(self._dir)
+        n = 0
+        for p in pykern.pkio.sorted_glob(
+            self._dir.join("*" + sirepo.const.JSON_SUFFIX)
+        ):
+            try:
+                d = j.load(p.purebasename)
+                # old files may not have all the indexed fields
+                d.setdefault("lastUpdateTime", 0)
+                self.write(d)
+                n += 1
+            except Exception as e:
+                pkdlog("ignoring path={} error={} stack={}", p, e, pkdexc())
+        if n:
+            pkdlog("imported {} json files from dir={}", n, self._dir)
+
+
+def _cfg_backend(value):
+    if value not in _BACKENDS:
+        pkconfig.raise_error(f"must be one of {_BACKENDS}")
+    return value
@@ -0,0 +1,110 @@
+"""In-process counters, gauges, and timings
+
+Values accumulate per process. `start_logging` logs a snapshot
+periodically so operators can track them without a metrics server.
+
+:copyright: Copyright (c) 2026 RadiaSoft LLC.  All Rights Reserved.
+:license: http://www.apache.org/licenses/LICENSE-2.0.html
+"""
+
+from pykern import pkconfig
+from pykern.pkcollections import PKDict
+from pykern.pkdebug import pkdc, pkdexc, pkdlog, pkdp
+import contextlib
+import copy
+import time
+import tornado.ioloop
+
+_cfg = None
+
+_values = PKDict()
+
+_logging = False
+
+
+def gauge(name, value):
+    """Set current value
+
+    Args:
+        name (str): metric
+        value (number): current value
+    """
+    _values[name] = value
+
+
+def inc(name, value=1):
+    """Increment a counter
+
+    Args:
+        name (str): metric
+        value (number): amount [1]
+    """
+    _values[name] = _values.get(name, 0) + value
+
+
+def start_logging():
+    """Log `values` every ``log_secs`` on the current IOLoop"""
+    global _logging
+
+    if _logging or not _cfg.log_secs:
+        return
+    _logging = True
+    tornado.ioloop.IOLoop.current().call_later(_cfg.log_secs, _log)
+
+
+@contextlib.contextmanager
+def timer(name):
+    """Time the block and record with `timing`
+
+    Args:
+        name (str): metric
+    """
+    s = time.perf_counter()
+    try:
+        yield
+    finally:
+        timing(name, time.perf_counter() - s)
+
+
+def timing(name, secs):
+    """Record a duration
+
+    Args:
+        name (str): metric
+        secs (float): elapsed time
+    """
+    v = _values.get(name)
+    if v is None:
+        v = _values[name] = PKDict(count=0, maxSecs=0.0, totalSecs=0.0)
+    v.count += 1
+    v.totalSecs += secs
+    if secs > v.maxSecs:
+        v.maxSecs = secs
+
+
+def values():
+    """Snapshot of all metrics
+
+    Returns:
+        PKDict: copy of values
+    """
+    return copy.deepcopy(_values)
+
+
+def _init():
+    global _cfg
+
+    _cfg = pkconfig.init(
+        log_secs=(0, int, "how often to log metrics (0 is never)"),
+    )
+
+
+def _log():
+    try:
+        pkdlog("{}", values())
+    except Exception as e:
+        pkdlog("error={} stack={}", e, pkdexc())
+    tornado.ioloop.IOLoop.current().call_later(_cfg.log_secs, _log)
+
+
+_init()
@@ -2915,6 +2915,12 @@ SIREPO.app.directive('radiaViewerContent', function(appState, geometry, panelSta
                 cachedDisplayVals = appState.clone(getDisplayVals());
                 $rootScope.$broadcast('radiaViewer.loaded');
                 $rootScope.$broadcast('vtk.hideLoader');
+                // field vectors may be typed arrays (see radia._vectors_reply)
+                for (const d of data.data || []) {
+                    if (d.vectors) {
+                        SIREPO.UTILS.decodeTypedArrays(d.vectors);
+                    }
+                }
                 sceneData = data;
                 buildScene();
                 if (! initDone) {
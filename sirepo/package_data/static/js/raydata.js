@@ -1329,8 +1329,12 @@ SIREPO.app.directive('queueOrder', function() {
                   class="glyphicon glyphicon-step-forward"></span>
               </button>
             </span>
+            <button data-ng-show="isActive()" type="button" class="btn btn-default btn-xs"
+              title="Cancel analysis" data-ng-click="cancelAnalysis()"><span
+                class="glyphicon glyphicon-remove"></span>
+            </button>
         `,
-        controller: function(appState, requestSender, $scope) {
+        controller: function(appState, raydataService, requestSender, $scope) {
             $scope.buttons = [
                 {
                     title: 'Move to end of queue',
@@ -1360,6 +1364,22 @@ SIREPO.app.directive('queueOrder', function() {
                     },
                 );
             }
+
+            $scope.cancelAnalysis = () => {
+                requestSender.sendStatelessCompute(
+                    appState,
+                    () => $scope.refreshScans(),
+                    {
+                        method: 'cancel_analysis',
+                        args: {
+                            catalogName: appState.models.catalog.catalogName,
+                            rduid: $scope.scan.rduid,
+                        }
+                    },
+                );
+            };
+
+            $scope.isActive = () => raydataService.ANALYSIS_STATUS_NON_STOPPED.includes($scope.scan.status);
         },
     };
 });
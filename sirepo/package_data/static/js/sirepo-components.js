@@ -3766,6 +3766,8 @@ SIREPO.app.directive('jobsList', function(requestSender, appState, $location) {
                 'elapsedTime',
                 'statusMessage',
                 'queuedTime',
+                'queuePosition',
+                'estimatedWait',
                 'driverDetails',
                 'activePlan'
             ] : [
@@ -3798,6 +3800,9 @@ SIREPO.app.directive('jobsList', function(requestSender, appState, $location) {
                     Time: appState.formatTime,
                     String: function(s){return s;},
                 };
+                if (job[key] === null || job[key] === undefined) {
+                    return '';
+                }
                 return typeDispatch[$scope.data.header[key].type](job[key]);
             };
 
@@ -31,6 +31,36 @@ class SirepoUtils {
         return s.charAt(0).toUpperCase() + s.slice(1);
     }
 
+    // Inverse of sirepo.template.template_common.encode_typed_arrays
+    static decodeTypedArrays(data) {
+        // POSIT: same as sirepo.template.template_common._TYPED_ARRAYS
+        const typedArrays = {float32: Float32Array, float64: Float64Array};
+        const reshape = (values, shape) => {
+            if (shape.length <= 1) {
+                return Array.from(values);
+            }
+            const n = values.length / shape[0];
+            const res = [];
+            for (let i = 0; i < shape[0]; i++) {
+                res.push(reshape(values.subarray(i * n, (i + 1) * n), shape.slice(1)));
+            }
+            return res;
+        };
+
+        for (const [k, v] of Object.entries(data)) {
+            if (! (v && typeof v === 'object' && v.typedArray)) {
+                continue;
+            }
+            // websocket replies are bytes, http replies are base64
+            const b = typeof v.data === 'string'
+                ? Uint8Array.from(atob(v.data), (c) => c.charCodeAt(0))
+                : v.data;
+            // slice copies so the buffer is aligned; values are little-endian
+            data[k] = reshape(new typedArrays[v.typedArray](b.slice().buffer), v.shape);
+        }
+        return data;
+    }
+
     static orderOfMagnitude(val, binary=false) {
         const MAGS = ['', 'k', 'M', 'G', 'T', 'P', 'E'];
         const v = Math.abs(val);
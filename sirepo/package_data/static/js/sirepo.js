@@ -476,6 +476,10 @@ SIREPO.app.factory('appState', function(errorService, fileManager, msgRouter, re
             QUEUE_NAME,
             function() {
                 self.resetAutoSaveTimer();
+                // server only validates the models which changed since the last save
+                lastAutoSaveData.changedModels = Object.keys(savedModelValues).filter(
+                    m => ! self.deepEquals(savedModelValues[m], lastAutoSaveData.models[m])
+                );
                 lastAutoSaveData.models = self.clone(savedModelValues);
                 return {
                     urlOrParams: 'saveSimulationData',
@@ -1906,6 +1910,7 @@ SIREPO.app.factory('frameCache', function(appState, panelState, requestSender, s
                     {
                         routeName: 'simulationFrame',
                         frame_id: id,
+                        typed_arrays: true,
                     },
                     (data) => {
                         cancelLoadingTimer();
@@ -1913,6 +1918,7 @@ SIREPO.app.factory('frameCache', function(appState, panelState, requestSender, s
                             onError();
                         }
                         else {
+                            SIREPO.UTILS.decodeTypedArrays(data);
                             callbackData(data, frameRequestTime);
                             srCache.saveFrame(id, modelKey, data);
                         }
@@ -3532,9 +3538,11 @@ SIREPO.app.factory('requestSender', function(browserStorage, errorService, utili
     return self;
 });
 
-SIREPO.app.factory('simulationQueue', function($rootScope, $interval, requestSender) {
+SIREPO.app.factory('simulationQueue', function($rootScope, $interval, msgRouter, requestSender) {
     var self = {};
     var runQueue = [];
+    // runStatusSubscription.id to {qi, process, resp}
+    const subscriptions = {};
 
     function addItem(report, models, responseHandler, qMode) {
         models = angular.copy(models);
@@ -3552,6 +3560,8 @@ SIREPO.app.factory('simulationQueue', function($rootScope, $interval, requestSen
                 models: models,
                 simulationType: SIREPO.APP_SCHEMA.simulationType,
                 simulationId: models.simulation.simulationId,
+                // replies are decoded in handleResult
+                typedArrays: true,
             },
             responseHandler: responseHandler,
         };
@@ -3589,6 +3599,8 @@ SIREPO.app.factory('simulationQueue', function($rootScope, $interval, requestSen
     function handleResult(qi, resp) {
         qi.qState = 'done';
         self.removeItem(qi);
+        // sequential results may contain typed arrays (see job_cmd._do_sequential_result)
+        SIREPO.UTILS.decodeTypedArrays(resp);
         qi.responseHandler(resp);
         runFirstTransientItem();
     }
@@ -3608,17 +3620,42 @@ SIREPO.app.factory('simulationQueue', function($rootScope, $interval, requestSen
         );
     }
 
+    function removeSubscription(qi) {
+        if (qi.subscriptionId) {
+            delete subscriptions[qi.subscriptionId];
+            qi.subscriptionId = null;
+        }
+    }
+
     function runItem(qi) {
         var handleStatus = function(qi, resp) {
-            qi.request = resp.nextRequest;
+            qi.request = {...resp.nextRequest, typedArrays: true};
+            cancelInterval(qi);
+            let r = 'runStatus';
+            // Sanity check in case of defect on server
+            let s = Math.max(1, resp.nextRequestSeconds);
+            const x = resp.runStatusSubscription;
+            if (x) {
+                // server pushes changes; poll only if the pushes stop
+                if (qi.subscriptionId !== x.id) {
+                    removeSubscription(qi);
+                    qi.subscriptionId = x.id;
+                    subscriptions[x.id] = {qi: qi, process: process, resp: resp};
+                }
+                r = 'runStatusSubscribe';
+                s = x.fallbackSeconds;
+            }
+            else if (SIREPO.authState.uiWebSocket && ! qi.runStatusSubscribeSent) {
+                qi.runStatusSubscribeSent = true;
+                r = 'runStatusSubscribe';
+                s = 0;
+            }
             qi.interval = $interval(
                 function () {
                     qi.runStatusCount++;
-                    requestSender.sendRequest(
-                        'runStatus', process, qi.request, process);
+                    requestSender.sendRequest(r, process, qi.request, process);
                 },
-                // Sanity check in case of defect on server
-                Math.max(1, resp.nextRequestSeconds) * 1000,
+                s * 1000,
                 1
             );
             if (qi.persistent) {
@@ -3685,6 +3722,7 @@ SIREPO.app.factory('simulationQueue', function($rootScope, $interval, requestSen
             return;
         }
         qi.qState = 'removing';
+        removeSubscription(qi);
         var i = runQueue.indexOf(qi);
         if (i > -1) {
             runQueue.splice(i, 1);
@@ -3697,6 +3735,20 @@ SIREPO.app.factory('simulationQueue', function($rootScope, $interval, requestSen
 
     $rootScope.$on('clearCache', self.cancelTransientItems);
 
+    msgRouter.registerAsyncMsg('runStatusUpdate', (content) => {
+        const x = subscriptions[content.subscriptionId];
+        if (! x) {
+            // removed or replaced by a newer subscription
+            return;
+        }
+        Object.assign(x.resp, content.changed);
+        for (const k of content.removed) {
+            delete x.resp[k];
+        }
+        x.qi.runStatusCount++;
+        x.process(angular.copy(x.resp));
+    });
+
     return self;
 });
 
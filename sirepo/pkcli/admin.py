@@ -143,6 +143,32 @@ def move_user_sims(uid):
             continue
         pkdlog(lib_file)
         shutil.move(lib_file, target)
+    # indexes are rebuilt on next use
+    for t in set(os.path.dirname(d) for d in sim_dirs):
+        for d in t, f"../{uid}/{t}":
+            pkio.unchecked_remove(os.path.join(d, simulation_db.SIM_INDEX_BASENAME))
+
+
+def rebuild_simulation_index(*uid):
+    """Rebuild users' simulation indexes including lib file references
+
+    Backfills the index used by lib file in use checks.
+
+    Args:
+        *uid: UID(s) of the user(s) to index. If None, all users will be indexed.
+    """
+    with sirepo.quest.start() as qcall:
+        for u in uid or qcall.auth_db.all_uids():
+            with qcall.auth.logged_in_user_set(u):
+                for t in sorted(feature_config.cfg().sim_types):
+                    if not simulation_db.user_path(qcall=qcall).join(t).exists():
+                        continue
+                    pkdlog(
+                        "uid={} sim_type={} simulations={}",
+                        u,
+                        t,
+                        simulation_db.rebuild_simulation_index(t, qcall=qcall),
+                    )
 
 
 def reset_examples():
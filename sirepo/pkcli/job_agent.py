@@ -11,6 +11,7 @@ from pykern.pkcollections import PKDict
 from pykern.pkdebug import pkdlog, pkdp, pkdexc, pkdc, pkdformat
 from sirepo import job
 from sirepo.template import template_common
+import collections
 import copy
 import datetime
 import os
@@ -18,6 +19,8 @@ import re
 import signal
 import sirepo.const
 import sirepo.feature_config
+import sirepo.job_frame
+import sirepo.job_placement
 import sirepo.modules
 import sirepo.nersc
 import sirepo.tornado
@@ -31,6 +34,7 @@ import tornado.iostream
 import tornado.locks
 import tornado.netutil
 import tornado.process
+import tornado.util
 import tornado.websocket
 
 
@@ -55,6 +59,9 @@ _SBATCH_STATUS_FILE = "sbatch_status.json"
 
 _MIN_SBATCH_POLL_SECS = 5
 
+#: Slurm rate limits RPCs so back off while nothing changes
+_MAX_SBATCH_PENDING_POLL_SECS = 60
+
 _MAX_SBATCH_QUERY_TRIES = 5
 
 _cfg = None
@@ -82,6 +89,11 @@ def start():
             pkio.py_path,
             "directory of fastcfgi socket, must be less than 50 chars",
         ),
+        load_report_secs=(
+            0,
+            pkconfig.parse_seconds,
+            "how often to send host load to the supervisor (0 only on connect)",
+        ),
         mpich_shm_clean_up=(False, bool, "mpich4 orphans shm; see sirepo#7741"),
         no_hdf5_do_mpi_file_sync=(False, bool, "turn off hdf5 file sync"),
         start_delay=(0, pkconfig.parse_seconds, "delay startup in internal_test mode"),
@@ -120,6 +132,8 @@ def start():
     signal.signal(signal.SIGTERM, s)
     signal.signal(signal.SIGINT, s)
     i.spawn_callback(d.loop)
+    if _cfg.load_report_secs:
+        i.spawn_callback(d.load_report)
     i.start()
 
 
@@ -182,14 +196,37 @@ class _Dispatcher(PKDict):
     def __init__(self):
         super().__init__(
             cmds=[],
-            fastcgi_cmd=None,
             fastcgi_error_count=0,
+            fastcgi_workers=[],
+            sbatch_poller=_SbatchPoller(),
+            _fastcgi_pending=collections.deque(),
+            _fastcgi_worker_count=0,
         )
 
-    def fastcgi_destroy(self):
-        self._fastcgi_file and pkio.unchecked_remove(self._fastcgi_file)
-        self._fastcgi_file = None
-        self.fastcgi_cmd = None
+    async def fastcgi_dispatch(self):
+        """Assign pending fastcgi msgs to idle workers
+
+        Prefers a worker which has already imported the msg's
+        template. Starts workers up to ``job.cfg().fastcgi_workers``.
+        """
+        while self._fastcgi_pending:
+            w = self._fastcgi_idle_worker(
+                self._fastcgi_pending[0].get("simulationType"),
+            )
+            m = None
+            if w is None:
+                if len(self.fastcgi_workers) >= job.cfg().fastcgi_workers:
+                    return
+                m = self._fastcgi_pending.popleft()
+                self._fastcgi_worker_count += 1
+                w = _FastCgiWorker(dispatcher=self, index=self._fastcgi_worker_count)
+                # Reserve before await so another dispatch does not assign it
+                w.msg = m
+                self.fastcgi_workers.append(w)
+                if not await w.start(m):
+                    # w.destroy replied to m
+                    continue
+            w.assign(m or self._fastcgi_pending.popleft())
 
     def format_canceled(self, msg):
         return self.format_op(msg, job.OP_OK, reply=PKDict(state=job.CANCELED))
@@ -202,7 +239,9 @@ class _Dispatcher(PKDict):
             raise AssertionError("missing opName in msg")
         return rv
 
-    async def job_cmd_reply(self, msg, op_name, text=None, cmd=None, msg_items=None):
+    async def job_cmd_reply(
+        self, msg, op_name, text=None, cmd=None, msg_items=None, reply=None
+    ):
         def _fixup(reply):
             rv = PKDict(**msg_items) if msg_items else PKDict()
             if msg.opName in (job.OP_RUN, job.OP_RUN_STATUS):
@@ -224,6 +263,8 @@ class _Dispatcher(PKDict):
             return rv
 
         def _parse_text():
+            if reply is not None:
+                return reply
             if text is None:
                 return PKDict()
             try:
@@ -245,6 +286,13 @@ class _Dispatcher(PKDict):
             # something is really wrong, because format_op is messed up
             raise
 
+    async def load_report(self):
+        """Resend ALIVE with the host's load for placement"""
+        while True:
+            await tornado.gen.sleep(_cfg.load_report_secs)
+            if self._websocket:
+                await self.send(self._format_alive())
+
     async def loop(self):
         async def _connect_and_loop():
             self._websocket = await tornado.websocket.websocket_connect(
@@ -257,7 +305,7 @@ class _Dispatcher(PKDict):
                 ping_interval=job.cfg().ping_interval_secs,
                 ping_timeout=job.cfg().ping_timeout_secs,
             )
-            s = self.format_op(None, job.OP_ALIVE)
+            s = self._format_alive()
             rv = False
             while True:
                 if s and not await self.send(s):
@@ -360,125 +408,35 @@ class _Dispatcher(PKDict):
                 job.OP_ERROR,
                 reply=PKDict(runDirNotFound=True),
             )
-        if msg.jobCmd == "fastcgi":
-            self.fastcgi_cmd = c
         try:
             return c.start()
         except Exception as e:
             pkdlog("start exception={} stack={}", e, pkdexc())
             c.destroy()
 
-    def _fastcgi_accept(self, connection, *args, **kwargs):
-        # Impedence mismatch: _fastcgi_accept cannot be async, because
-        # bind_unix_socket doesn't await the callable.
-        _call_later_0(self._fastcgi_loop, connection)
-
-    async def _fastcgi_handle_error(self, msg, error, stack=None):
-        async def _reply_error(msg):
-            try:
-                await self.send(
-                    self.format_op(
-                        msg,
-                        job.OP_ERROR,
-                        error=error,
-                        reply=PKDict(
-                            state=job.ERROR,
-                            error="internal error",
-                            fastCgiErrorCount=self.fastcgi_error_count,
-                            stack=stack,
-                        ),
-                    )
-                )
-            except Exception as e:
-                pkdlog("msg={} error={} stack={}", msg, e, pkdexc())
-
-        # destroy _fastcgi state first, then send replies to avoid
-        # asynchronous modification of _fastcgi state.
-        self.fastcgi_error_count += 1
-        self._fastcgi_remove_handler()
-        q = self._fastcgi_msg_q
-        self._fastcgi_msg_q = None
-        self.fastcgi_cmd.destroy()
-        if msg:
-            await _reply_error(msg)
-        while q.qsize() > 0:
-            await _reply_error(q.get_nowait())
-            q.task_done()
+    def _fastcgi_idle_worker(self, sim_type):
+        rv = None
+        for w in self.fastcgi_workers:
+            if w.msg is None:
+                if sim_type in w.sim_types:
+                    return w
+                rv = rv or w
+        return rv
 
     async def _fastcgi_op(self, msg):
         if msg.runDir:
             _assert_run_dir_exists(pkio.py_path(msg.runDir))
-        if not self.fastcgi_cmd:
-            m = copy.deepcopy(msg)
-            m.jobCmd = "fastcgi"
-            self._fastcgi_file = _cfg.fastcgi_sock_dir.join(
-                f"sirepo_job_cmd-{_cfg.agent_id:8}.sock",
-            )
-            self._fastcgi_msg_q = sirepo.tornado.Queue(1)
-            pkio.unchecked_remove(self._fastcgi_file)
-            m.fastcgiFile = self._fastcgi_file
-            # Runs in an agent's directory and chdirs to real runDirs.
-            # Except in stateless_compute which doesn't interact with the db.
-            m.runDir = pkio.py_path()
-            # Kind of backwards, but it makes sense since we need to listen
-            # so _do_fastcgi can connect
-            self._fastcgi_remove_handler = tornado.netutil.add_accept_handler(
-                tornado.netutil.bind_unix_socket(str(self._fastcgi_file)),
-                self._fastcgi_accept,
-            )
-            # last thing, because of await: start fastcgi process
-            await self._cmd(m, send_reply=False)
-            if not self._fastcgi_msg_q:
-                return self.format_op(
-                    msg,
-                    job.ERROR,
-                    reply=PKDict(state=job.ERROR, error="fastcgi process got an error"),
-                )
         if msg.jobCmd == "fastcgi":
             raise AssertionError("fastcgi called within fastcgi")
-        self._fastcgi_msg_q.put_nowait(msg)
-        # For better logging, msg.opId is used in format_op (reply)
-        # Also used in op_cancel so a cancel, cancels the fastcgi process
-        self.fastcgi_cmd.op_id = msg.opId
+        self._fastcgi_pending.append(msg)
+        await self.fastcgi_dispatch()
         return None
 
-    async def _fastcgi_loop(self, connection):
-        s = None
-        m = None
-        try:
-            s = tornado.iostream.IOStream(
-                connection,
-                max_buffer_size=job.cfg().max_message_bytes,
-            )
-            while True:
-                m = await self._fastcgi_msg_q.get()
-                # Avoid issues with exceptions. We don't use q.join()
-                # so not an issue to call before work is done.
-                self._fastcgi_msg_q.task_done()
-                await s.write(pkjson.dump_bytes(m) + b"\n")
-                await self.job_cmd_reply(
-                    m,
-                    job.OP_OK,
-                    text=await s.read_until(b"\n", job.cfg().max_message_bytes),
-                )
-
-        except Exception as e:
-            if isinstance(e, tornado.iostream.StreamClosedError):
-                pkdlog(
-                    "msg={} stream closed unexpectedly exception={} real_error={}",
-                    m,
-                    e,
-                    getattr(e, "real_error", None),
-                )
-            else:
-                pkdlog("msg={} error={} stack={}", m, e, pkdexc())
-            # If self.fastcgi_cmd is None we initiated the kill so not an error
-            if not self.fastcgi_cmd:
-                return
-            await self._fastcgi_handle_error(m, e, pkdexc())
-        finally:
-            if s:
-                s.close()
+    def _format_alive(self):
+        # only drivers which place agents (docker) ask for the load
+        if not _cfg.load_report_secs:
+            return self.format_op(None, job.OP_ALIVE)
+        return self.format_op(None, job.OP_ALIVE, load=sirepo.job_placement.live_load())
 
     async def _op(self, msg):
         m = None
@@ -624,8 +582,6 @@ class _Cmd(PKDict):
 
         if self._destroying:
             return
-        if self.dispatcher.fastcgi_cmd == self:
-            self.dispatcher.fastcgi_destroy()
         self._destroying = True
         self._terminating = terminating
         if "_in_file" in self:
@@ -799,7 +755,230 @@ class _Cmd(PKDict):
 
 
 class _FastCgiCmd(_Cmd):
-    pass
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.fastcgi_worker.cmd = self
+
+    def cancel_request(self):
+        # Cancels the worker's current msg so no error reply
+        self.fastcgi_worker.msg = None
+        super().cancel_request()
+
+    def destroy(self, terminating=False):
+        super().destroy(terminating=terminating)
+        self.fastcgi_worker.destroy()
+
+
+class _FastCgiWorker(PKDict):
+    """A job_cmd fastcgi process which serves analysis and io msgs
+
+    The process imports sirepo once and keeps templates imported
+    between msgs. It serves one msg at a time so the dispatcher runs up
+    to ``job.cfg().fastcgi_workers`` workers. A worker is replaced
+    after ``fastcgi_max_requests`` msgs or when its memory grows by
+    ``fastcgi_max_rss_growth`` since its first msg.
+    """
+
+    def __init__(self, dispatcher, index):
+        super().__init__(
+            cmd=None,
+            dispatcher=dispatcher,
+            msg=None,
+            requests=0,
+            sim_types=set(),
+            _destroyed=False,
+            _error=None,
+            _error_stack=None,
+            _file=_cfg.fastcgi_sock_dir.join(
+                f"sirepo_job_cmd-{_cfg.agent_id:8}-{index}.sock",
+            ),
+            _msg_q=sirepo.tornado.Queue(1),
+            _remove_handler=None,
+            _rss_start=None,
+            _socket=None,
+        )
+
+    def assign(self, msg):
+        self.msg = msg
+        if t := msg.get("simulationType"):
+            self.sim_types.add(t)
+        self._msg_q.put_nowait(msg)
+        # For better logging, msg.opId is used in format_op (reply)
+        # Also used in op_cancel so a cancel, cancels the fastcgi process
+        self.cmd.op_id = msg.opId
+
+    def destroy(self):
+        if self._destroyed:
+            return
+        self._destroyed = True
+        pkdlog("{}", self)
+        if self._remove_handler:
+            self._remove_handler()
+            self._socket.close()
+        pkio.unchecked_remove(self._file)
+        try:
+            self.dispatcher.fastcgi_workers.remove(self)
+        except ValueError:
+            pass
+        if self.cmd:
+            self.pkdel("cmd").destroy()
+        if self.msg:
+            _call_later_0(self._reply_error, self.pkdel("msg"))
+        elif self._msg_q.empty():
+            # wake _loop so it closes its stream
+            self._msg_q.put_nowait(None)
+        _call_later_0(self.dispatcher.fastcgi_dispatch)
+
+    def pkdebug_str(self):
+        return pkdformat(
+            "{}(file={} requests={} sim_types={})",
+            self.__class__.__name__,
+            self._file.basename,
+            self.requests,
+            sorted(self.sim_types),
+        )
+
+    async def start(self, msg):
+        m = copy.deepcopy(msg)
+        m.jobCmd = "fastcgi"
+        pkio.unchecked_remove(self._file)
+        m.fastcgiFile = self._file
+        # Runs in an agent's directory and chdirs to real runDirs.
+        # Except in stateless_compute which doesn't interact with the db.
+        m.runDir = pkio.py_path()
+        # Kind of backwards, but it makes sense since we need to listen
+        # so _do_fastcgi can connect
+        self._socket = tornado.netutil.bind_unix_socket(str(self._file))
+        self._remove_handler = tornado.netutil.add_accept_handler(
+            self._socket,
+            self._accept,
+        )
+        # last thing, because of await: start fastcgi process
+        await self.dispatcher._cmd(m, send_reply=False, fastcgi_worker=self)
+        return not self._destroyed
+
+    def _accept(self, connection, *args, **kwargs):
+        # Impedence mismatch: _accept cannot be async, because
+        # bind_unix_socket doesn't await the callable.
+        _call_later_0(self._loop, connection)
+
+    def _done(self):
+        def _recycle():
+            c = job.cfg()
+            if c.fastcgi_max_requests and self.requests >= c.fastcgi_max_requests:
+                return "max_requests"
+            if not c.fastcgi_max_rss_growth or not (r := self._rss()):
+                return None
+            if self._rss_start is None:
+                # templates are imported by the first msg
+                self._rss_start = r
+            elif r - self._rss_start > c.fastcgi_max_rss_growth:
+                return f"rss={r} start={self._rss_start}"
+            return None
+
+        self.msg = None
+        self.requests += 1
+        if x := _recycle():
+            pkdlog("{} recycle {}", self, x)
+            self.destroy()
+        else:
+            _call_later_0(self.dispatcher.fastcgi_dispatch)
+
+    async def _loop(self, connection):
+        async def _reply(stream):
+            e, n = sirepo.job_frame.parse_header(
+                await stream.read_bytes(sirepo.job_frame.HEADER_SIZE),
+                job.cfg().max_message_bytes,
+            )
+            b = bytearray(n)
+            await stream.read_into(b)
+            try:
+                return sirepo.job_frame.decode(e, b)
+            except Exception as x:
+                pkdlog("error={} decoding job_cmd reply", x)
+                return PKDict(
+                    state=job.ERROR,
+                    error="unable to parse job_cmd output",
+                    op_name=job.ERROR,
+                )
+
+        s = None
+        m = None
+        f = (
+            sirepo.job_frame.MSGPACK
+            if job.cfg().fastcgi_msgpack
+            else sirepo.job_frame.JSON
+        )
+        try:
+            s = tornado.iostream.IOStream(
+                connection,
+                max_buffer_size=job.cfg().max_message_bytes,
+            )
+            while True:
+                m = await self._msg_q.get()
+                # Avoid issues with exceptions. We don't use q.join()
+                # so not an issue to call before work is done.
+                self._msg_q.task_done()
+                if self._destroyed:
+                    return
+                await s.write(sirepo.job_frame.encode(m, f))
+                r = await _reply(s)
+                if self._destroyed:
+                    return
+                self._done()
+                await self.dispatcher.job_cmd_reply(m, job.OP_OK, reply=r)
+                # recycled by _done
+                if self._destroyed:
+                    return
+        except Exception as e:
+            if isinstance(e, tornado.iostream.StreamClosedError):
+                pkdlog(
+                    "{} msg={} stream closed unexpectedly exception={} real_error={}",
+                    self,
+                    m,
+                    e,
+                    getattr(e, "real_error", None),
+                )
+            else:
+                pkdlog("{} msg={} error={} stack={}", self, m, e, pkdexc())
+            # If destroyed, we initiated the kill so not an error
+            if self._destroyed:
+                return
+            self.dispatcher.fastcgi_error_count += 1
+            self._error = e
+            self._error_stack = pkdexc()
+            self.destroy()
+        finally:
+            if s:
+                s.close()
+
+    async def _reply_error(self, msg):
+        try:
+            await self.dispatcher.send(
+                self.dispatcher.format_op(
+                    msg,
+                    job.OP_ERROR,
+                    error=self._error,
+                    reply=PKDict(
+                        state=job.ERROR,
+                        error="internal error",
+                        fastCgiErrorCount=self.dispatcher.fastcgi_error_count,
+                        stack=self._error_stack,
+                    ),
+                )
+            )
+        except Exception as e:
+            pkdlog("msg={} error={} stack={}", msg, e, pkdexc())
+
+    def _rss(self):
+        try:
+            return int(
+                pkio.read_text(
+                    f"/proc/{self.cmd._process._subprocess.proc.pid}/statm"
+                ).split()[1]
+            ) * os.sysconf("SC_PAGE_SIZE")
+        except Exception:
+            return None
 
 
 class _OpMsg(PKDict):
@@ -1139,10 +1318,7 @@ class _SbatchRunStatus(_SbatchCmd):
         )
         super().__init__(**kwargs)
         self.pkdel("computeJobStart")
-        self.pkupdate(
-            _sbatch_status_cb=None,
-            _sbatch_query_tries=0,
-        )
+        self.pkupdate(_sbatch_query_tries=0)
 
     def destroy(self, terminating=False):
         def _scancel(sbatch_id):
@@ -1166,9 +1342,7 @@ class _SbatchRunStatus(_SbatchCmd):
 
         if self._destroying:
             return
-        if self._sbatch_status_cb:
-            self._sbatch_status_cb.stop()
-            self._sbatch_status_cb = None
+        self.dispatcher.sbatch_poller.remove(self)
         if (
             self._sbatch_status.job_cmd_state not in job.JOB_CMD_STATE_EXITS
             and self._sbatch_status.sbatch_id
@@ -1213,13 +1387,7 @@ class _SbatchRunStatus(_SbatchCmd):
         # Detach from op_run_status or op_run
         self.op_id = self.msg.opId = None
         super().start()
-        self._sbatch_status_cb = tornado.ioloop.PeriodicCallback(
-            self._sbatch_poll_query,
-            min(_MIN_SBATCH_POLL_SECS, self.msg.nextRequestSeconds) * 1000,
-        )
-        self._sbatch_status_cb.start()
-        # So happens right away
-        _call_later_0(self._sbatch_poll_query)
+        self.dispatcher.sbatch_poller.add(self)
         return None
 
     def _sbatch_is_not_running(self):
@@ -1264,7 +1432,12 @@ class _SbatchRunStatus(_SbatchCmd):
             return s.job_cmd_state
         return None
 
-    async def _sbatch_poll_query(self):
+    async def _sbatch_poll_query(self, state):
+        """Update from `_SbatchPoller`
+
+        Args:
+            state (str): job state or None if the query failed
+        """
 
         async def _sbatch_query_try_count_ok():
             if self._sbatch_query_tries < _MAX_SBATCH_QUERY_TRIES:
@@ -1303,13 +1476,10 @@ class _SbatchRunStatus(_SbatchCmd):
             if self._destroying:
                 return
             self._sbatch_query_tries += 1
-            if (
-                not (s := self._sbatch_query())
-                and not await _sbatch_query_try_count_ok()
-            ):
+            if not state and not await _sbatch_query_try_count_ok():
                 return
             self._sbatch_query_tries = 0
-            if _transition_state(self._sbatch_status.job_cmd_state, s):
+            if _transition_state(self._sbatch_status.job_cmd_state, state):
                 await self._sbatch_send_update()
         except Exception as e:
             pkdlog("program error, stopping exception={} stack={}", e, pkdexc())
@@ -1328,121 +1498,223 @@ class _SbatchRunStatus(_SbatchCmd):
                 pkdlog("unable to send, stopping exception={} stack={}", e, pkdexc())
             self.destroy()
 
-    def _sbatch_query(self):
-        def _sacct():
-            # Invalid job id specified (not running)
-            p = subprocess.run(
-                ("sacct", f"--jobs={self._sbatch_status.sbatch_id}", "--format=State"),
-                cwd=str(self.run_dir),
-                close_fds=True,
-                capture_output=True,
-                text=True,
+    async def _sbatch_send_update(self, text=None):
+        def _optional():
+            # parallelStatus only happens in the case we are at the end
+            rv = PKDict()
+            for f in "error", "parallelStatus", "computeJobStart":
+                # Will be overwritten if in "text"
+                if x := self._sbatch_status.get(f):
+                    rv[f] = x
+            return rv
+
+        await self.dispatcher.job_cmd_reply(
+            msg=self.msg,
+            op_name=job.OP_RUN_STATUS_UPDATE,
+            text=text,
+            cmd=self,
+            msg_items=_optional(),
+        )
+        if self._sbatch_status.job_cmd_state in job.EXIT_STATUSES:
+            self.destroy()
+
+
+class _SbatchPoller:
+    """Query slurm for all the sbatch jobs of this agent at once
+
+    One squeue (and one sacct for jobs which have left the queue) per
+    interval instead of one query per job. The results are fanned out
+    to each `_SbatchRunStatus`. The interval starts at the smaller of
+    `_MIN_SBATCH_POLL_SECS` and the jobs' nextRequestSeconds and
+    doubles while no job changes state up to nextRequestSeconds or,
+    when all jobs are pending, `_MAX_SBATCH_PENDING_POLL_SECS`. A
+    change or a new job resets the interval.
+    """
+
+    def __init__(self):
+        self._cmds = []
+        self._is_running = False
+        self._secs = _MIN_SBATCH_POLL_SECS
+        self._wake = tornado.locks.Event()
+
+    def add(self, cmd):
+        self._cmds.append(cmd)
+        self._secs = self._min_secs()
+        # So happens right away, coalesced with other new jobs
+        self._wake.set()
+        if not self._is_running:
+            self._is_running = True
+            tornado.ioloop.IOLoop.current().spawn_callback(self._loop)
+
+    def remove(self, cmd):
+        # not list.remove, because PKDicts compare by value
+        self._cmds = [c for c in self._cmds if c is not cmd]
+
+    async def _loop(self):
+        try:
+            while self._cmds:
+                self._wake.clear()
+                await self._poll()
+                try:
+                    await self._wake.wait(
+                        timeout=datetime.timedelta(seconds=self._secs),
+                    )
+                except tornado.util.TimeoutError:
+                    pass
+        finally:
+            self._is_running = False
+
+    def _min_secs(self):
+        return min(_MIN_SBATCH_POLL_SECS, self._next_request_secs())
+
+    def _next_request_secs(self):
+        return min(c.msg.nextRequestSeconds for c in self._cmds)
+
+    async def _poll(self):
+        c = list(self._cmds)
+        try:
+            s = self._sbatch_query(
+                sorted(set(x._sbatch_status.sbatch_id for x in c)),
+            )
+        except Exception as e:
+            pkdlog("sbatch query exception={} stack={}", e, pkdexc())
+            s = PKDict()
+        p = [x._sbatch_status.job_cmd_state for x in c]
+        for x in c:
+            if not x._destroying:
+                await x._sbatch_poll_query(s.get(x._sbatch_status.sbatch_id))
+        if not self._cmds:
+            return
+        if p != [x._sbatch_status.job_cmd_state for x in c] or any(
+            x._sbatch_status.sbatch_id not in s for x in c
+        ):
+            # failed queries are retried at the minimum interval
+            self._secs = self._min_secs()
+            return
+        n = self._next_request_secs()
+        self._secs = max(
+            self._min_secs(),
+            min(
+                self._secs * 2,
+                (
+                    max(n, _MAX_SBATCH_PENDING_POLL_SECS)
+                    if all(x == job.PENDING for x in p)
+                    else n
+                ),
+            ),
+        )
+
+    def _sbatch_query(self, sbatch_ids):
+        """State of each job with one squeue and at most one sacct
+
+        Args:
+            sbatch_ids (list): slurm job ids
+        Returns:
+            PKDict: sbatch_id to job state (missing if the query failed)
+        """
+
+        def _run(*cmd):
+            return subprocess.run(cmd, close_fds=True, capture_output=True, text=True)
+
+        def _sacct(ids):
+            p = _run(
+                "sacct",
+                "--jobs=" + ",".join(ids),
+                "--format=JobIDRaw,State",
+                "--noheader",
+                "--parsable2",
             )
             if p.returncode != 0:
                 pkdlog(
-                    "{} sacct error exit={} sbatch={} stderr={} stdout={}",
-                    self,
+                    "sacct error exit={} sbatch_ids={} stderr={} stdout={}",
                     p.returncode,
-                    self._sbatch_status.sbatch_id,
+                    ids,
                     p.stderr,
                     p.stdout,
                 )
-                if "disabled" in p.stderr:
-                    # Only in dev: saccount is not configured and job not running, assume canceled
-                    return "CANCELLED"
-                # Job never ran?
-                return "FAILED"
-            # sacct outputs state for each part of the job (shifter, external, etc.) so be pessimistic.
-            rv = set()
-            for l in re.split(r"\s+", p.stdout):
-                if len(l) and not l.startswith("-") and l != "State":
-                    rv.add(l)
-            if len(rv) == 1:
-                # Normal case
-                return next(iter(rv))
-            if len(rv) > 1 and "CANCELLED" in rv:
-                return "CANCELLED"
-            pkdlog("{} sacct parse failed words={} stdout={}", self, rv, p.stdout)
-            return "FAILED"
-
-        def _scontrol():
-            # try scontrol first, because that's the normal case and easier to parse
-            p = subprocess.run(
-                ("scontrol", "show", "job", self._sbatch_status.sbatch_id),
-                cwd=str(self.run_dir),
-                close_fds=True,
-                capture_output=True,
-                text=True,
+                # Only in dev: saccount is not configured and job not running, assume canceled
+                # otherwise, job never ran?
+                return PKDict(
+                    {
+                        i: "CANCELLED" if "disabled" in p.stderr else "FAILED"
+                        for i in ids
+                    }
+                )
+            s = PKDict()
+            for l in p.stdout.splitlines():
+                x = l.split("|")
+                if len(x) >= 2 and x[1]:
+                    # ex. 123.batch|CANCELLED by 456
+                    s.setdefault(x[0].split(".")[0], set()).add(x[1].split()[0])
+            rv = PKDict()
+            for i in ids:
+                # sacct outputs state for each part of the job (shifter, external, etc.) so be pessimistic.
+                x = s.get(i, set())
+                if len(x) == 1:
+                    # Normal case
+                    rv[i] = next(iter(x))
+                elif len(x) > 1 and "CANCELLED" in x:
+                    rv[i] = "CANCELLED"
+                else:
+                    pkdlog("sacct parse failed sbatch_id={} states={}", i, x)
+                    rv[i] = "FAILED"
+            return rv
+
+        def _squeue(ids):
+            # squeue is the normal case, because jobs are in the queue (or recently left it)
+            p = _run(
+                "squeue",
+                "--format=%i %T",
+                "--jobs=" + ",".join(ids),
+                "--noheader",
+                "--states=all",
             )
             if p.returncode != 0:
                 # Invalid job id will happen on NERSC. No jobs in dev
                 if re.search("Invalid job id|No jobs", p.stderr):
-                    pkdlog(
-                        "sbatch={} not in system, trying sacct",
-                        self._sbatch_status.sbatch_id,
-                    )
-                    return _sacct()
+                    return PKDict()
                 pkdlog(
-                    "{} scontrol error exit={} sbatch={} stderr={} stdout={}",
-                    self,
+                    "squeue error exit={} sbatch_ids={} stderr={} stdout={}",
                     p.returncode,
-                    self._sbatch_status.sbatch_id,
-                    p.stderr,
-                    p.stdout,
-                )
-                return None
-            r = re.search(r"(?<=JobState=)(\S+)(?= Reason)", p.stdout)
-            if not r:
-                pkdlog(
-                    "{} failed to find JobState in stderr={} stdout={}",
-                    self,
+                    ids,
                     p.stderr,
                     p.stdout,
                 )
                 return None
-            return r.group(1)
-
-        if not (s := _scontrol()):
-            return None
-        if s in ("PENDING", "CONFIGURING"):
-            return job.PENDING
-        if s in ("COMPLETING", "RUNNING"):
-            return job.RUNNING
-        if s == "COMPLETED":
-            return job.COMPLETED
-        if s == "CANCELLED":
-            return job.CANCELED
-        if s == "FAILED":
-            return job.ERROR
-        if s == "TIMEOUT":
-            return job.CANCELED
-        pkdlog(
-            "{} sbatch_id={} unexpected sbatch query state={}",
-            self,
-            self._sbatch_status.sbatch_id,
-            s,
-        )
-        return job.ERROR
-
-    async def _sbatch_send_update(self, text=None):
-        def _optional():
-            # parallelStatus only happens in the case we are at the end
             rv = PKDict()
-            for f in "error", "parallelStatus", "computeJobStart":
-                # Will be overwritten if in "text"
-                if x := self._sbatch_status.get(f):
-                    rv[f] = x
+            for l in p.stdout.splitlines():
+                x = l.split()
+                if len(x) == 2 and x[0] in ids:
+                    rv[x[0]] = x[1]
             return rv
 
-        await self.dispatcher.job_cmd_reply(
-            msg=self.msg,
-            op_name=job.OP_RUN_STATUS_UPDATE,
-            text=text,
-            cmd=self,
-            msg_items=_optional(),
-        )
-        if self._sbatch_status.job_cmd_state in job.EXIT_STATUSES:
-            self.destroy()
+        def _state(sbatch_id, s):
+            if s in ("PENDING", "CONFIGURING"):
+                return job.PENDING
+            if s in ("COMPLETING", "RUNNING"):
+                return job.RUNNING
+            if s == "COMPLETED":
+                return job.COMPLETED
+            if s == "CANCELLED":
+                return job.CANCELED
+            if s == "FAILED":
+                return job.ERROR
+            if s == "TIMEOUT":
+                return job.CANCELED
+            pkdlog(
+                "sbatch_id={} unexpected sbatch query state={}",
+                sbatch_id,
+                s,
+            )
+            return job.ERROR
+
+        i = [x for x in sbatch_ids if x]
+        if not i or (q := _squeue(i)) is None:
+            return PKDict()
+        if m := [x for x in i if x not in q]:
+            pkdlog("sbatch_ids={} not in queue, trying sacct", m)
+            q.pkupdate(_sacct(m))
+        return PKDict({k: _state(k, v) for k, v in q.items()})
 
 
 def _assert_run_dir_exists(run_dir):
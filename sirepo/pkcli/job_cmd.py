@@ -9,16 +9,18 @@ from pykern import pkconfig
 from pykern import pkconst
 from pykern import pkio
 from pykern import pkjson
-from pykern import pkunit
 from pykern.pkcollections import PKDict
 from pykern.pkdebug import pkdp, pkdexc, pkdc, pkdlog
 from sirepo import job
 from sirepo.template import template_common
+import collections
 import contextlib
 import os
 import re
 import requests
 import signal
+import sirepo.feature_config
+import sirepo.job_frame
 import sirepo.sim_data
 import sirepo.sim_run
 import sirepo.template
@@ -78,10 +80,70 @@ def default_command(in_file):
     return pkjson.dump_pretty(r, pretty=False)
 
 
-class _AbruptSocketCloseError(Exception):
-    """Fastcgi unix domain socket closed"""
+class _FrameCache:
+    """Replies to get_simulation_frame in the fastcgi process
 
-    pass
+    Users view the same animation frames over and over. Each frame
+    rereads the output files so the serialized reply is kept keyed by
+    the frame args (which include computeJobSerial) and a signature
+    of the files at the top of the run dir, where reports write their
+    output, so a frame is recomputed when the output changes. Entries
+    are discarded in least recently used order to stay within
+    ``frame_cache_max_bytes``.
+    """
+
+    def __init__(self, max_bytes):
+        self._max_bytes = max_bytes
+        self._bytes = 0
+        self._serials = PKDict()
+        self._values = collections.OrderedDict()
+
+    def get(self, key):
+        if (rv := self._values.get(key)) is None:
+            return None
+        self._values.move_to_end(key)
+        return rv
+
+    def key(self, msg):
+        if (
+            not self._max_bytes
+            or msg.jobCmd != "get_simulation_frame"
+            or not msg.get("runDir")
+        ):
+            return None
+        d = str(msg.runDir)
+        s = msg.data.get("computeJobSerial")
+        if self._serials.get(d) != s:
+            # new run so nothing cached is valid
+            self._invalidate(d)
+            self._serials[d] = s
+        try:
+            return (d, pkjson.dump_str(msg.data, sort_keys=True), _dir_signature(d))
+        except Exception as e:
+            pkdlog("run_dir={} error={}", d, e)
+            return None
+
+    def set(self, key, reply, payload):
+        """Save `payload` for `key`, which was computed before the frame
+
+        A template which writes a file in the run dir misses once more,
+        because the next request's key includes that file.
+        """
+        if reply.get("state") != job.COMPLETED or "error" in reply:
+            return
+        n = len(payload)
+        if n > self._max_bytes // 4:
+            return
+        if (x := self._values.pop(key, None)) is not None:
+            self._bytes -= len(x)
+        self._values[key] = payload
+        self._bytes += n
+        while self._bytes > self._max_bytes:
+            self._bytes -= len(self._values.popitem(last=False)[1])
+
+    def _invalidate(self, run_dir):
+        for k in [k for k in self._values if k[0] == run_dir]:
+            self._bytes -= len(self._values.pop(k))
 
 
 def _background_percent_complete(msg, template, is_running):
@@ -138,6 +200,19 @@ def _dispatch_compute(msg, template):
         return _maybe_parse_user_alert(e)
 
 
+def _dir_signature(path):
+    """Count and max mtime of the entries of path
+
+    Not recursive, since subdirectories hold inputs, not output.
+    """
+    c = 0
+    m = 0
+    for e in os.scandir(path):
+        c += 1
+        m = max(m, e.stat(follow_symlinks=False).st_mtime_ns)
+    return c, m
+
+
 def _do_analysis_job(msg, template):
     return _dispatch_compute(msg, template)
 
@@ -251,54 +326,55 @@ def _do_download_run_file(msg, template):
 def _do_fastcgi(msg, template):
     import socket
 
-    def _recv():
-        m = b""
-        while True:
-            r = s.recv(_MAX_FASTCGI_MSG)
-            if not r:
-                pkdlog("job_cmd should be killed before socket is closed")
-                raise _AbruptSocketCloseError()
-            if len(m) + len(r) > _MAX_FASTCGI_MSG:
-                raise RuntimeError("message larger than {} bytes", _MAX_FASTCGI_MSG)
-            m += r
-            if m[-1:] == b"\n":
-                return pkjson.load_any(m)
-
     s = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
     s.connect(msg.fastcgiFile)
     # No longer need the msg, and confuses with "m" below
     msg = None
     c = 0
+    e = sirepo.job_frame.JSON
     while True:
+        k = None
         try:
-            m = _recv()
+            e, m = sirepo.job_frame.recv(s, _MAX_FASTCGI_MSG)
             # TODO(robnagler) does not happen afaict
             if not m:
                 return
             if m.jobCmd == "fastcgi":
                 pkdlog("fastcgi called within fastcgi msg={}", m)
                 raise AssertionError("fastcgi called within fastcgi")
-            else:
-                r = _process_msg(m, allow_none=False)
-                c = 0
-        except _AbruptSocketCloseError:
+            k = _frame_cache.key(m)
+            if k and (r := _frame_cache.get(k)):
+                s.sendall(r)
+                continue
+            r = _process_msg(m, allow_none=False)
+            c = 0
+        except sirepo.job_frame.AbruptCloseError:
+            pkdlog("job_cmd should be killed before socket is closed")
             return
         except AssertionError:
             raise
-        except Exception as e:
+        except Exception as x:
             if c >= _MAX_FASTCGI_EXCEPTIONS:
                 raise AssertionError(
-                    f"too many fastgci exceptions count={c}. Most recent error={e}"
+                    f"too many fastgci exceptions count={c}. Most recent error={x}"
                 )
             c += 1
-            r = _maybe_parse_user_alert(e)
-        s.sendall(_validate_msg_and_jsonl(r))
+            r = _maybe_parse_user_alert(x)
+            k = None
+        b = _validate_msg_and_frame(r, e)
+        if k:
+            _frame_cache.set(k, r, b)
+        s.sendall(b)
 
 
 def _do_get_simulation_frame(msg, template):
     try:
-        return template_common.sim_frame_dispatch(
-            msg.data.copy().pkupdate(run_dir=msg.runDir),
+        return _maybe_encode_typed_arrays(
+            msg,
+            template,
+            template_common.sim_frame_dispatch(
+                msg.data.copy().pkupdate(run_dir=msg.runDir),
+            ),
         )
     except Exception as e:
         return _maybe_parse_user_alert(e, error="report not generated")
@@ -363,7 +439,7 @@ def _do_sequential_result(msg, template):
     if hasattr(template, "prepare_sequential_output_file") and "models" in msg.data:
         template.prepare_sequential_output_file(msg.runDir, msg.data)
         r = template_common.read_sequential_result(msg.runDir)
-    return r
+    return _maybe_encode_typed_arrays(msg, template, r)
 
 
 def _do_stateful_compute(msg, template):
@@ -403,7 +479,22 @@ def _file_reply(resp, msg):
 
 
 def _in_pkunit():
-    return pkconfig.in_dev_mode() and pkunit.is_test_run()
+    if not pkconfig.in_dev_mode():
+        return False
+    from pykern import pkunit
+
+    return pkunit.is_test_run()
+
+
+def _maybe_encode_typed_arrays(msg, template, reply):
+    # Only clients which decode typed arrays send typedArrays
+    if not (
+        sirepo.feature_config.cfg().typed_array_frames and msg.data.get("typedArrays")
+    ):
+        return reply
+    return getattr(
+        template, "encode_typed_arrays", template_common.encode_typed_arrays
+    )(reply)
 
 
 def _maybe_parse_user_alert(exception, error=None):
@@ -455,11 +546,11 @@ def _process_msg(msg, allow_none):
     return r
 
 
-def _validate_msg_and_jsonl(msg):
-    m = pkjson.dump_bytes(msg)
+def _validate_msg_and_frame(msg, encoding):
+    m = sirepo.job_frame.encode(msg, encoding)
     if r := _error_if_response_too_large(m):
-        m = pkjson.dump_bytes(r)
-    return m + b"\n"
+        m = sirepo.job_frame.encode(r, encoding)
+    return m
 
 
 def _write_parallel_status(prev_res, msg, template, is_running, completed_hack=False):
@@ -475,3 +566,14 @@ def _write_parallel_status(prev_res, msg, template, is_running, completed_hack=F
     if prev_res.json != res.json:
         sys.stdout.write(res.json + "\n")
     return res
+
+
+_cfg = pkconfig.init(
+    frame_cache_max_bytes=(
+        int(1e8),
+        pkconfig.parse_bytes,
+        "memory for get_simulation_frame replies in the fastcgi process (0 disables)",
+    ),
+)
+
+_frame_cache = _FrameCache(_cfg.frame_cache_max_bytes)
@@ -0,0 +1,129 @@
+"""Measure startup cost of sirepo processes and compare job placement
+
+:copyright: Copyright (c) 2026 RadiaSoft LLC.  All Rights Reserved.
+:license: http://www.apache.org/licenses/LICENSE-2.0.html
+"""
+
+from pykern import pkcli
+from pykern.pkcollections import PKDict
+from pykern.pkdebug import pkdp, pkdlog
+import re
+import subprocess
+import sys
+
+_IMPORT_TIME_RE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+# python only reports imports done by import statements, not importlib,
+# so the target module is imported explicitly before it is initialized
+_TARGETS = PKDict(
+    job_agent="import sirepo.pkcli.job_agent",
+    job_cmd="import sirepo.pkcli.job_cmd",
+    job_supervisor="import sirepo.modules, sirepo.job_supervisor; sirepo.modules.import_and_init('sirepo.job_supervisor')",
+    server="import sirepo.modules, sirepo.server; sirepo.modules.import_and_init('sirepo.server')",
+)
+
+
+def imports(target="server", sim_type=None, top=25):
+    """Time the imports of a process in a fresh interpreter
+
+    Runs ``python -X importtime`` and reports the modules with the
+    largest cumulative import time, which are the candidates for
+    deferring to first use.
+
+    Args:
+        target (str): job_agent, job_cmd, job_supervisor, or server [server]
+        sim_type (str): also import the template and sim_data of this type [None]
+        top (int): number of modules to report [25]
+    Returns:
+        str: table of cumulative ms, self ms, and module
+    """
+    r = import_times(target, sim_type)
+    return "\n".join(
+        [f"total={r.total_ms:.0f}ms modules={len(r.modules)}", "   cum   self module"]
+        + [
+            f"{m.cumulative_ms:6.0f} {m.self_ms:6.0f} {m.name}"
+            for m in r.modules[: int(top)]
+        ],
+    )
+
+
+def import_times(target, sim_type=None):
+    """Parse import times of `target`
+
+    Args:
+        target (str): see `imports`
+        sim_type (str): see `imports`
+    Returns:
+        PKDict: modules (sorted by cumulative_ms descending) and total_ms
+    """
+    if target not in _TARGETS:
+        pkcli.command_error(
+            "target={} must be one of {}", target, ", ".join(sorted(_TARGETS))
+        )
+    c = _TARGETS[target]
+    if sim_type:
+        c += (
+            f"; import sirepo.template.{sim_type}, sirepo.sim_data.{sim_type}"
+            f"; sirepo.template.import_module({sim_type!r})"
+            f"; sirepo.sim_data.get_class({sim_type!r})"
+        )
+    p = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", c],
+        capture_output=True,
+        text=True,
+    )
+    if p.returncode != 0:
+        pkcli.command_error("target={} failed stderr={}", target, p.stderr[-2000:])
+    m = []
+    t = 0
+    for l in p.stderr.splitlines():
+        x = _IMPORT_TIME_RE.search(l)
+        if not x:
+            continue
+        r = PKDict(
+            cumulative_ms=int(x.group(2)) / 1000,
+            name=x.group(4),
+            self_ms=int(x.group(1)) / 1000,
+        )
+        m.append(r)
+        if len(x.group(3)) <= 1:
+            # top level imports include the time of their children
+            t += r.cumulative_ms
+    return PKDict(
+        modules=sorted(m, key=lambda r: r.cumulative_ms, reverse=True),
+        total_ms=t,
+    )
+
+
+def placement(hosts=4, jobs=2000, load=0.8, parallel_fraction=0.3, seed=1):
+    """Compare docker host placement policies in a simulation
+
+    See `sirepo.job_placement.simulate`.
+
+    Args:
+        hosts (int): number of hosts [4]
+        jobs (int): number of jobs [2000]
+        load (float): offered load as fraction of all slots [0.8]
+        parallel_fraction (float): fraction of jobs which are parallel [0.3]
+        seed (int): random seed [1]
+    Returns:
+        str: table of wait times and time average of empty hosts by policy
+            (configured is the policy of each kind in `sirepo.job_placement`)
+    """
+    import sirepo.job_placement
+
+    rv = ["policy     mean_wait  p95_wait  max_wait  empty_hosts"]
+    for p in [None] + sorted(sirepo.job_placement.POLICIES):
+        r = sirepo.job_placement.simulate(
+            p,
+            hosts=int(hosts),
+            jobs=int(jobs),
+            load=float(load),
+            parallel_fraction=float(parallel_fraction),
+            seed=int(seed),
+        )
+        rv.append(
+            f"{p or 'configured':10} {r.mean_wait_secs:9.1f} {r.p95_wait_secs:9.1f}"
+            f" {r.max_wait_secs:9.1f} {r.empty_hosts:12.2f}"
+        )
+    return "\n".join(rv)
@@ -184,6 +184,15 @@ def tornado():
         kwargs["is_primary"] = p is None or p == kwargs["port"]
         return kwargs
 
+    def _processes():
+        rv = _cfg().tornado_processes or os.cpu_count()
+        if rv != 1 and (_cfg().use_reloader or sirepo.feature_config.cfg().debug_mode):
+            pkcli.command_error(
+                "tornado_processes={} requires use_reloader and debug_mode to be false",
+                rv,
+            )
+        return rv
+
     with pkio.save_chdir(_run_dir()) as r:
         d = pkconfig.in_dev_mode()
         if d:
@@ -199,6 +208,7 @@ def tornado():
                 debug=sirepo.feature_config.cfg().debug_mode,
                 ip=_cfg().ip,
                 port=_cfg().port,
+                processes=_processes(),
             ),
         )
 
@@ -229,6 +239,11 @@ def _cfg():
                 int,
                 "for multi-instance tornado, port of controlling api server",
             ),
+            tornado_processes=(
+                1,
+                _cfg_int(0, 1024),
+                "server processes sharing port (0 is one per core)",
+            ),
             use_reloader=(pkconfig.in_dev_mode(), bool, "use the server reloader"),
             vue_port=(
                 (
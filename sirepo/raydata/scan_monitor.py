@@ -15,13 +15,17 @@ import asyncio
 import databroker.queries
 import datetime
 import functools
+import heapq
 import io
 import itertools
 import math
+import os
 import pymongo
 import re
 import requests
+import signal
 import sirepo.feature_config
+import sirepo.metrics
 import sirepo.raydata.adaptive_workflow
 import sirepo.raydata.analysis_driver
 import sirepo.raydata.databroker
@@ -32,11 +36,15 @@ import sirepo.tornado
 import sqlalchemy
 import sqlalchemy.ext.declarative
 import sqlalchemy.orm
+import time
 import zipfile
 
 
-#: task(s) monitoring the execution of the analysis process
-_ANALYSIS_PROCESSOR_TASKS = None
+#: scans awaiting analysis (see _AnalysisQueue)
+_ANALYSIS_QUEUE = None
+
+#: run analyses concurrently (see _AnalysisWorker)
+_ANALYSIS_WORKERS = None
 
 #: task(s) monitoring catalogs for new scans
 _CATALOG_MONITOR_TASKS = PKDict()
@@ -53,9 +61,6 @@ _NON_DISPLAY_SCAN_FIELDS = "rduid"
 
 _NUM_RECENTLY_EXECUTED_SCANS = 5
 
-#: scan(s) awaiting analysis to be run on them
-_SCANS_AWAITING_ANALYSIS = []
-
 #: path scan_monitor registers to receive api requests
 _URI = "/scan-monitor"
 
@@ -70,6 +75,119 @@ cfg = None
 engine = None
 
 
+class _AnalysisQueue:
+    """Scans awaiting analysis in priority order
+
+    Entries are ``[priority, seq, key, scan]`` in a heap so `get` and
+    `put` are O(log n). Moved and removed entries stay in the heap with
+    scan set to None and are skipped by `get`.
+    """
+
+    def __init__(self):
+        self._entries = PKDict()
+        self._heap = []
+        self._max_priority = 0
+        self._min_priority = 0
+        self._positions = None
+        self._ready = asyncio.Event()
+        self._seq = itertools.count()
+
+    def __contains__(self, scan):
+        return _scan_key(scan) in self._entries
+
+    def __len__(self):
+        return len(self._entries)
+
+    async def get(self):
+        """Wait for the highest priority scan
+
+        Returns:
+            PKDict: scan (rduid, catalog_name)
+        """
+        while True:
+            while self._heap:
+                e = heapq.heappop(self._heap)
+                if e[3] is None:
+                    continue
+                self._entries.pkdel(e[2])
+                self._changed()
+                sirepo.metrics.timing(
+                    "raydata.analysis_wait", time.monotonic() - e[3].queue_time
+                )
+                return e[3].scan
+            self._ready.clear()
+            await self._ready.wait()
+
+    def move(self, scan, first):
+        """Move scan to the front or back of the queue
+
+        Args:
+            scan (PKDict): rduid, catalog_name
+            first (bool): front if True else back
+        Returns:
+            bool: True if scan was queued
+        """
+        if not (e := self._entries.get(_scan_key(scan))):
+            return False
+        self._push(e[3], first)
+        e[3] = None
+        return True
+
+    def position(self, scan):
+        """Order in which scan will be analyzed
+
+        Args:
+            scan (PKDict): rduid, catalog_name
+        Returns:
+            int: 1 is next or 0 if not queued
+        """
+        if self._positions is None:
+            self._positions = PKDict(
+                (e[2], i + 1) for i, e in enumerate(sorted(self._entries.values()))
+            )
+        return self._positions.get(_scan_key(scan), 0)
+
+    def put(self, scan):
+        """Queue scan at the back
+
+        Args:
+            scan (PKDict): rduid, catalog_name
+        """
+        self._push(PKDict(queue_time=time.monotonic(), scan=scan), first=False)
+
+    def remove(self, scan):
+        """Remove scan from the queue
+
+        Args:
+            scan (PKDict): rduid, catalog_name
+        Returns:
+            bool: True if scan was queued
+        """
+        if not (e := self._entries.pkdel(_scan_key(scan))):
+            return False
+        e[3] = None
+        self._changed()
+        return True
+
+    def _changed(self):
+        self._positions = None
+        sirepo.metrics.gauge("raydata.analysis_queue_length", len(self._entries))
+
+    def _push(self, value, first):
+        if first:
+            self._min_priority -= 1
+            p = self._min_priority
+        else:
+            self._max_priority += 1
+            p = self._max_priority
+        k = _scan_key(value.scan)
+        e = [p, next(self._seq), k, value]
+        self._entries[k] = e
+        heapq.heappush(self._heap, e)
+        self._changed()
+        self._ready.set()
+
+
 class _AnalysisStatus(aenum.NamedConstant):
     """Status of the analysis runs"""
 
@@ -82,6 +200,128 @@ class _AnalysisStatus(aenum.NamedConstant):
     NONE = "none"
 
 
+class _AnalysisWorker:
+    """Runs the notebooks for one scan at a time from `_ANALYSIS_QUEUE`"""
+
+    def __init__(self, index):
+        self.index = index
+        self._canceled = False
+        self._process = None
+        self._scan = None
+        self._start = None
+
+    def cancel(self, scan):
+        """Terminate analysis if running on scan
+
+        Args:
+            scan (PKDict): rduid, catalog_name
+        Returns:
+            bool: True if scan was being analyzed
+        """
+        if self._scan is None or _scan_key(self._scan) != _scan_key(scan):
+            return False
+        pkdlog("worker={} scan={}", self.index, scan)
+        self._canceled = True
+        if self._process and self._process.returncode is None:
+            try:
+                # papermill and its kernel are children of the script
+                os.killpg(self._process.pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+        return True
+
+    async def run(self):
+        while True:
+            s = await _ANALYSIS_QUEUE.get()
+            self._canceled = False
+            self._scan = s
+            self._start = time.monotonic()
+            _busy_gauge()
+            try:
+                await self._analyze(sirepo.raydata.analysis_driver.get(s))
+            except Exception as e:
+                # worker must keep running
+                pkdlog(
+                    "worker={} scan={} error={} stack={}", self.index, s, e, pkdexc()
+                )
+            finally:
+                self._process = None
+                self._scan = None
+                self._start = None
+                _busy_gauge()
+
+    def status(self):
+        return PKDict(
+            index=self.index,
+            scan=self._scan,
+            elapsedTime=(
+                None if self._start is None else int(time.monotonic() - self._start)
+            ),
+        )
+
+    async def _analyze(self, driver):
+        s = _AnalysisStatus.ERROR
+        start = None
+        end = None
+        try:
+            _Analysis.set_scan_status(driver, _AnalysisStatus.RUNNING)
+            d = driver.get_output_dir()
+            with pkio.save_chdir(d, mkdir=True):
+                # cwd is global to all workers so no awaits here
+                b = driver.get_notebooks()
+            with pkio.open_text(d.join("run.log"), mode="w") as l:
+                try:
+                    start = datetime.datetime.now()
+                    for n in b:
+                        if self._canceled:
+                            raise RuntimeError("analysis canceled")
+                        self._process = await asyncio.create_subprocess_exec(
+                            "bash",
+                            driver.render_papermill_script(
+                                input_f=n.input_f,
+                                output_f=n.output_f,
+                            ),
+                            cwd=str(d),
+                            start_new_session=True,
+                            stderr=asyncio.subprocess.STDOUT,
+                            stdout=l,
+                        )
+                        r = await self._process.wait()
+                        if self._canceled:
+                            raise RuntimeError("analysis canceled")
+                        assert (
+                            r == 0
+                        ), f"error returncode={r} catalog={driver.catalog_name} scan={driver.rduid} notebook={n} log={d.join('run.log')}"
+                        s = _AnalysisStatus.COMPLETED
+                        end = datetime.datetime.now()
+                except Exception as e:
+                    end = datetime.datetime.now()
+                    s = _AnalysisStatus.ERROR
+                    if self._canceled:
+                        pkdlog("canceled scan={}", driver.rduid)
+                    else:
+                        pkdlog(
+                            "error analyzing scan={} error={} stack={}",
+                            driver.rduid,
+                            e,
+                            pkdexc(),
+                        )
+        finally:
+            t = int((end - start).total_seconds()) if (end and start) else None
+            if self._canceled:
+                # same as canceling a queued scan
+                s = _AnalysisStatus.NONE
+                t = None
+            _Analysis.set_scan_status(driver, s, t)
+            sirepo.metrics.inc(
+                "raydata.analysis_canceled"
+                if self._canceled
+                else f"raydata.analysis_{s}"
+            )
+            if t is not None:
+                sirepo.metrics.timing("raydata.analysis_run", t)
+
+
 @sqlalchemy.ext.declarative.as_declarative()
 class _DbBase:
     def save(self):
@@ -381,6 +621,25 @@ class _RequestHandler(_JsonPostRequestHandler):
     def _request_analysis_run_log(self, req_data):
         return sirepo.raydata.analysis_driver.get(req_data).get_run_log()
 
+    def _request_analysis_workers(self, _):
+        return PKDict(
+            data=PKDict(
+                queueLength=len(_ANALYSIS_QUEUE),
+                workers=[w.status() for w in _ANALYSIS_WORKERS],
+            )
+        )
+
+    def _request_cancel_analysis(self, req_data):
+        s = PKDict(rduid=req_data.rduid, catalog_name=req_data.catalogName)
+        if _ANALYSIS_QUEUE.remove(s):
+            _Analysis.set_scan_status(s, _AnalysisStatus.NONE)
+            sirepo.metrics.inc("raydata.analysis_canceled")
+        else:
+            for w in _ANALYSIS_WORKERS:
+                if w.cancel(s):
+                    break
+        return PKDict(data="ok")
+
     def _request_catalog_names(self, _):
         return PKDict(
             data=PKDict(
@@ -445,19 +704,12 @@ class _RequestHandler(_JsonPostRequestHandler):
         return _scan_info_result(l, s, req_data)
 
     def _request_reorder_scan(self, req_data):
-        i = _scan_index(req_data.rduid, req_data)
-        if i >= 0:
-            s = _SCANS_AWAITING_ANALYSIS.pop(i)
-            if s.rduid != req_data.rduid:
-                raise AssertionError(
-                    f"Failed to pop() correct scan: {req_data.rduid} != {s.rduid}"
-                )
-            if req_data.action == "first":
-                _SCANS_AWAITING_ANALYSIS.insert(0, s)
-            elif req_data.action == "last":
-                _SCANS_AWAITING_ANALYSIS.append(s)
-            else:
-                raise AssertionError(f"Unknown reorder action {req_data.action}")
+        if req_data.action not in ("first", "last"):
+            raise AssertionError(f"Unknown reorder action {req_data.action}")
+        _ANALYSIS_QUEUE.move(
+            PKDict(rduid=req_data.rduid, catalog_name=req_data.catalogName),
+            first=req_data.action == "first",
+        )
         return PKDict(data="ok")
 
     def _request_run_analysis(self, req_data):
@@ -520,57 +772,20 @@ def _sort_params(req_data):
 
 
 async def _init_analysis_processors():
-    global _ANALYSIS_PROCESSOR_TASKS
+    global _ANALYSIS_WORKERS
 
-    async def _process_analysis_queue():
-        while True:
-            if not _SCANS_AWAITING_ANALYSIS:
-                await pkasyncio.sleep(5)
-                continue
-            d = sirepo.raydata.analysis_driver.get(_SCANS_AWAITING_ANALYSIS.pop(0))
-            s = _AnalysisStatus.ERROR
-            start = None
-            end = None
-            try:
-                _Analysis.set_scan_status(d, _AnalysisStatus.RUNNING)
-                with pkio.save_chdir(d.get_output_dir(), mkdir=True), pkio.open_text(
-                    "run.log", mode="w"
-                ) as l:
-                    try:
-                        start = datetime.datetime.now()
-                        for n in d.get_notebooks():
-                            p = await asyncio.create_subprocess_exec(
-                                "bash",
-                                d.render_papermill_script(
-                                    input_f=n.input_f,
-                                    output_f=n.output_f,
-                                ),
-                                stderr=asyncio.subprocess.STDOUT,
-                                stdout=l,
-                            )
-                            r = await p.wait()
-                            assert (
-                                r == 0
-                            ), f"error returncode={r} catalog={d.catalog_name} scan={d.rduid} notebook={n} log={pkio.py_path().join('run.log')}"
-                            s = _AnalysisStatus.COMPLETED
-                            end = datetime.datetime.now()
-                    except Exception as e:
-                        end = datetime.datetime.now()
-                        pkdlog(
-                            "error analyzing scan={} error={} stack={}",
-                            d.rduid,
-                            e,
-                            pkdexc(),
-                        )
-            finally:
-                t = int((end - start).total_seconds()) if (end and start) else None
-                _Analysis.set_scan_status(d, s, t)
+    assert not _ANALYSIS_WORKERS
+    _ANALYSIS_WORKERS = [_AnalysisWorker(i) for i in range(cfg.concurrent_analyses)]
+    sirepo.metrics.start_logging()
+    _busy_gauge()
+    await asyncio.gather(*(w.run() for w in _ANALYSIS_WORKERS))
 
-    assert not _ANALYSIS_PROCESSOR_TASKS
-    _ANALYSIS_PROCESSOR_TASKS = [
-        pkasyncio.create_task(_process_analysis_queue())
-    ] * cfg.concurrent_analyses
-    await asyncio.gather(*_ANALYSIS_PROCESSOR_TASKS)
+
+def _busy_gauge():
+    sirepo.metrics.gauge(
+        "raydata.analysis_workers_busy",
+        sum(1 for w in _ANALYSIS_WORKERS if w.status().scan is not None),
+    )
 
 
 def _display_columns(columns):
@@ -671,18 +886,12 @@ def _queue_for_analysis(scan_metadata):
     if not sirepo.raydata.analysis_driver.get(s).is_scan_elegible_for_analysis():
         return
     pkdlog("scan={}", s)
-    if s not in _SCANS_AWAITING_ANALYSIS:
+    if s not in _ANALYSIS_QUEUE:
         pkio.unchecked_remove(sirepo.raydata.analysis_driver.get(s).get_output_dir())
-        _SCANS_AWAITING_ANALYSIS.append(s)
+        _ANALYSIS_QUEUE.put(s)
         _Analysis.set_scan_status(s, _AnalysisStatus.PENDING)
-
-
-def _scan_index(rduid, req_data):
-    s = PKDict(
-        rduid=rduid,
-        catalog_name=req_data.catalogName,
-    )
-    return _SCANS_AWAITING_ANALYSIS.index(s) if s in _SCANS_AWAITING_ANALYSIS else -1
+        if len(_ANALYSIS_QUEUE) > len(_ANALYSIS_WORKERS):
+            sirepo.metrics.inc("raydata.analysis_queue_backlog")
 
 
 def _scan_info(
@@ -713,7 +922,9 @@ def _scan_info(
     for c in m.get_start_fields():
         all_columns.add(c)
 
-    d["queue order"] = _scan_index(rduid, req_data) + 1
+    d["queue order"] = _ANALYSIS_QUEUE.position(
+        PKDict(rduid=rduid, catalog_name=req_data.catalogName)
+    )
     return d
 
 
@@ -768,9 +979,13 @@ def _scan_info_result(scans, page_count, req_data):
     )
 
 
+def _scan_key(scan):
+    return f"{scan.catalog_name}/{scan.rduid}"
+
+
 def start():
     def _init():
-        global cfg
+        global cfg, _ANALYSIS_QUEUE
         cfg = pkconfig.init(
             automatic_analysis=(
                 True,
@@ -780,7 +995,7 @@ def start():
             catalog_names=(frozenset(), set, "list of catalog names to monitor"),
             concurrent_analyses=(
                 2,
-                int,
+                pkconfig.parse_positive_int,
                 "max number of analyses that can run concurrently",
             ),
             db_dir=pkconfig.RequiredUnlessDev(
@@ -789,6 +1004,7 @@ def start():
                 "root directory for db",
             ),
         )
+        _ANALYSIS_QUEUE = _AnalysisQueue()
         sirepo.srtime.init_module()
         pkio.mkdir_parent(cfg.db_dir)
         _Analysis.init(cfg.db_dir.join("analysis.db"))
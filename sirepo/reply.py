@@ -77,6 +77,24 @@ def init_quest(qcall):
     _SReply(qcall=qcall)
 
 
+async def websocket_async_msg(handler, method, content):
+    """Send a message to the client that is not a reply to a request
+
+    Args:
+        handler (tornado.websocket.WebSocketHandler): client connection
+        method (str): one of ``websocketMsg.method``
+        content (object): msgpack-able value
+    """
+    await _websocket_send(
+        handler,
+        PKDict(
+            kind=sirepo.const.SCHEMA_COMMON.websocketMsg.kind.asyncMsg,
+            method=method,
+        ),
+        content,
+    )
+
+
 class _SReply(sirepo.quest.Attr):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
@@ -445,8 +463,6 @@ class _SReply(sirepo.quest.Attr):
         raise AssertionError(f"invalid return type={type(res)} from qcall={self.qcall}")
 
     async def websocket_response(self, wsreq):
-        import msgpack
-
         def _content():
             a = self.__attrs
             c = a.get("content")
@@ -478,26 +494,14 @@ class _SReply(sirepo.quest.Attr):
             )
 
         async def _send(header, content):
-            p = None
-            try:
-                p = msgpack.Packer(autoreset=False)
-                header.version = sirepo.const.SCHEMA_COMMON.websocketMsg.version
-                p.pack(header)
-                p.pack(content)
-                # TODO(robnagler) getbuffer() would be better
-                await wsreq.handler.write_message(p.bytes(), binary=True)
-            finally:
-                if p:
-                    p.reset()
+            await _websocket_send(wsreq.handler, header, content)
 
         async def _send_cookie():
             if not (c := self.__attrs.get("cookie")):
                 return
-            await _send(
-                PKDict(
-                    kind=sirepo.const.SCHEMA_COMMON.websocketMsg.kind.asyncMsg,
-                    method=sirepo.const.SCHEMA_COMMON.websocketMsg.method.setCookies,
-                ),
+            await websocket_async_msg(
+                wsreq.handler,
+                sirepo.const.SCHEMA_COMMON.websocketMsg.method.setCookies,
                 c.http_header_values(to_delete=self._cookies_to_delete),
             )
 
@@ -822,3 +826,19 @@ class _SRException(_Base):
 
     def websocket_content(self):
         return self._sr_exception(**self.value)
+
+
+async def _websocket_send(handler, header, content):
+    import msgpack
+
+    p = None
+    try:
+        p = msgpack.Packer(autoreset=False)
+        header.version = sirepo.const.SCHEMA_COMMON.websocketMsg.version
+        p.pack(header)
+        p.pack(content)
+        # TODO(robnagler) getbuffer() would be better
+        await handler.write_message(p.bytes(), binary=True)
+    finally:
+        if p:
+            p.reset()
@@ -14,7 +14,6 @@ import sirepo.const
 import sirepo.http_util
 import sirepo.quest
 import sirepo.util
-import user_agents
 
 
 #: We always use the same name for a file upload
@@ -107,6 +106,8 @@ class _SRequestBase(sirepo.quest.Attr):
             # user_agents doesn't see Python's requests module as a bot.
             # The package robot_detection does see it, but we don't want to introduce another dependency.
             return True
+        import user_agents
+
         return user_agents.parse(a).is_bot
 
     def init_quest_for_child(self, child, parent):
@@ -132,6 +133,14 @@ class _SRequestBase(sirepo.quest.Attr):
         self.http_method = "POST"
         self._body_as_dict = body
 
+    def websocket_handler(self):
+        """Connection for `sirepo.reply.websocket_async_msg`
+
+        Returns:
+            object: None if request is not from a websocket
+        """
+        return None
+
 
 class _SRequestCLI(_SRequestBase):
     @classmethod
@@ -307,3 +316,6 @@ class _SRequestWebSocket(_SRequestBase):
 
     def set_log_user(self, log_user):
         self.internal_req.set_log_user(log_user)
+
+    def websocket_handler(self):
+        return self.internal_req.handler
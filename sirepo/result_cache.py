@@ -0,0 +1,171 @@
+"""Sequential results shared across users and simulations
+
+Example simulations are run many times with the same inputs. When a
+simulation type is enabled, completed sequential results are stored
+under `sirepo.srdb.result_cache_dir` keyed by simulation type and
+`SimDataBase.compute_job_content_hash`. A ``runSimulation`` with the
+same key is answered from the cache without running the report.
+
+The run directory is not created on a hit so only enable types whose
+reports are served entirely by the sequential result.
+
+:copyright: Copyright (c) 2026 RadiaSoft LLC.  All Rights Reserved.
+:license: http://www.apache.org/licenses/LICENSE-2.0.html
+"""
+
+from pykern import pkconfig
+from pykern import pkio
+from pykern import pkjson
+from pykern.pkcollections import PKDict
+from pykern.pkdebug import pkdc, pkdexc, pkdlog, pkdp
+import os
+import re
+import sirepo.const
+import sirepo.job
+import sirepo.metrics
+import sirepo.sim_data
+import sirepo.srdb
+import sirepo.util
+
+#: key is <simulationType>/<sha256>
+_KEY_RE = re.compile(r"^(\w+)/([0-9a-f]{64})$")
+
+#: puts between scans of the cache (other processes add to it too)
+_SCAN_PUTS = 100
+
+_cfg = None
+
+#: running size of the cache, which is reset when `_evict` walks it
+_total = None
+
+_puts = 0
+
+
+def get(content, qcall):
+    """Cached result for request
+
+    Sets ``content.resultCacheKey`` if cacheable so the supervisor
+    can return it with the completed result (see `put`).
+
+    Args:
+        content (PKDict): runSimulation request content
+        qcall (quest.API): request
+    Returns:
+        PKDict: completed result or None
+    """
+    if (
+        content.simulationType not in _cfg.sim_types
+        or content.isParallel
+        or content.jobRunMode != sirepo.job.SEQUENTIAL
+    ):
+        return None
+    content.resultCacheKey = (
+        content.simulationType
+        + "/"
+        + sirepo.sim_data.get_class(content.simulationType).compute_job_content_hash(
+            content.data, qcall=qcall
+        )
+    )
+    if content.data.get("forceRun"):
+        return None
+    p = _path(content.resultCacheKey)
+    try:
+        rv = pkjson.load_any(p.read_binary())
+    except Exception as e:
+        if not pkio.exception_is_not_found(e):
+            pkdlog("path={} error={}", p, e)
+        sirepo.metrics.inc("result_cache.miss")
+        return None
+    # LRU: eviction removes the oldest mtime
+    os.utime(p)
+    sirepo.metrics.inc("result_cache.hit")
+    return rv
+
+
+def put(reply):
+    """Save completed result if the reply has a resultCacheKey
+
+    Args:
+        reply (PKDict): from supervisor (resultCacheKey is removed)
+    Returns:
+        PKDict: reply
+    """
+    k = reply.pkdel("resultCacheKey")
+    if not k or reply.get("state") != sirepo.job.COMPLETED:
+        return reply
+    if not _KEY_RE.search(k):
+        raise AssertionError(f"invalid resultCacheKey={k}")
+    p = _path(k)
+    if p.exists():
+        return reply
+    try:
+        pkio.mkdir_parent_only(p)
+        sirepo.util.json_dump(reply, path=p)
+        sirepo.metrics.inc("result_cache.put")
+        _evict(p.size())
+    except Exception as e:
+        pkdlog("path={} error={} stack={}", p, e, pkdexc())
+    return reply
+
+
+def _evict(size):
+    """Remove least recently used results if the cache is too large
+
+    The cache is only walked when the running total is over
+    ``max_bytes`` or every `_SCAN_PUTS`, because the total only counts
+    the puts of this process.
+
+    Args:
+        size (int): bytes of result just put
+    """
+    global _total, _puts
+
+    _puts += 1
+    if _total is not None:
+        _total += size
+        if _total <= _cfg.max_bytes and _puts % _SCAN_PUTS:
+            return
+    f = []
+    t = 0
+    for p in pkio.walk_tree(sirepo.srdb.result_cache_dir()):
+        s = p.stat()
+        f.append((s.mtime, s.size, p))
+        t += s.size
+    if t > _cfg.max_bytes:
+        f.sort(key=lambda x: x[0])
+        for _, s, p in f:
+            pkio.unchecked_remove(p)
+            sirepo.metrics.inc("result_cache.evict")
+            t -= s
+            if t <= _cfg.max_bytes:
+                break
+    _total = t
+
+
+def _init():
+    global _cfg
+
+    _cfg = pkconfig.init(
+        max_bytes=(
+            2**30,
+            pkconfig.parse_bytes,
+            "total size of cached results; least recently used are removed",
+        ),
+        sim_types=(
+            set(),
+            set,
+            "simulation types whose sequential results are shared (none by default)",
+        ),
+    )
+
+
+def _path(key):
+    m = _KEY_RE.search(key)
+    return sirepo.srdb.result_cache_dir().join(
+        m.group(1),
+        m.group(2)[:2],
+        m.group(2) + sirepo.const.JSON_SUFFIX,
+    )
+
+
+_init()
@@ -11,6 +11,7 @@ from pykern.pkdebug import pkdc, pkdexc, pkdlog, pkdp
 from sirepo import simulation_db
 import datetime
 import re
+import sirepo.async_io
 import sirepo.const
 import sirepo.feature_config
 import sirepo.quest
@@ -97,19 +98,21 @@ class API(sirepo.quest.API):
     @sirepo.quest.Spec("require_plan", filename="SimFileName", file_type="SimFileType")
     async def api_deleteLibFile(self):
         req = self.parse_post(filename=True, file_type=True)
-        e = _simulations_using_file(req)
-        if len(e):
-            return self.reply_dict(
-                {
-                    "error": "File is in use in other simulations.",
-                    "fileList": e,
-                    "fileName": req.filename,
-                }
-            )
+        # saves are locked so the file cannot be used before it is removed
+        with simulation_db.user_lock(qcall=self):
+            e = _simulations_using_file(req)
+            if len(e):
+                return self.reply_dict(
+                    {
+                        "error": "File is in use in other simulations.",
+                        "fileList": e,
+                        "fileName": req.filename,
+                    }
+                )
 
-        # Will not remove resource (standard) lib files, because those
-        # live in the resource directoy.
-        pkio.unchecked_remove(_lib_file_write_path(req))
+            # Will not remove resource (standard) lib files, because those
+            # live in the resource directoy.
+            pkio.unchecked_remove(_lib_file_write_path(req))
         return self.reply_ok()
 
     @sirepo.quest.Spec("require_plan", sid="SimId")
@@ -218,7 +221,7 @@ class API(sirepo.quest.API):
         # TODO(pjm): need to unquote when redirecting from saved cookie redirect?
         simulation_name = urllib.parse.unquote(simulation_name)
         # use the existing named simulation, or copy it from the examples
-        rows = simulation_db.iterate_simulation_datafiles(
+        rows = simulation_db.iterate_simulation_index(
             req.type,
             simulation_db.process_simulation_list,
             {
@@ -232,7 +235,7 @@ class API(sirepo.quest.API):
                 if s["models"]["simulation"]["name"] != simulation_name:
                     continue
                 simulation_db.save_new_example(s, qcall=self)
-                rows = simulation_db.iterate_simulation_datafiles(
+                rows = simulation_db.iterate_simulation_index(
                     req.type,
                     simulation_db.process_simulation_list,
                     {
@@ -424,14 +427,17 @@ class API(sirepo.quest.API):
 
     @sirepo.quest.Spec("require_plan", sid="SimId", data="SimData all_input")
     async def api_saveSimulationData(self):
+        def _save(req):
+            return self._simulation_data_reply(
+                req,
+                simulation_db.save_simulation_json(
+                    req.req_data, fixup=True, modified=True, qcall=self
+                ),
+            )
+
         # do not fixup_old_data yet
         req = self.parse_post(id=True, template=True)
-        return self._simulation_data_reply(
-            req,
-            simulation_db.save_simulation_json(
-                req.req_data, fixup=True, modified=True, qcall=self
-            ),
-        )
+        return await sirepo.async_io.run(_save, req)
 
     @sirepo.quest.Spec("allow_visitor")
     async def api_securityTxt(self):
@@ -470,6 +476,13 @@ class API(sirepo.quest.API):
                 )
             return self.headers_for_no_cache(self.reply_dict(_redirect(req)))
 
+        def _read(req):
+            try:
+                d = simulation_db.read_simulation_json(req.type, sid=req.id, qcall=self)
+                return self._simulation_data_reply(req, d)
+            except sirepo.util.SPathNotFound:
+                return _not_found(req)
+
         def _redirect(req):
             return PKDict(
                 # only parsed by sirepo.js appstate.loadModesl
@@ -486,19 +499,18 @@ class API(sirepo.quest.API):
 
         # TODO(pjm): pretty is an unused argument
         # TODO(robnagler) need real type transforms for inputs
-        req = self.parse_params(type=simulation_type, id=simulation_id, template=True)
-        try:
-            d = simulation_db.read_simulation_json(req.type, sid=req.id, qcall=self)
-            return self._simulation_data_reply(req, d)
-        except sirepo.util.SPathNotFound:
-            return _not_found(req)
+        return await sirepo.async_io.run(
+            _read,
+            self.parse_params(type=simulation_type, id=simulation_id, template=True),
+        )
 
     @sirepo.quest.Spec("require_user", search="SearchSpec")
     async def api_listSimulations(self):
         req = self.parse_post()
         return self.reply_list_deprecated(
             sorted(
-                simulation_db.iterate_simulation_datafiles(
+                await sirepo.async_io.run(
+                    simulation_db.iterate_simulation_index,
                     req.type,
                     simulation_db.process_simulation_list,
                     req.req_data.get("search"),
@@ -576,18 +588,22 @@ class API(sirepo.quest.API):
                 req,
             )
         with simulation_db.user_lock(qcall=self):
-            for r in simulation_db.iterate_simulation_datafiles(
+            for r in simulation_db.iterate_simulation_index(
                 req.type,
                 _simulation_data_iterator,
                 qcall=self,
             ):
                 f = r.models.simulation.folder
                 if f == o:
-                    r.models.simulation.folder = n
+                    f = n
                 elif f.startswith(o + "/"):
-                    r.models.simulation.folder = n + f[len(o) :]
+                    f = n + f[len(o) :]
                 else:
                     continue
+                r = simulation_db.read_simulation_json(
+                    req.type, sid=r.models.simulation.simulationId, qcall=self
+                )
+                r.models.simulation.folder = f
                 simulation_db.save_simulation_json(r, fixup=False, qcall=self)
         return self.reply_ok()
 
@@ -788,13 +804,9 @@ def _simulation_data_iterator(res, path, data):
 
 def _simulations_using_file(req, ignore_sim_id=None):
     res = []
-    for r in simulation_db.iterate_simulation_datafiles(
-        req.type,
-        _simulation_data_iterator,
-        qcall=req.qcall,
+    for r in simulation_db.simulations_using_lib_file(
+        req.type, req.filename, qcall=req.qcall
     ):
-        if not req.sim_data.lib_file_in_use(r, req.filename):
-            continue
         s = r.models.simulation
         if s.simulationId == ignore_sim_id:
             continue
@@ -30,6 +30,9 @@ _cfg = None
 #: default compute_model
 _ANIMATION_NAME = "animation"
 
+#: read size for `SimDataBase._lib_file_digest`
+_LIB_FILE_DIGEST_CHUNK = 1024 * 1024
+
 #: models which should not get persisted
 _CLIENT_ONLY_MODELS = frozenset(
     (
@@ -82,6 +85,11 @@ def audit_proprietary_lib_files(qcall, force=False, sim_types=None, uid=None):
     from sirepo import simulation_db, sim_run
 
     def _add(proprietary_code_dir, sim_type, cls):
+        l = simulation_db.simulation_lib_dir(sim_type, qcall=qcall)
+        if not force and all(
+            l.join(f).exists() for f in cls.proprietary_code_lib_file_basenames()
+        ):
+            return
         p = proprietary_code_dir.join(cls.proprietary_code_tarball())
         with sim_run.tmp_dir(chdir=True, qcall=qcall) as t:
             d = t.join(p.basename)
@@ -212,6 +220,42 @@ class SimDataBase(object):
 
     LIB_DIR = sirepo.const.LIB_DIR
 
+    @classmethod
+    def compute_job_content_hash(cls, data, qcall):
+        """Hash of everything which determines a sequential report's result
+
+        Unlike `compute_job_hash`, lib files are hashed by content
+        (not mtime) and the simulation type, report, and schema
+        version are included so the value can be compared across
+        users and simulations (see `sirepo.result_cache`).
+
+        Args:
+            data (dict): simulation data
+            qcall (quest.API): request
+        Returns:
+            str: sha256 hex digest
+        """
+        cls._assert_server_side()
+        res = cls._compute_job_fields_hash(data, hashlib.sha256())
+        res.update(
+            " ".join(
+                (
+                    data.simulationType,
+                    cls.parse_model(data),
+                    cls._simulation_db().SCHEMA_COMMON.version,
+                    # reply may have typed arrays (see job_cmd)
+                    str(bool(data.get("typedArrays"))),
+                )
+            ).encode()
+        )
+        for b in sorted(cls.lib_file_basenames(data)):
+            p = cls._lib_file_abspath(b, qcall)
+            # file may not exist yet if it is an external example datafile
+            if p.exists():
+                res.update(b.encode())
+                res.update(cls._lib_file_digest(p).encode())
+        return res.hexdigest()
+
     @classmethod
     def compute_job_hash(cls, data, qcall):
         """Hash fields related to data and set computeJobHash
@@ -227,32 +271,9 @@ class SimDataBase(object):
             bytes: hash value
         """
         cls._assert_server_side()
-        c = cls.compute_model(data)
-        if data.get("forceRun") or cls.is_parallel(c):
+        if data.get("forceRun") or cls.is_parallel(cls.compute_model(data)):
             return "HashIsUnused"
-        m = data["models"]
-        res = hashlib.md5()
-        fields = sirepo.sim_data.get_class(data.simulationType)._compute_job_fields(
-            data, data.report, c
-        )
-        # values may be string or PKDict
-        fields.sort(key=lambda x: str(x))
-        for f in fields:
-            # assert isinstance(f, pkconfig.STRING_TYPES), \
-            #     'value={} not a string_type'.format(f)
-            # TODO(pjm): work-around for now
-            if isinstance(f, pkconfig.STRING_TYPES):
-                x = f.split(".")
-                value = m[x[0]][x[1]] if len(x) > 1 else m[x[0]]
-            else:
-                value = f
-            res.update(
-                pkjson.dump_bytes(
-                    value,
-                    sort_keys=True,
-                    allow_nan=False,
-                )
-            )
+        res = cls._compute_job_fields_hash(data, hashlib.md5())
         res.update(
             "".join(
                 (
@@ -426,6 +447,19 @@ class SimDataBase(object):
         """
         return basename.endswith(".zip")
 
+    @classmethod
+    def lib_file_in_basenames(cls, basenames, basename):
+        """Check if file is in `lib_file_basenames`
+
+        Args:
+            basenames (iterable): from `lib_file_basenames`
+            basename (str): to check
+        Returns:
+            bool: True if `basename` in `basenames` ignoring type
+        """
+        b = cls.lib_file_name_without_type(basename)
+        return any(f for f in basenames if cls.lib_file_name_without_type(f) == b)
+
     @classmethod
     def lib_file_in_use(cls, data, basename):
         """Check if file in use by simulation
@@ -436,12 +470,7 @@ class SimDataBase(object):
         Returns:
             bool: True if `basename` in use by `data`
         """
-        return any(
-            f
-            for f in cls.lib_file_basenames(data)
-            if cls.lib_file_name_without_type(f)
-            == cls.lib_file_name_without_type(basename)
-        )
+        return cls.lib_file_in_basenames(cls.lib_file_basenames(data), basename)
 
     @classmethod
     def lib_file_names_for_type(cls, file_type, qcall=None):
@@ -1108,6 +1137,33 @@ class SimDataBase(object):
                 dynamic=dynamic,
             )
 
+    @classmethod
+    def _compute_job_fields_hash(cls, data, res):
+        """Update `res` with the values of `_compute_job_fields`"""
+        m = data["models"]
+        fields = sirepo.sim_data.get_class(data.simulationType)._compute_job_fields(
+            data, data.report, cls.compute_model(data)
+        )
+        # values may be string or PKDict
+        fields.sort(key=lambda x: str(x))
+        for f in fields:
+            # assert isinstance(f, pkconfig.STRING_TYPES), \
+            #     'value={} not a string_type'.format(f)
+            # TODO(pjm): work-around for now
+            if isinstance(f, pkconfig.STRING_TYPES):
+                x = f.split(".")
+                value = m[x[0]][x[1]] if len(x) > 1 else m[x[0]]
+            else:
+                value = f
+            res.update(
+                pkjson.dump_bytes(
+                    value,
+                    sort_keys=True,
+                    allow_nan=False,
+                )
+            )
+        return res
+
     @classmethod
     def _is_agent_side(cls):
         from sirepo import sim_db_file
@@ -1123,6 +1179,19 @@ class SimDataBase(object):
             .join(basename)
         )
 
+    @classmethod
+    def _lib_file_digest(cls, path):
+        """sha256 of contents of `path` memoized by stat signature"""
+        s = os.stat(path)
+        k = (str(path), s.st_ino, s.st_size, s.st_mtime_ns)
+        if rv := _lib_file_digest_cache.get(k):
+            return rv
+        res = hashlib.sha256()
+        with open(path, "rb") as f:
+            for b in iter(lambda: f.read(_LIB_FILE_DIGEST_CHUNK), b""):
+                res.update(b)
+        return _lib_file_digest_cache.set(k, res.hexdigest())
+
     @classmethod
     def _lib_file_abspath_or_exists(
         cls,
@@ -1284,5 +1353,12 @@ class SimDataBase(object):
 
 
 _cfg = pkconfig.init(
+    lib_file_digest_cache_max=(
+        1000,
+        pkconfig.parse_positive_int,
+        "lib file content digests memoized by stat signature",
+    ),
     lib_file_resource_only=(False, bool, "used by utility programs"),
 )
+
+_lib_file_digest_cache = sirepo.util.LRU(_cfg.lib_file_digest_cache_max)
@@ -9,7 +9,6 @@ from pykern.pkdebug import pkdc, pkdlog, pkdp
 from sirepo.template.lattice import LatticeUtil
 from sirepo.template.template_common import ParticleEnergy
 import math
-import numpy
 import re
 import sirepo.sim_data
 import sirepo.simulation_db
@@ -288,6 +287,8 @@ class AmpConverter:
         )
 
     def __interpolate_table(self, value, from_index, to_index):
+        import numpy
+
         if not self._amp_table:
             return self._default_factor
         table = numpy.vstack(self._amp_table)
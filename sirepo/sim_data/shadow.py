@@ -8,7 +8,6 @@ from __future__ import absolute_import, division, print_function
 from pykern.pkcollections import PKDict
 from pykern.pkdebug import pkdc, pkdlog, pkdp
 import sirepo.sim_data
-import scipy.constants
 
 
 class SimData(sirepo.sim_data.SimDataBase):
@@ -32,6 +31,8 @@ class SimData(sirepo.sim_data.SimDataBase):
             ),
         )
         if "magneticField" not in dm.bendingMagnet:
+            import scipy.constants
+
             dm.bendingMagnet.magneticField = (
                 1e9
                 / scipy.constants.c
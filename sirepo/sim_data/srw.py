@@ -9,7 +9,6 @@ from pykern import pkio
 from pykern.pkcollections import PKDict
 from pykern.pkdebug import pkdc, pkdlog, pkdp
 import math
-import numpy
 import re
 import sirepo.sim_data
 
@@ -248,6 +247,7 @@ class SimData(sirepo.sim_data.SimDataBase):
         """Find closest string value from the input list to
         the specified angle (in radians).
         """
+        import numpy
 
         def _wrap(a):
             """Convert an angle to constraint it between -pi and pi.
@@ -13,7 +13,6 @@ from pykern import pkjson
 from pykern.pkcollections import PKDict
 from pykern.pkdebug import pkdp, pkdlog, pkdexc
 import aiofiles
-import aiohttp
 import re
 import sirepo.agent_supervisor_api
 import sirepo.const
@@ -241,6 +240,8 @@ class SimDbServer(sirepo.agent_supervisor_api.ReqBase):
         # so update is atomic
         t = path + ".tmp"
         try:
+            import aiohttp
+
             async with aiohttp.ClientSession() as s:
                 async with s.get(args.src_url) as r:
                     if r.status != 200:
@@ -34,6 +34,7 @@ import sirepo.resource
 import sirepo.srdb
 import sirepo.template
 import sirepo.util
+import threading
 import time
 
 #: Names to display to use for jobRunMode
@@ -43,6 +44,9 @@ JOB_RUN_MODE_MAP = None
 #: Schema common values, e.g. version
 SCHEMA_COMMON = None
 
+#: summaries of a user's simulations of one type (see `iterate_simulation_index`)
+SIM_INDEX_BASENAME = "sim-index.json"
+
 #: DEPRECATED use sirepo.const.SIM_DATA_BASENAME
 SIMULATION_DATA_FILE = sirepo.const.SIM_DATA_BASENAME
 
@@ -82,8 +86,8 @@ _cfg = None
 #: begin alnum/under, end with alnum, 128 chars max
 _SIM_DB_BASENAME_RE = re.compile(r"^[a-zA-Z0-9_][a-zA-Z0-9_\.-]{1,126}[a-zA-Z0-9]$")
 
-#: For re-entrant `user_lock`
-_USER_LOCK = PKDict(paths=set())
+#: For re-entrant `user_lock` per thread (see `sirepo.async_io`)
+_USER_LOCK = threading.local()
 
 
 _SERIAL_INITIALIZE = -1
@@ -142,7 +146,9 @@ def default_data(sim_type):
 
 def delete_simulation(simulation_type, sid, qcall=None):
     """Deletes the simulation's directory."""
-    pkio.unchecked_remove(simulation_dir(simulation_type, sid, qcall=qcall))
+    with user_lock(qcall=qcall):
+        pkio.unchecked_remove(simulation_dir(simulation_type, sid, qcall=qcall))
+        _sim_index_set(simulation_dir(simulation_type, qcall=qcall), sid, None, qcall)
 
 
 def delete_user(qcall):
@@ -165,7 +171,7 @@ def examples(app):
 
 def find_user_simulation_copy(sim_type, sid, qcall):
     """ONLY USED BY api_simulationData"""
-    rows = iterate_simulation_datafiles(
+    rows = iterate_simulation_index(
         sim_type,
         process_simulation_list,
         PKDict({"simulation.outOfSessionSimulationId": sid}),
@@ -328,6 +334,41 @@ def iterate_simulation_datafiles(simulation_type, op, search=None, qcall=None):
     return res
 
 
+def iterate_simulation_index(simulation_type, op, search=None, qcall=None):
+    """Like `iterate_simulation_datafiles` without reading every simulation
+
+    Each user has an index per simulation type of ``models.simulation``
+    and lib files used by the simulations. Entries are checked against
+    the size and mtime of the simulation's file so only new or changed
+    simulations are read.
+
+    ``data`` passed to `op` only contains ``models.simulation``,
+    ``simulationType``, and ``libFiles`` (basenames or None if
+    unknown). Searches on other models use
+    `iterate_simulation_datafiles`.
+
+    Args:
+        simulation_type (str): app
+        op (callable): called with (res, path, data)
+        search (dict): ``simulation.<field>`` to value [None]
+        qcall (quest.API): request
+    Returns:
+        list: built by op
+    """
+    if search and any(not k.startswith("simulation.") for k in search):
+        return iterate_simulation_datafiles(
+            simulation_type, op, search=search, qcall=qcall
+        )
+    res = []
+    d = simulation_dir(simulation_type, qcall=qcall)
+    for k, v in sorted(_sim_index(simulation_type, d, qcall).items()):
+        x = _sim_index_data(simulation_type, v)
+        if search and not _search_data(x, search):
+            continue
+        op(res, d.join(k, SIMULATION_DATA_FILE), x)
+    return res
+
+
 def json_filename(filename, run_dir=None):
     """DEPRECATED use sirepo.util.json_path"""
     return sirepo.util.json_path(path=filename, run_dir=None)
@@ -397,6 +438,11 @@ def migrate_guest_to_persistent_user(guest_uid, to_uid, qcall):
                 n = o.replace(guest_uid, to_uid)
                 pkio.mkdir_parent(n)
                 os.rename(o, n)
+                # indexes are rebuilt on next use
+                for x in o, n:
+                    pkio.unchecked_remove(
+                        os.path.join(os.path.dirname(x), SIM_INDEX_BASENAME),
+                    )
 
 
 def open_json_file(sim_type, path=None, sid=None, fixup=True, qcall=None):
@@ -500,6 +546,23 @@ def read_simulation_json(sim_type, sid, qcall):
     return d
 
 
+def rebuild_simulation_index(simulation_type, qcall=None):
+    """Recreate the index of the user's simulations of `simulation_type`
+
+    Reads every simulation so use to backfill lib file references (see
+    `simulations_using_lib_file`) or after moving simulation directories.
+
+    Args:
+        simulation_type (str): app
+        qcall (quest.API): logged in user
+    Returns:
+        int: number of simulations indexed
+    """
+    d = simulation_dir(simulation_type, qcall=qcall)
+    pkio.unchecked_remove(d.join(SIM_INDEX_BASENAME))
+    return len(_sim_index(simulation_type, d, qcall))
+
+
 def save_new_example(data, qcall=None):
     data.models.simulation.isExample = True
     return save_new_simulation(
@@ -533,8 +596,18 @@ def save_simulation_json(data, fixup, do_validate=True, qcall=None, modified=Fal
         uid (str): user id [None]
         do_validate (bool): call srschema.validate_name [True]
         modified (bool): call prepare_for_save and update lastModified [False]
+
+    If `data` contains changedModels (sent by the client on autosave),
+    only those models' fields are validated unless the name or folder
+    changed. changedModels is not saved.
     """
 
+    def _changed_models(data):
+        c = data.pkdel("changedModels")
+        if not isinstance(c, list):
+            return None
+        return [m for m in c if isinstance(m, str)]
+
     def _serial(incoming, on_disk):
         # Serial numbers are 16 digits (time represented in microseconds
         # since epoch) which are always less than Javascript's
@@ -578,6 +651,7 @@ def save_simulation_json(data, fixup, do_validate=True, qcall=None, modified=Fal
             )
 
     _version_validate(data)
+    changed = _changed_models(data)
     if fixup:
         data = fixup_old_data(data, qcall=qcall)[0]
         if modified:
@@ -602,7 +676,7 @@ def save_simulation_json(data, fixup, do_validate=True, qcall=None, modified=Fal
         if need_validate and do_validate:
             srschema.validate_name(
                 data,
-                iterate_simulation_datafiles(
+                iterate_simulation_index(
                     sim_type,
                     lambda res, _, d: res.append(d),
                     PKDict({"simulation.folder": s.folder}),
@@ -611,6 +685,10 @@ def save_simulation_json(data, fixup, do_validate=True, qcall=None, modified=Fal
                 SCHEMA_COMMON.common.constants.maxSimCopies,
             )
             srschema.validate_fields(data, get_schema(data.simulationType))
+        elif changed and do_validate:
+            srschema.validate_fields(
+                data, get_schema(data.simulationType), models=changed
+            )
         s.simulationSerial = _serial(s, on_disk)
         # Do not write simulationStatus or computeJobCacheKey
         d = copy.deepcopy(data)
@@ -618,6 +696,7 @@ def save_simulation_json(data, fixup, do_validate=True, qcall=None, modified=Fal
         if modified:
             d.models.simulation.lastModified = srtime.utc_now_as_milliseconds()
         write_json(fn, d)
+        _sim_index_set(fn.dirpath().dirpath(), s.simulationId, d, qcall)
     return data
 
 
@@ -710,6 +789,48 @@ def simulation_run_dir(req_or_data, remove_dir=False, qcall=None):
     return d
 
 
+def simulations_using_lib_file(simulation_type, basename, qcall=None):
+    """Simulations which reference lib file `basename` ignoring its type
+
+    Uses the lib file references in the index, which are validated
+    like `iterate_simulation_index`. Only simulations whose lib files
+    are unknown are read. Hold `user_lock` to keep the result valid,
+    e.g. while deleting `basename`.
+
+    Args:
+        simulation_type (str): app
+        basename (str): lib file
+        qcall (quest.API): logged in user
+    Returns:
+        list: ``data`` as passed to op by `iterate_simulation_index`
+    """
+    from sirepo import sim_data
+
+    def _in_use(sid, entry):
+        if entry.libFiles is not None:
+            return c.lib_file_in_basenames(entry.libFiles, basename)
+        try:
+            return c.lib_file_in_use(
+                open_json_file(
+                    simulation_type,
+                    path=d.join(sid, SIMULATION_DATA_FILE),
+                    qcall=qcall,
+                ),
+                basename,
+            )
+        except Exception as e:
+            pkdlog("sid={} error={}", sid, e)
+            return False
+
+    c = sim_data.get_class(simulation_type)
+    d = simulation_dir(simulation_type, qcall=qcall)
+    return [
+        _sim_index_data(simulation_type, v)
+        for k, v in sorted(_sim_index(simulation_type, d, qcall).items())
+        if _in_use(k, v)
+    ]
+
+
 def srunit_logged_in_user(uid):
     from pykern import pkunit
 
@@ -766,16 +887,19 @@ def user_lock(uid=None, qcall=None):
     """
     assert qcall
     p = user_path(uid=uid, qcall=qcall, check=True)
-    if p in _USER_LOCK.paths:
+    l = getattr(_USER_LOCK, "paths", None)
+    if l is None:
+        l = _USER_LOCK.paths = set()
+    if p in l:
         # re-enter, already locked path
         yield p
     else:
         try:
-            _USER_LOCK.paths.add(p)
+            l.add(p)
             with sirepo.file_lock.FileLock(p):
                 yield p
         finally:
-            _USER_LOCK.paths.discard(p)
+            l.discard(p)
 
 
 def user_path(uid=None, qcall=None, check=False):
@@ -1001,6 +1125,117 @@ def _search_data(data, search):
     return True
 
 
+def _sim_index(simulation_type, sim_dir, qcall):
+    """Validated index of `sim_dir`, which is updated under `user_lock`"""
+    p = sim_dir.join(SIM_INDEX_BASENAME)
+    with user_lock(qcall=qcall):
+        i = _sim_index_read(p)
+        rv = PKDict()
+        c = i is None
+        i = PKDict() if c else i.simulations
+        for n in os.listdir(sim_dir):
+            if not _ID_RE.search(n):
+                continue
+            f = sim_dir.join(n, SIMULATION_DATA_FILE)
+            try:
+                s = os.stat(f)
+            except FileNotFoundError:
+                continue
+            x = i.get(n)
+            if x and x.mtime == s.st_mtime_ns and x.size == s.st_size:
+                rv[n] = x
+                continue
+            c = True
+            try:
+                rv[n] = _sim_index_entry(
+                    open_json_file(simulation_type, path=f, fixup=True, qcall=qcall),
+                    simulation_type,
+                    s,
+                )
+            except ValueError as e:
+                pkdlog("{}: error: {}", f, e)
+        if c or len(rv) != len(i):
+            _sim_index_write(p, rv)
+    return rv
+
+
+def _sim_index_data(simulation_type, entry):
+    return PKDict(
+        libFiles=entry.libFiles,
+        models=PKDict(simulation=entry.simulation),
+        simulationType=simulation_type,
+    )
+
+
+def _sim_index_entry(data, simulation_type, stat):
+    from sirepo import sim_data
+
+    try:
+        l = sim_data.get_class(simulation_type).lib_file_basenames(data)
+    except Exception as e:
+        pkdlog(
+            "lib_file_basenames sid={} error={} stack={}",
+            data.models.simulation.get("simulationId"),
+            e,
+            pkdexc(),
+        )
+        l = None
+    return PKDict(
+        libFiles=l,
+        mtime=stat.st_mtime_ns,
+        simulation=data.models.simulation,
+        size=stat.st_size,
+    )
+
+
+def _sim_index_read(path):
+    try:
+        rv = pkjson.load_any(path)
+        if rv.version == SCHEMA_COMMON.version:
+            return rv
+    except Exception as e:
+        if not pkio.exception_is_not_found(e):
+            pkdlog("path={} error={}", path, e)
+    # fixup_old_data may change models.simulation so rebuild
+    return None
+
+
+def _sim_index_set(sim_dir, sid, data, qcall):
+    """Update sid's entry in an existing index under `user_lock`"""
+    p = sim_dir.join(SIM_INDEX_BASENAME)
+    with user_lock(qcall=qcall):
+        i = _sim_index_read(p)
+        if i is None:
+            return
+        i = i.simulations
+        if data is None:
+            i.pkdel(sid)
+        else:
+            i[sid] = _sim_index_entry(
+                data,
+                data.simulationType,
+                os.stat(sim_dir.join(sid, SIMULATION_DATA_FILE)),
+            )
+        _sim_index_write(p, i)
+
+
+def _sim_index_write(path, simulations):
+    try:
+        pkio.atomic_write(
+            path,
+            pkjson.dump_pretty(
+                PKDict(
+                    simulations=simulations,
+                    version=SCHEMA_COMMON.version,
+                ),
+                pretty=False,
+            ),
+        )
+    except Exception as e:
+        # index is rebuilt when it cannot be read
+        pkdlog("path={} error={}", path, e)
+
+
 def _sim_from_path(path):
     prev = None
     p = path
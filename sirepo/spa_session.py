@@ -7,14 +7,18 @@
 from pykern.pkdebug import pkdp, pkdlog, pkdexc
 from pykern.pkcollections import PKDict
 import contextlib
-import datetime
+import os
 import sirepo.quest
 import sirepo.srtime
 import sirepo.util
 import threading
 
-_REFRESH_SESSION = datetime.timedelta(seconds=5 * 60)
+#: marker in the user's directory whose mtime is the last session begin
+_BEGIN_BASENAME = ".spa-session"
 
+_REFRESH_SESSION_SECS = 5 * 60
+
+#: last session begin by uid in this process
 _DB = PKDict()
 
 _initialized = None
@@ -35,20 +39,31 @@ async def maybe_begin(qcall):
             pkdlog("ignoring exception={} stack={}", e, pkdexc())
 
     def _check():
+        from sirepo import simulation_db
+
         try:
             u = qcall.auth.logged_in_user(check_path=True)
         except sirepo.util.UserDirNotFound as e:
             pkdlog("ignoring exception={}, because api call will check", e)
             return False
-        t = sirepo.srtime.utc_now()
-        s = _DB.get(u)
-        if s:
-            if t - s.request_time < _REFRESH_SESSION:
+        t = sirepo.srtime.utc_now_as_float()
+        if t - _DB.get(u, 0) < _REFRESH_SESSION_SECS:
+            return False
+        # Other server processes may have begun the session
+        p = simulation_db.user_path(qcall=qcall).join(_BEGIN_BASENAME)
+        try:
+            m = os.stat(p).st_mtime
+            if t - m < _REFRESH_SESSION_SECS:
+                _DB[u] = m
                 return False
-            s.request_time = t
-        else:
-            s = PKDict(request_time=t)
-            _DB[u] = s
+        except FileNotFoundError:
+            pass
+        _DB[u] = t
+        try:
+            p.ensure()
+            os.utime(p, (t, t))
+        except Exception as e:
+            pkdlog("path={} error={}", p, e)
         return True
 
     if qcall.sreq.method_is_post() and qcall.auth.is_logged_in() and _check():
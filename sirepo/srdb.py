@@ -29,6 +29,9 @@ _PROPRIETARY_CODE_DIR = "proprietary_code"
 #: where job db is stored under srdb.root
 _SUPERVISOR_DB_SUBDIR = "supervisor-job"
 
+#: shared results (see `sirepo.result_cache`) under srdb.root
+_RESULT_CACHE_SUBDIR = "result-cache"
+
 
 def proprietary_code_dir(sim_type):
     """Directory for proprietary code binaries
@@ -39,6 +42,11 @@ def proprietary_code_dir(sim_type):
     return root().join(_PROPRIETARY_CODE_DIR, sim_type)
 
 
+def result_cache_dir():
+    """Directory for results shared by all users"""
+    return root().join(_RESULT_CACHE_SUBDIR)
+
+
 def root():
     return _root or _init_root()
 
@@ -17,6 +17,9 @@ _NAME_ILLEGALS = r'\/|&:+?\'*"<>'
 _NAME_ILLEGALS_RE = re.compile(r"[" + re.escape(_NAME_ILLEGALS) + "]")
 _NAME_ILLEGAL_PERIOD = re.compile(r"^\.|\.$")
 
+#: compiled field checks by simulationType (see _compiled_models)
+_compiled = PKDict()
+
 
 def get_enums(schema, name):
     enum_dict = PKDict()
@@ -66,33 +69,44 @@ def parse_name(name):
     return n
 
 
-def validate_fields(data, schema):
+def validate_fields(data, schema, models=None):
     """Validate the values of the fields in model data
 
     Validations performed:
         enums (see _validate_enum)
         numeric values (see _validate_number)
 
+    The checks are compiled once per schema into a table of the
+    fields which have an enum type or numeric limits so other fields
+    are not examined.
+
     Args:
         data (PKDict): model data
         schema (PKDict): schema which data inmplements
+        models (iterable): only validate these model names [None: all]
     """
-    sch_models = schema.model
-    sch_enums = schema.enum
-    for model_name in data.models:
-        if model_name not in sch_models:
+    c = _compiled_models(schema)
+    for model_name in data.models if models is None else models:
+        if model_name not in c or model_name not in data.models:
             continue
-        sch_model = sch_models[model_name]
         model_data = data.models[model_name]
-        for field_name in model_data:
-            if field_name not in sch_model:
+        for field_name, check in c[model_name].items():
+            if field_name not in model_data:
                 continue
             val = model_data[field_name]
             if val == "":
                 continue
-            sch_field_info = sch_model[field_name]
-            _validate_enum(val, sch_field_info, sch_enums)
-            _validate_number(val, sch_field_info)
+            if check.enum is not None and str(val) not in check.enum:
+                raise AssertionError(
+                    util.err(
+                        schema.enum,
+                        "enum {} value {} not in schema",
+                        check.info[1],
+                        val,
+                    )
+                )
+            if check.limits is not None:
+                _validate_limits(val, check.info, *check.limits)
 
 
 def validate_name(data, data_files, max_copies):
@@ -166,6 +180,57 @@ def validate(schema):
     _validate_strings(schema.strings)
 
 
+def _compile_limits(sch_field_info):
+    """Numeric limits of the field as used by _validate_number
+
+    Returns:
+        tuple: (fmin, fmax or None) or None if no (numeric) limits
+    """
+    if len(sch_field_info) <= 4:
+        return None
+    try:
+        fmin = float(sch_field_info[4])
+    except (ValueError, TypeError):
+        return None
+    if len(sch_field_info) > 5:
+        try:
+            return (fmin, float(sch_field_info[5]))
+        except (ValueError, TypeError):
+            pass
+    return (fmin, None)
+
+
+def _compile_model(sch_model, sch_enums):
+    res = PKDict()
+    for field_name, sch_field_info in sch_model.items():
+        e = None
+        if sch_field_info[1] in sch_enums:
+            e = frozenset(str(v[0]) for v in sch_enums[sch_field_info[1]])
+        l = _compile_limits(sch_field_info)
+        if e is not None or l is not None:
+            res[field_name] = PKDict(enum=e, info=sch_field_info, limits=l)
+    return res
+
+
+def _compiled_models(schema):
+    """Field checks for each model in `schema`
+
+    Compiled on first use. Recompiled if the schema object for the
+    simulationType changes, which only happens in tests.
+    """
+    t = schema.get("simulationType")
+    c = _compiled.get(t)
+    if c is None or c.schema is not schema:
+        c = PKDict(
+            models=PKDict(
+                (k, _compile_model(v, schema.enum)) for k, v in schema.model.items()
+            ),
+            schema=schema,
+        )
+        _compiled[t] = c
+    return c.models
+
+
 def _validate_enum(val, sch_field_info, sch_enums):
     """Ensure the value of an enum field is one listed in the schema
 
@@ -216,36 +281,31 @@ def _validate_model_name(model_name):
         )
 
 
-def _validate_number(val, sch_field_info):
-    """Ensure the value of a numeric field falls within the supplied limits (if any)
-
-    Args:
-        val: numeric value to validate
-        sch_field_info ([str]): field info array from schema
-    """
-    if len(sch_field_info) <= 4:
-        return
+def _validate_limits(val, sch_field_info, fmin, fmax):
     try:
         fv = float(val)
-        fmin = float(sch_field_info[4])
-    # Currently the values in enum arrays at the indices below are sometimes
-    # used for other purposes, so we return rather than fail for non-numeric values.
-    # Also ignore object-valued fields
     except (ValueError, TypeError):
         return
-    if fv < fmin:
+    if fv < fmin or (fmax is not None and fv > fmax):
         raise AssertionError(
             util.err(sch_field_info, "numeric value {} out of range", val)
         )
-    if len(sch_field_info) > 5:
-        try:
-            fmax = float(sch_field_info[5])
-        except ValueError:
-            return
-        if fv > fmax:
-            raise AssertionError(
-                util.err(sch_field_info, "numeric value {} out of range", val)
-            )
+
+
+def _validate_number(val, sch_field_info):
+    """Ensure the value of a numeric field falls within the supplied limits (if any)
+
+    Currently the values in enum arrays at the limit indices are
+    sometimes used for other purposes, so non-numeric limits or values
+    are ignored. Also ignore object-valued fields.
+
+    Args:
+        val: numeric value to validate
+        sch_field_info ([str]): field info array from schema
+    """
+    l = _compile_limits(sch_field_info)
+    if l is not None:
+        _validate_limits(val, sch_field_info, *l)
 
 
 def _validate_strings(strings):
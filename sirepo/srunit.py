@@ -263,6 +263,14 @@ class _TestClient:
                             str(f.get(m.group(1))),
                         )
 
+    def sr_async_msg(self):
+        """Wait for a runStatusUpdate pushed by the server
+
+        Returns:
+            PKDict: content of asyncMsg
+        """
+        return self._websocket.recv_async_msg()
+
     def sr_auth_state(self, **kwargs):
         """Gets authState and parses
 
@@ -926,9 +934,21 @@ class _WebSocket:
     def __init__(self, test_client):
         self._enabled = False
         self._connection = None
+        self.async_msgs = []
         self.test_client = test_client
         self._is_async = None
 
+    def recv_async_msg(self):
+        while not self.async_msgs:
+            r = _WebSocketResponse(
+                self._connection.recv(timeout=self.test_client.timeout_secs()),
+                None,
+                self,
+            )
+            if not r.is_async_msg:
+                raise AssertionError(f"expecting asyncMsg, not reply={r.data}")
+        return self.async_msgs.pop(0)
+
     def save_cookie_hash(self):
         self._cookie_hash = self._hash_cookies()
 
@@ -1161,6 +1181,9 @@ class _WebSocketResponse(_Response):
             raise util.Error(f"unexpected status={self.status_code}", "reply={}", d)
         return self._maybe_json_decode()
 
+    def _async_msg_runStatusUpdate(self, content):
+        self._websocket.async_msgs.append(content)
+
     def _async_msg_setCookies(self, content):
         self._test_client.cookie_jar.extract_cookies(
             response=PKDict(info=lambda: PKDict(get_all=lambda x, y: content)),
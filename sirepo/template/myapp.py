@@ -12,6 +12,7 @@ from sirepo.template import template_common
 import copy
 import csv
 import numpy
+import os
 import re
 import sirepo.sim_data
 import sirepo.util
@@ -90,6 +91,11 @@ def sim_frame_activityAnimation(frame_args):
     )
 
 
+def stateless_compute_fastcgi_pid(data, **kwargs):
+    # a different jid than stateful_compute so the supervisor runs both at once
+    return stateful_compute_fastcgi_pid(data, **kwargs)
+
+
 def stateless_compute_global_resources(data, **kwargs):
     import sirepo.global_resources
 
@@ -98,6 +104,16 @@ def stateless_compute_global_resources(data, **kwargs):
     )
 
 
+def stateful_compute_fastcgi_pid(data, **kwargs):
+    """Process which served the msg and when, for testing agents and fastcgi workers"""
+    assert pkconfig.channel_in_internal_test()
+    s = time.time()
+    # Not asyncio.sleep: not in coroutine (job_cmd)
+    time.sleep(data.args.get("sleep_secs", 0))
+    # parent is the agent
+    return PKDict(end=time.time(), pid=os.getpid(), ppid=os.getppid(), start=s)
+
+
 def stateful_compute_sim_data(data, **kwargs):
     assert pkconfig.channel_in_internal_test()
     m = data.args.test_method
@@ -118,6 +118,8 @@ _REPORT_RES_MAP = PKDict(
 _RSOPT_OBJECTIVE_FUNCTION_OUT = "objective_function_results.h5"
 _SIM_DATA, SIM_TYPE, SCHEMA = sirepo.sim_data.template_globals()
 _SDDS_INDEX = 0
+# float arrays in field data which are sent as typed arrays (vtk uses float32)
+_VECTOR_ARRAYS = PKDict(directions="float32", magnitudes="float32", vertices="float32")
 _SIM_FILES = [b.basename for b in _SIM_DATA.sim_file_basenames(None)]
 
 _ZERO = [0, 0, 0]
@@ -151,6 +153,14 @@ def code_var(variables):
     return code_variable.CodeVar(variables, code_variable.PurePythonEval())
 
 
+def encode_typed_arrays(reply):
+    """Also encode field vectors (see `template_common.encode_typed_arrays`)"""
+    for d in reply.get("data", []):
+        if isinstance(d, dict) and "vectors" in d:
+            template_common.encode_typed_arrays(d.vectors, fields=_VECTOR_ARRAYS)
+    return template_common.encode_typed_arrays(reply)
+
+
 def extract_report_data(run_dir, sim_in):
     assert sim_in.report in _REPORTS, "report={}: unknown report".format(sim_in.report)
     _SIM_DATA.sim_files_to_run_dir(sim_in, run_dir, post_init=True)
@@ -172,7 +182,7 @@ def extract_report_data(run_dir, sim_in):
             field_paths=sim_in.models.fieldPaths.paths,
         )
         template_common.write_sequential_result(
-            d,
+            _vectors_reply(d),
             run_dir=run_dir,
         )
     if sim_in.report == "kickMapReport":
@@ -2102,6 +2112,14 @@ def _validate_objects(objects):
                 )
 
 
+def _vectors_reply(geom_data):
+    for d in geom_data.get("data", []):
+        if "vectors" not in d:
+            continue
+        d.vectors = radia_util.vectors_to_lists(d.vectors)
+    return geom_data
+
+
 _H5_PATH_ID_MAP = _geom_h5_path("idMap")
 _H5_PATH_KICK_MAP = _geom_h5_path("kickMap")
 _H5_PATH_SOLUTION = _geom_h5_path("solution")
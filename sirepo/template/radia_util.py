@@ -446,12 +446,12 @@ def free_symmetries(g_id):
 
 def geom_to_data(g_id, name=None, divide=True):
     def _to_pkdict(d):
-        if not isinstance(d, dict):
-            return d
-        rv = PKDict()
-        for k, v in d.items():
-            rv[k] = _to_pkdict(v)
-        return rv
+        # lists become arrays so they are stored as typed datasets
+        if isinstance(d, dict):
+            return PKDict({k: _to_pkdict(v) for k, v in d.items()})
+        if isinstance(d, list):
+            return numpy.asarray(d)
+        return d
 
     n = (name if name is not None else str(g_id)) + ".Geom"
     pd = PKDict(name=n, id=g_id, data=[])
@@ -544,22 +544,19 @@ def get_electron_trajectory(g_id, **kwargs):
 
 
 # path is *flattened* array of positions in space ([x1, y1, z1,...xn, yn, zn])
+# returns array of shape (n, 2, 3): [[[px, py, pz], [vx, vy, vz]], ...]
 def get_field(g_id, f_type, path):
     if len(path) == 0:
         return []
-    pv_arr = []
-    p = numpy.reshape(path, (-1, 3)).tolist()
-    b = []
     # get every component (meaning e.g. passing 'B' and not 'Bx' etc.)
     f = radia.Fld(g_id, f_type, path)
     # a dummy value returned by parallel radia
-    if f == 0:
+    if isinstance(f, (int, float)) and f == 0:
         f = numpy.zeros(len(path))
-    b.extend(f)
-    b = numpy.reshape(b, (-1, 3)).tolist()
-    for p_idx, pt in enumerate(p):
-        pv_arr.append([pt, b[p_idx]])
-    return pv_arr
+    return numpy.stack(
+        (numpy.reshape(path, (-1, 3)), numpy.reshape(f, (-1, 3))),
+        axis=1,
+    )
 
 
 def get_magnetization(g_id):
@@ -623,29 +620,32 @@ def solve(g_id, prec, max_iter, solve_method):
 
 def vector_field_to_data(g_id, name, pv_arr, units):
     # format is [[[px, py, pz], [vx, vy, vx]], ...]
-    # UNLESS only one element?
-    # convert to webGL object
-    if len(numpy.shape(pv_arr)) == 2:
-        pv_arr = [pv_arr]
+    # UNLESS only one element
+    # convert to webGL object with flat float arrays
+    a = numpy.reshape(numpy.asarray(pv_arr, dtype=float), (-1, 2, 3))
+    n = numpy.linalg.norm(a[:, 1], axis=1)
     v_data = new_geom_object()
     v_data.id = g_id
     v_data.vectors.lengths = []
     v_data.vectors.colors = []
-    v_max = 0.0
-    v_min = sys.float_info.max
-    for i in range(len(pv_arr)):
-        p = pv_arr[i][0]
-        v = pv_arr[i][1]
-        n = numpy.linalg.norm(v)
-        v_max = max(v_max, n)
-        v_min = min(v_min, n)
-        nv = (numpy.array(v) / (n if n > 0 else 1.0)).tolist()
-        v_data.vectors.vertices.extend(p)
-        v_data.vectors.directions.extend(nv)
-        v_data.vectors.magnitudes.append(n)
-    v_data.vectors.range = [v_min, v_max]
+    v_data.vectors.vertices = a[:, 0].ravel()
+    v_data.vectors.directions = (a[:, 1] / numpy.where(n > 0, n, 1.0)[:, None]).ravel()
+    v_data.vectors.magnitudes = n
+    v_data.vectors.range = (
+        [float(n.min()), float(n.max())] if len(n) else [sys.float_info.max, 0.0]
+    )
     v_data.vectors.units = units
 
     return PKDict(
         name=name + ".Field", id=g_id, data=[v_data], bounds=radia.ObjGeoLim(g_id)
     )
+
+
+def vectors_to_lists(vectors):
+    """Copy of `vectors` with arrays converted to lists for json"""
+    return PKDict(
+        {
+            k: v.tolist() if isinstance(v, numpy.ndarray) else v
+            for k, v in vectors.items()
+        }
+    )
@@ -52,6 +52,14 @@ def stateless_compute_analysis_run_log(data, **kwargs):
     return r
 
 
+def stateless_compute_analysis_workers(data, **kwargs):
+    return _request_scan_monitor(PKDict(method="analysis_workers", data=data))
+
+
+def stateless_compute_cancel_analysis(data, **kwargs):
+    return _request_scan_monitor(PKDict(method="cancel_analysis", data=data))
+
+
 def stateless_compute_catalog_names(data, **kwargs):
     return _request_scan_monitor(PKDict(method="catalog_names", data=data))
 
@@ -10,6 +10,7 @@ from pykern import pkjinja
 from pykern.pkcollections import PKDict
 from pykern.pkdebug import pkdc, pkdlog, pkdp, pkdexc
 from sirepo.template import code_variable
+import base64
 import math
 import os
 import re
@@ -59,6 +60,15 @@ _HISTOGRAM_BINS_MAX = 500
 #: for JobCmdFile replies
 _TEXT_SUFFIXES = (".py", ".txt", ".csv")
 
+#: numpy dtype for typedArray (see `encode_typed_arrays`)
+_TYPED_ARRAYS = PKDict(float32="<f4", float64="<f8")
+
+#: reply fields which may be typed arrays; only intensities lose precision
+_TYPED_ARRAY_FIELDS = PKDict(points="float64", z_matrix="float32")
+
+#: smaller arrays are not worth encoding
+_TYPED_ARRAY_MIN_SIZE = 1000
+
 
 class JobCmdFile(PKDict):
     """Returned by dispatched job commands
@@ -397,28 +407,93 @@ def write_dict_to_h5(d, file_path, h5_path=None):
         <h5_path>/b/c -> C
         <h5_path>/b/d -> D
 
+    numpy arrays are stored as a single typed dataset. The file is
+    opened once for the whole dict.
+
     h5_to_dict() performs the reverse process
     """
     import h5py
 
-    if h5_path is None:
-        h5_path = ""
-    try:
-        for i in range(len(d)):
-            p = f"{h5_path}/{i}"
-            try:
-                with h5py.File(file_path, "a") as f:
-                    f.create_dataset(p, data=d[i])
-            except TypeError:
-                write_dict_to_h5(d[i], file_path, h5_path=p)
-    except KeyError:
-        for k in d:
-            p = f"{h5_path}/{k}"
-            try:
-                with h5py.File(file_path, "a") as f:
-                    f.create_dataset(p, data=d[k])
-            except TypeError:
-                write_dict_to_h5(d[k], file_path, h5_path=p)
+    def _dataset(f, value, path):
+        try:
+            f.create_dataset(path, data=value)
+        except TypeError:
+            _write(f, value, path)
+
+    def _write(f, d, h5_path):
+        try:
+            for i in range(len(d)):
+                _dataset(f, d[i], f"{h5_path}/{i}")
+        except KeyError:
+            for k in d:
+                _dataset(f, d[k], f"{h5_path}/{k}")
+
+    with h5py.File(file_path, "a") as f:
+        _write(f, d, "" if h5_path is None else h5_path)
+
+
+def decode_typed_arrays(reply):
+    """Replace typed arrays in `reply` with lists
+
+    Inverse of `encode_typed_arrays`. ``data`` may be base64 (json)
+    or bytes (websocket).
+
+    Args:
+        reply (PKDict): frame reply (modified)
+    Returns:
+        PKDict: reply
+    """
+    import numpy
+
+    for k, v in reply.items():
+        if not (isinstance(v, dict) and "typedArray" in v):
+            continue
+        b = v.data
+        if isinstance(b, str):
+            b = base64.b64decode(b)
+        reply[k] = (
+            numpy.frombuffer(b, dtype=_TYPED_ARRAYS[v.typedArray])
+            .reshape(v.shape)
+            .tolist()
+        )
+    return reply
+
+
+def encode_typed_arrays(reply, fields=_TYPED_ARRAY_FIELDS):
+    """Replace large float arrays in `reply` with typed arrays
+
+    A heatmap or intensity plot is mostly floats which are expensive to
+    convert to and from text at each hop. `fields` which
+    are rectangular and at least `_TYPED_ARRAY_MIN_SIZE` elements are
+    replaced by ``PKDict(typedArray, shape, data)`` where data is the
+    base64 of little-endian values of the field's type. Values which
+    are plotted as colors (z_matrix) are float32, which is precise to
+    about seven digits. Coordinates (points) remain float64.
+
+    Args:
+        reply (PKDict): frame or sequential result (modified)
+        fields (dict): keys which may be encoded to their `_TYPED_ARRAYS` name [_TYPED_ARRAY_FIELDS]
+    Returns:
+        PKDict: reply
+    """
+    import numpy
+
+    for k, t in fields.items():
+        if (v := reply.get(k)) is None:
+            continue
+        try:
+            a = numpy.asarray(v)
+        except ValueError:
+            # ragged
+            continue
+        if a.dtype.kind != "f" or a.size < _TYPED_ARRAY_MIN_SIZE:
+            continue
+        reply[k] = PKDict(
+            data=base64.b64encode(a.astype(_TYPED_ARRAYS[t]).tobytes()).decode(),
+            shape=list(a.shape),
+            typedArray=t,
+        )
+    return reply
 
 
 def enum_text(schema, name, value):
@@ -705,6 +780,11 @@ async def sim_frame(frame_id, op, qcall):
             e,
             pkdexc(),
         )
+    if qcall.sreq.websocket_handler():
+        # msgpack sends bytes without base64
+        for v in x.values():
+            if isinstance(v, dict) and "typedArray" in v:
+                v.data = base64.b64decode(v.data)
     r = qcall.reply_dict(x)
     if "error" not in x and s.want_browser_frame_cache(s.frameReport):
         return qcall.headers_for_cache(r)
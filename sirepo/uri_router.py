@@ -12,16 +12,22 @@ from pykern.pkdebug import pkdc, pkdexc, pkdlog, pkdp, pkdformat
 import asyncio
 import importlib
 import inspect
+import os
 import re
+import signal
 import sirepo.api_auth
+import sirepo.async_io
 import sirepo.auth
 import sirepo.const
 import sirepo.events
 import sirepo.feature_config
 import sirepo.http_util
+import sirepo.metrics
 import sirepo.spa_session
 import sirepo.uri
 import sirepo.util
+import sys
+import time
 
 #: prefix for api functions
 _FUNC_PREFIX = "api_"
@@ -56,6 +62,9 @@ _api_modules = []
 #: functions which implement APIs
 _api_funcs = PKDict()
 
+#: forwarded to workers by `_fork_workers`
+_WORKER_SIGNALS = (signal.SIGINT, signal.SIGTERM)
+
 _BUCKET_KEY = "uri_route"
 
 
@@ -147,9 +156,22 @@ def register_api_module(module):
             _api_funcs[n] = _Route(func=o, cls=c, func_name=n)
 
 
-def start_tornado(ip, port, debug, is_primary=True):
-    """Start tornado server, does not return"""
-    from tornado import httpserver, ioloop, web, log, websocket
+def start_tornado(ip, port, debug, is_primary=True, processes=1):
+    """Start tornado server, does not return
+
+    With more than one process, the port is bound and the database
+    initialized before forking. The parent process restarts workers
+    which exit abnormally and forwards SIGINT and SIGTERM to them. Only
+    the first worker of the primary server runs cron tasks.
+
+    Args:
+        ip (str): address to listen on
+        port (int): port to listen on
+        debug (bool): tornado debug mode (requires one process)
+        is_primary (bool): run cron tasks [True]
+        processes (int): number of workers sharing the port [1]
+    """
+    from tornado import httpserver, ioloop, netutil, web, log, websocket
 
     ws_count = 0
 
@@ -196,6 +218,9 @@ def start_tornado(ip, port, debug, is_primary=True):
             asyncio.ensure_future(self.__on_message(msg))
 
         def on_close(self):
+            for t in self.__tasks.values():
+                t.cancel()
+            self.__tasks = PKDict()
             self.sr_log(
                 None,
                 "close",
@@ -215,8 +240,29 @@ def start_tornado(ip, port, debug, is_primary=True):
             self.http_server_uri = f"{r.protocol}://{r.host}/"
             self.remote_addr = sirepo.http_util.remote_ip(r)
             self.ws_id = ws_count
+            self.__tasks = PKDict()
             self.sr_log(None, "open", fmt=" ip={}", args=[_remote_peer(r)])
 
+        def sr_create_task(self, name, coro):
+            """Run `coro` until it completes or the socket closes
+
+            A task with the same `name` is canceled so clients
+            can replace a subscription by repeating the request.
+
+            Args:
+                name (str): unique to this connection
+                coro (coroutine): sends messages with `sirepo.reply.websocket_async_msg`
+            """
+
+            def _done(task):
+                if self.__tasks.get(name) is task:
+                    del self.__tasks[name]
+
+            if t := self.__tasks.pkdel(name):
+                t.cancel()
+            t = self.__tasks[name] = asyncio.ensure_future(coro)
+            t.add_done_callback(_done)
+
         def sr_get_log_user(self):
             """Needed for initial websocket creation call"""
             return ""
@@ -321,6 +367,8 @@ def start_tornado(ip, port, debug, is_primary=True):
 
         l = ioloop.IOLoop.current()
         cron.CronTask.init_class(l if is_primary else None)
+        sirepo.async_io.start_loop_lag_monitor()
+        sirepo.metrics.start_logging()
         l.start()
 
     def _log(handler, which="end", fmt="", args=None):
@@ -357,7 +405,14 @@ def start_tornado(ip, port, debug, is_primary=True):
                 p = c.stream.socket.getpeername()[1]
         return f"{sirepo.http_util.remote_ip(request)}:{p}"
 
+    if processes != 1 and debug:
+        raise AssertionError(f"debug not supported with processes={processes}")
     sirepo.modules.import_and_init("sirepo.server").init_tornado()
+    k = netutil.bind_sockets(port=port, address=ip)
+    if processes != 1:
+        i = _fork_workers(processes)
+        pkdlog("worker={} ip={} port={}", i, ip, port)
+        is_primary = is_primary and i == 0
     s = httpserver.HTTPServer(
         web.Application(
             [
@@ -372,7 +427,8 @@ def start_tornado(ip, port, debug, is_primary=True):
         ),
         xheaders=True,
         max_buffer_size=sirepo.job.cfg().max_message_bytes,
-    ).listen(port=port, address=ip)
+    )
+    s.add_sockets(k)
     log.enable_pretty_logging()
     _cron_and_start()
 
@@ -493,6 +549,56 @@ def _check_route(qcall, route):
     sirepo.api_auth.check_api_call(qcall, route.func)
 
 
+def _fork_workers(count):
+    """Fork `count` workers and restart them until signaled
+
+    Similar to `tornado.process.fork_processes`, which does not stop
+    its children when the parent is terminated.
+
+    Args:
+        count (int): number of workers
+    Returns:
+        int: worker index (only returns in worker)
+    """
+    c = PKDict()
+    stop = False
+
+    def _signal(sig, frame):
+        nonlocal stop
+
+        stop = True
+        for p in list(c.keys()):
+            try:
+                os.kill(p, sig)
+            except ProcessLookupError:
+                pass
+
+    def _start(index):
+        p = os.fork()
+        if p == 0:
+            for x in _WORKER_SIGNALS:
+                signal.signal(x, signal.SIG_DFL)
+            return index
+        c[p] = index
+        return None
+
+    for x in _WORKER_SIGNALS:
+        signal.signal(x, _signal)
+    for i in range(count):
+        if (rv := _start(i)) is not None:
+            return rv
+    while c:
+        p, x = os.wait()
+        if (i := c.pkdel(p)) is None or stop:
+            continue
+        pkdlog("worker={} pid={} status={} restarting", i, p, x)
+        # avoid a tight loop if workers fail at startup
+        time.sleep(1)
+        if (rv := _start(i)) is not None:
+            return rv
+    sys.exit(0)
+
+
 def _init_uris(simulation_db, sim_types):
     global _route_default, _not_found_route, _api_to_route, _uri_to_route
 
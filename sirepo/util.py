@@ -11,12 +11,12 @@ from pykern.pkcollections import PKDict
 from pykern.pkdebug import pkdlog, pkdp, pkdexc, pkdc
 import asyncio
 import base64
+import collections
 import hashlib
 import importlib
 import io
 import inspect
 import numconv
-import numpy
 import os.path
 import pykern.pkinspect
 import pykern.pkio
@@ -24,6 +24,7 @@ import pykern.pkjson
 import re
 import random
 import sirepo.const
+import threading
 import unicodedata
 import zipfile
 
@@ -243,6 +244,66 @@ class WWWAuthenticate(ReplyExc):
     pass
 
 
+class LRU:
+    """Mapping bounded by count which discards least recently used
+
+    Thread safe so may be used by functions run in `sirepo.async_io`.
+
+    Args:
+        max_entries (int): positive number of values to keep
+    """
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._values = collections.OrderedDict()
+
+    def __contains__(self, key):
+        return key in self._values
+
+    def __len__(self):
+        return len(self._values)
+
+    def clear(self):
+        with self._lock:
+            self._values.clear()
+
+    def get(self, key, default=None):
+        """Value for `key` which is marked as most recently used
+
+        Args:
+            key (hashable): lookup
+            default (object): returned if not found [None]
+        Returns:
+            object: value or `default`
+        """
+        with self._lock:
+            if key not in self._values:
+                return default
+            self._values.move_to_end(key)
+            return self._values[key]
+
+    def pop(self, key, default=None):
+        with self._lock:
+            return self._values.pop(key, default)
+
+    def set(self, key, value):
+        """Add or replace `key`, discarding the least recently used
+
+        Args:
+            key (hashable): lookup
+            value (object): to save
+        Returns:
+            object: value
+        """
+        with self._lock:
+            self._values[key] = value
+            self._values.move_to_end(key)
+            while len(self._values) > self.max_entries:
+                self._values.popitem(last=False)
+        return value
+
+
 def assert_sim_type(sim_type):
     """Validate simulation type
 
@@ -446,13 +507,18 @@ def numpy_to_py(obj):
     Returns:
         object: no numpy.floating objects
     """
-    if isinstance(obj, numpy.floating):
-        return float(obj)
-    if isinstance(obj, (list, tuple)):
-        return type(obj)(numpy_to_py(o) for o in obj)
-    if isinstance(obj, dict):
-        return type(obj)({k: numpy_to_py(v) for k, v in obj.items()})
-    return obj
+    import numpy
+
+    def _convert(obj):
+        if isinstance(obj, numpy.floating):
+            return float(obj)
+        if isinstance(obj, (list, tuple)):
+            return type(obj)(_convert(o) for o in obj)
+        if isinstance(obj, dict):
+            return type(obj)({k: _convert(v) for k, v in obj.items()})
+        return obj
+
+    return _convert(obj)
 
 
 def plan_role_expiration(role):
@@ -0,0 +1,45 @@
+"""test blocking calls run off the event loop
+
+:copyright: Copyright (c) 2026 RadiaSoft LLC.  All Rights Reserved.
+:license: http://www.apache.org/licenses/LICENSE-2.0.html
+"""
+
+
+def setup_module(module):
+    import os
+
+    os.environ.update(
+        SIREPO_ASYNC_IO_LOOP_LAG_SECS="0.05",
+    )
+
+
+def test_run():
+    from pykern import pkunit
+    from sirepo import async_io
+    import asyncio
+    import sirepo.metrics
+    import threading
+    import time
+
+    def _block(secs):
+        time.sleep(secs)
+        return threading.get_ident()
+
+    def _raise():
+        raise KeyError("x")
+
+    async def _main():
+        async_io.start_loop_lag_monitor()
+        t = time.monotonic()
+        r = await asyncio.gather(*(async_io.run(_block, 0.3) for _ in range(4)))
+        pkunit.pkok(time.monotonic() - t < 1.0, "calls not concurrent")
+        pkunit.pkok(threading.get_ident() not in r, "ran on event loop thread")
+        with pkunit.pkexcept(KeyError):
+            await async_io.run(_raise)
+        # loop stays responsive while threads block
+        await asyncio.sleep(0.2)
+        m = sirepo.metrics.values()["event_loop.lag"]
+        pkunit.pkok(m.count > 0, "no lag measured metric={}", m)
+        pkunit.pkok(m.maxSecs < 0.2, "lag too large metric={}", m)
+
+    asyncio.run(_main())
@@ -0,0 +1,56 @@
+"""test UserRole caches roles per process
+
+:copyright: Copyright (c) 2026 RadiaSoft LLC.  All Rights Reserved.
+:license: http://www.apache.org/licenses/LICENSE-2.0.html
+"""
+
+
+def setup_module(module):
+    from sirepo import srunit
+    import os
+
+    srunit.setup_srdb_root()
+    os.environ.update(
+        SIREPO_AUTH_METHODS="email",
+    )
+    # init db
+    with srunit.quest_start():
+        pass
+
+
+def test_role_cache():
+    from pykern import pkunit
+    from sirepo import auth_db, srunit
+    from sirepo.pkcli import admin
+    import sirepo.metrics
+    import sqlite3
+
+    def _has(role):
+        with srunit.quest_start() as qcall:
+            return qcall.auth_db.model("UserRole").has_active_role(role, u)
+
+    def _hits():
+        return sirepo.metrics.values().get("role_cache.hit", 0)
+
+    u = admin.create_user("a@a.a", "a")
+    pkunit.pkok(not _has("adm"), "adm role before add")
+    h = _hits()
+    pkunit.pkok(not _has("adm"), "adm role before add")
+    pkunit.pkeq(h + 1, _hits())
+    with srunit.quest_start() as qcall:
+        m = qcall.auth_db.model("UserRole")
+        m.add_roles(["adm"], u)
+        pkunit.pkok(m.has_active_role("adm", u), "uncommitted role not visible")
+    pkunit.pkok(_has("adm"), "committed role not visible")
+    # rolled back roles are not cached
+    with pkunit.pkexcept("rollback"):
+        with srunit.quest_start() as qcall:
+            m = qcall.auth_db.model("UserRole")
+            m.delete_roles(["adm"], u)
+            pkunit.pkok(not m.has_active_role("adm", u), "deleted role visible")
+            raise RuntimeError("rollback")
+    pkunit.pkok(_has("adm"), "rolled back delete")
+    # another process changes the database
+    with sqlite3.connect(str(auth_db.db_filename())) as c:
+        c.execute("DELETE FROM user_role_t WHERE uid = ? AND role = 'adm'", (u,))
+    pkunit.pkok(not _has("adm"), "change by other process not visible")
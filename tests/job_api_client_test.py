@@ -0,0 +1,90 @@
+"""test pooled client of the supervisor in job_api
+
+:copyright: Copyright (c) 2026 RadiaSoft LLC.  All Rights Reserved.
+:license: http://www.apache.org/licenses/LICENSE-2.0.html
+"""
+
+import os
+
+os.environ.update(SIREPO_JOB_MAX_MESSAGE_BYTES="1000")
+
+
+def test_post():
+    from aiohttp import web
+    from pykern import pkunit
+    from pykern.pkcollections import PKDict
+    from sirepo import job_api
+    import asyncio
+
+    async def _chunked(request):
+        r = web.StreamResponse(headers={"Content-type": "application/json"})
+        r.enable_chunked_encoding()
+        await r.prepare(request)
+        await r.write(b'["' + b"x" * 2000 + b'"]')
+        await r.write_eof()
+        return r
+
+    async def _ok(request):
+        return web.json_response(
+            PKDict(peer=request.transport.get_extra_info("peername"))
+        )
+
+    async def _slow(request):
+        await asyncio.sleep(5)
+        return web.json_response(PKDict())
+
+    async def _test():
+        a = web.Application()
+        a.router.add_post("/chunked", _chunked)
+        a.router.add_post("/ok", _ok)
+        a.router.add_post("/slow", _slow)
+        r = web.AppRunner(a)
+        await r.setup()
+        s = web.TCPSite(r, "127.0.0.1", 0)
+        await s.start()
+        u = "http://127.0.0.1:{}/".format(s._server.sockets[0].getsockname()[1])
+        try:
+            x = [
+                await job_api._post(
+                    PKDict(api="test", content=PKDict(), timeout=0, uri=u + "ok")
+                )
+                for _ in range(2)
+            ]
+            # keep-alive connection is reused
+            pkunit.pkeq(x[0].peer, x[1].peer)
+            # long polls do not use the connections of other requests
+            y = await job_api._post(
+                PKDict(
+                    api="test",
+                    content=PKDict(),
+                    is_wait=True,
+                    timeout=0,
+                    uri=u + "ok",
+                )
+            )
+            pkunit.pkne(x[1].peer, y.peer)
+            pkunit.pkok(
+                job_api._sessions.wait is not job_api._sessions.request,
+                "wait and request share a session",
+            )
+            with pkunit.pkexcept("exceeds max=1000"):
+                await job_api._post(
+                    PKDict(api="test", content=PKDict(), timeout=0, uri=u + "chunked")
+                )
+            try:
+                await job_api._post(
+                    PKDict(api="test", content=PKDict(), timeout=0.1, uri=u + "slow")
+                )
+                pkunit.pkfail("expected timeout")
+            except job_api._HTTP_CLIENT_CONNECTION_ERRORS:
+                pass
+            return job_api._sessions.request
+        finally:
+            await r.cleanup()
+
+    s = asyncio.run(_test())
+    pkunit.pkok(not s.closed, "session={} closed with its loop", s)
+    t = asyncio.run(_test())
+    pkunit.pkok(s is not t, "session not recreated for new loop")
+    pkunit.pkok(s.closed, "old session={} not closed", s)
+    asyncio.run(t.close())
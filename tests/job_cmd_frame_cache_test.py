@@ -0,0 +1,57 @@
+"""test job_cmd caches simulation frames
+
+:copyright: Copyright (c) 2026 RadiaSoft LLC.  All Rights Reserved.
+:license: http://www.apache.org/licenses/LICENSE-2.0.html
+"""
+
+
+def test_frame_cache():
+    from pykern import pkunit
+    from pykern.pkcollections import PKDict
+    from sirepo.pkcli import job_cmd
+    import os
+
+    def _msg(serial, frame_index=0):
+        return PKDict(
+            data=PKDict(computeJobSerial=serial, frameIndex=frame_index),
+            jobCmd="get_simulation_frame",
+            runDir=str(d),
+        )
+
+    r = PKDict(state="completed", x=1)
+    b = b"x" * 10
+    with pkunit.save_chdir_work() as d:
+        f = d.join("out.dat")
+        f.write("a")
+        c = job_cmd._FrameCache(100)
+        pkunit.pkeq(None, c.get(c.key(_msg(1))))
+        c.set(c.key(_msg(1)), r, b)
+        pkunit.pkeq(b, c.get(c.key(_msg(1))))
+        pkunit.pkeq(None, c.get(c.key(_msg(1, frame_index=1))))
+        # errors are not cached
+        c.set(c.key(_msg(1, frame_index=1)), PKDict(state="error", error="x"), b)
+        pkunit.pkeq(None, c.get(c.key(_msg(1, frame_index=1))))
+        # output changed
+        s = os.stat(f)
+        os.utime(f, ns=(s.st_atime_ns, s.st_mtime_ns + 1000))
+        pkunit.pkeq(None, c.get(c.key(_msg(1))))
+        c.set(c.key(_msg(1)), r, b)
+        pkunit.pkeq(b, c.get(c.key(_msg(1))))
+        # subdirectories are not output
+        d.join("sub", "in.dat").write("b", ensure=True)
+        pkunit.pkeq(None, c.get(c.key(_msg(1))))
+        c.set(c.key(_msg(1)), r, b)
+        d.join("sub", "in.dat").write("c")
+        pkunit.pkeq(b, c.get(c.key(_msg(1))))
+        # new run invalidates the run dir
+        c.key(_msg(2))
+        pkunit.pkeq(0, c._bytes)
+        # too large
+        c.set(c.key(_msg(2)), r, b * 3)
+        pkunit.pkeq(None, c.get(c.key(_msg(2))))
+        # evicts least recently used
+        for i in range(6):
+            c.set(c.key(_msg(2, frame_index=i)), r, b * 2)
+        pkunit.pkeq(None, c.get(c.key(_msg(2, frame_index=0))))
+        pkunit.pkeq(b * 2, c.get(c.key(_msg(2, frame_index=5))))
+        pkunit.pkok(c._bytes <= 100, "over budget bytes={}", c._bytes)
@@ -0,0 +1,139 @@
+"""test docker containers created ahead of time (standby)
+
+:copyright: Copyright (c) 2026 RadiaSoft LLC.  All Rights Reserved.
+:license: http://www.apache.org/licenses/LICENSE-2.0.html
+"""
+
+
+def test_standby():
+    from pykern import pkunit
+    from pykern.pkcollections import PKDict
+    from sirepo import job
+    from sirepo.job_driver import docker
+    import asyncio
+    import sirepo.job_driver
+    import sirepo.job_scheduler
+    import sirepo.job_supervisor
+    import sirepo.metrics
+    import tornado.locks
+
+    class _DockerCmd(PKDict):
+        async def start(self):
+            c = self.cmd
+            cmds.append(c)
+            if c[0] == "create":
+                return f"cid{len(cmds)}", None
+            if c[0] == "rename" and c[1] in fail_rename:
+                return "", "non-zero exit=1"
+            return "", None
+
+    def _driver(kind, uid):
+        return docker.DockerDriver(
+            PKDict(kind=kind, msg=PKDict(uid=uid, userDir=str(d.join(uid)))),
+            h,
+        )
+
+    def _host():
+        return PKDict(
+            cmd_prefix=("docker",),
+            kinds=PKDict(
+                {
+                    k: PKDict(
+                        cpu_slot_q=sirepo.job_scheduler.SlotQueue(1),
+                        create_prefix=("create",),
+                        instances=[],
+                        standby=PKDict(),
+                    )
+                    for k in job.KINDS
+                }
+            ),
+            name="localhost",
+            standby_pruned=tornado.locks.Event(),
+        )
+
+    def _hits():
+        v = sirepo.metrics.values()
+        return v.get("docker.standby.hit", 0), v.get("docker.standby.miss", 0)
+
+    def _names(verb):
+        return [
+            x.split("=", 1)[1]
+            for c in cmds
+            if c[0] == verb
+            for x in c
+            if x.startswith("--name=")
+        ]
+
+    async def _test():
+        a = _driver(job.SEQUENTIAL, "a")
+        a._standby_create_others()
+        s = h.kinds.parallel.standby
+        pkunit.pkeq(["a"], list(s.keys()))
+        # not created until the host is pruned
+        await asyncio.sleep(0)
+        pkunit.pkeq([], cmds)
+        h.standby_pruned.set()
+        await s.a.task
+        n = _names("create")
+        pkunit.pkeq(1, len(n))
+        # not the driver's name so it cannot conflict with its create
+        pkunit.pkne(docker._cname(job.PARALLEL, "a"), n[0])
+        # at most standby_per_host per host and kind
+        b = _driver(job.SEQUENTIAL, "b")
+        b._standby_create_others()
+        pkunit.pkeq(["a"], list(s.keys()))
+        # claimed and renamed to the driver's name
+        p = _driver(job.PARALLEL, "a")
+        pkunit.pkeq(s.a.task.result(), await p._standby_claim())
+        pkunit.pkeq(("rename", n[0], p._cname), cmds[-1])
+        pkunit.pkeq((1, 0), _hits())
+        # no standby for b's parallel driver
+        pkunit.pkeq(None, await _driver(job.PARALLEL, "b")._standby_claim())
+        pkunit.pkeq((1, 1), _hits())
+        # standby which no longer exists falls back to create
+        c = _driver(job.SEQUENTIAL, "c")
+        c._standby_create_others()
+        await s.c.task
+        fail_rename.add(s.c.cname)
+        x = s.c.cname
+        p = _driver(job.PARALLEL, "c")
+        await p._do_agent_start(PKDict())
+        pkunit.pkeq((1, 2), _hits())
+        pkunit.pkeq(p._cname, _names("create")[-1])
+        await asyncio.sleep(0)
+        pkunit.pkeq(
+            [("rm", "--force", x), ("start", "--interactive", p._cid)],
+            sorted(cmds[-2:]),
+        )
+        # removed when the user's last driver is freed
+        e = _driver(job.SEQUENTIAL, "e")
+        e._standby_create_others()
+        x = s.e.cname
+        pkunit.pkok(await e.free_resources(caller="test"), "not freed")
+        pkunit.pkok("e" not in s, "standby not unregistered standby={}", s)
+        for _ in range(3):
+            await asyncio.sleep(0)
+        pkunit.pkeq(("rm", "--force", x), cmds[-1])
+        # no standby, no misses when disabled
+        docker.DockerDriver.cfg.standby_per_host = 0
+        f = _driver(job.SEQUENTIAL, "f")
+        f._standby_create_others()
+        pkunit.pkok("f" not in s, "standby created when disabled standby={}", s)
+        pkunit.pkeq(None, await _driver(job.PARALLEL, "f")._standby_claim())
+        pkunit.pkeq((1, 2), _hits())
+
+    cmds = []
+    fail_rename = set()
+    sirepo.job_driver.init_module(job_supervisor=sirepo.job_supervisor)
+    docker._DockerCmd = _DockerCmd
+    docker.DockerDriver.cfg = PKDict(
+        load_report_secs=0,
+        mpich_shm_clean_up=False,
+        no_hdf5_do_mpi_file_sync=False,
+        standby_per_host=1,
+        supervisor_uri=job.DEFAULT_SUPERVISOR_URI_DECL[0],
+    )
+    docker.DockerDriver._image = "radiasoft/sirepo:test"
+    with pkunit.save_chdir_work() as d:
+        h = _host()
+        asyncio.run(_test())
@@ -0,0 +1,68 @@
+"""test idle agents are parked for reuse and garbage collected safely
+
+:copyright: Copyright (c) 2026 RadiaSoft LLC.  All Rights Reserved.
+:license: http://www.apache.org/licenses/LICENSE-2.0.html
+"""
+
+_IDLE_CHECK_SECS = 4
+
+
+def setup_module(module):
+    import os
+
+    os.environ.update(
+        SIREPO_JOB_DRIVER_IDLE_CHECK_SECS=str(_IDLE_CHECK_SECS),
+        # one agent per slot so parked agents are collected by other users
+        SIREPO_JOB_DRIVER_PARKED_PER_SLOT="0",
+    )
+
+
+def test_gc_during_op(fc):
+    from pykern import pkunit
+
+    def _loop(fc):
+        return [_agent_pid(fc, t) for _ in range(5)]
+
+    t = fc.sr_sim_data().simulationType
+    c = fc.sr_clone()
+    c.sr_login_as_guest(t)
+    c.sr_sim_data()
+    # each user's agent is collected when the other user's starts, which
+    # races with the user's next op
+    fc.sr_thread_start("a", _loop)
+    c.sr_thread_start("b", _loop)
+    r = fc.sr_thread_join()
+    r.update(c.sr_thread_join())
+    pkunit.pkeq(10, len(r.a + r.b))
+
+
+def test_reuse(fc):
+    from pykern import pkunit
+    import time
+
+    t = fc.sr_sim_data().simulationType
+    p = _agent_pid(fc, t)
+    time.sleep(_IDLE_CHECK_SECS / 2)
+    pkunit.pkeq(p, _agent_pid(fc, t))
+    time.sleep(_IDLE_CHECK_SECS / 2)
+    # parked less than idle_check_secs since the last op
+    pkunit.pkeq(p, _agent_pid(fc, t))
+    time.sleep(_IDLE_CHECK_SECS + 2)
+    pkunit.pkne(p, _agent_pid(fc, t))
+
+
+def _agent_pid(fc, sim_type):
+    from pykern import pkunit
+    from pykern.pkcollections import PKDict
+
+    r = fc.sr_post(
+        "statefulCompute",
+        PKDict(
+            method="fastcgi_pid",
+            # clones do not have sr_sim_type
+            simulationType=sim_type,
+            args=PKDict(),
+        ),
+    )
+    pkunit.pkok(r.get("ppid"), "op failed reply={}", r)
+    return r.ppid
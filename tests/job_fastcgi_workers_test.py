@@ -0,0 +1,66 @@
+"""test job_cmd fastcgi workers are recycled and serve msgs concurrently
+
+:copyright: Copyright (c) 2026 RadiaSoft LLC.  All Rights Reserved.
+:license: http://www.apache.org/licenses/LICENSE-2.0.html
+"""
+
+
+def setup_module(module):
+    import os
+
+    os.environ.update(
+        SIREPO_JOB_DRIVER_LOCAL_SLOTS_SEQUENTIAL="2",
+        SIREPO_JOB_FASTCGI_MAX_REQUESTS="2",
+        SIREPO_JOB_FASTCGI_WORKERS="2",
+    )
+
+
+def test_srw_model_list(fc):
+    from pykern.pkcollections import PKDict
+    from pykern import pkunit
+
+    fc.sr_sim_data("Young's Double Slit Experiment")
+    for _ in range(5):
+        r = fc.sr_post(
+            "statefulCompute",
+            PKDict(
+                method="model_list",
+                simulationType=fc.sr_sim_type,
+                args=PKDict(model_name="electronBeam"),
+            ),
+        )
+        pkunit.pkok(
+            isinstance(r.get("modelList"), list), "model_list not in reply={}", r
+        )
+
+
+def test_myapp_recycle_concurrent(fc):
+    from pykern.pkcollections import PKDict
+    from pykern import pkunit
+
+    def _pid(fc, api="statefulCompute", sleep_secs=0):
+        return fc.sr_post(
+            api,
+            PKDict(
+                method="fastcgi_pid",
+                # clones do not have sr_sim_type
+                simulationType=t,
+                args=PKDict(sleep_secs=sleep_secs),
+            ),
+        )
+
+    t = fc.sr_sim_data().simulationType
+    p = [_pid(fc).pid for _ in range(5)]
+    # two workers serving two msgs each
+    pkunit.pkok(len(set(p)) >= 3, "workers not recycled pids={}", p)
+    # msgs of the same jid are serialized by the supervisor
+    fc.sr_thread_start("a", _pid, sleep_secs=3)
+    fc.sr_thread_start("b", _pid, api="statelessCompute", sleep_secs=3)
+    r = fc.sr_thread_join()
+    pkunit.pkne(r.a.pid, r.b.pid)
+    pkunit.pkok(
+        r.a.start < r.b.end and r.b.start < r.a.end,
+        "msgs not served concurrently a={} b={}",
+        r.a,
+        r.b,
+    )
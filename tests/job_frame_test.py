@@ -0,0 +1,37 @@
+"""test length-prefixed job_cmd fastcgi messages
+
+:copyright: Copyright (c) 2026 RadiaSoft LLC.  All Rights Reserved.
+:license: http://www.apache.org/licenses/LICENSE-2.0.html
+"""
+
+
+def test_recv():
+    from pykern import pkunit
+    from pykern.pkcollections import PKDict
+    from sirepo import job_frame
+    import socket
+    import threading
+
+    v = PKDict(a=[1, 2.5, "x" * 100000], b=PKDict(c=None), d=True)
+    for e in job_frame.JSON, job_frame.MSGPACK:
+        s, r = socket.socketpair()
+        # larger than socket buffer so recv is partial
+        t = threading.Thread(target=s.sendall, args=(job_frame.encode(v, e),))
+        t.start()
+        pkunit.pkeq((e, v), job_frame.recv(r, 200000))
+        t.join()
+        s.sendall(job_frame.encode(PKDict(p=pkunit.work_dir()), e))
+        pkunit.pkeq(str(pkunit.work_dir()), job_frame.recv(r, 1000)[1].p)
+        s.sendall(job_frame.encode(v, e))
+        with pkunit.pkexcept("larger than max_bytes"):
+            job_frame.recv(r, 1000)
+        r.close()
+        s.close()
+    s, r = socket.socketpair()
+    s.sendall(job_frame.encode(v)[:50])
+    s.close()
+    with pkunit.pkexcept(job_frame.AbruptCloseError):
+        job_frame.recv(r, 200000)
+    r.close()
+    with pkunit.pkexcept("invalid frame encoding"):
+        job_frame.parse_header(b"x\0\0\0\1", 10)
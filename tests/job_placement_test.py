@@ -0,0 +1,68 @@
+"""test load-aware docker host placement
+
+:copyright: Copyright (c) 2026 RadiaSoft LLC.  All Rights Reserved.
+:license: http://www.apache.org/licenses/LICENSE-2.0.html
+"""
+
+
+def test_choose():
+    from pykern import pkunit
+    from pykern.pkcollections import PKDict
+    from sirepo import job_placement, job_scheduler
+
+    def _host(name, parallel=0, sequential=0):
+        rv = PKDict(
+            name=name,
+            kinds=PKDict(
+                parallel=PKDict(
+                    cpu_slot_q=job_scheduler.SlotQueue(2),
+                    instances=[],
+                    kind_cfg=PKDict(cores=4, gigabytes=4),
+                ),
+                sequential=PKDict(
+                    cpu_slot_q=job_scheduler.SlotQueue(8),
+                    instances=[],
+                    kind_cfg=PKDict(gigabytes=1),
+                ),
+            ),
+        )
+        for k, n in ("parallel", parallel), ("sequential", sequential):
+            for i in range(n):
+                o = PKDict(msg=PKDict(uid=f"{name}{k}{i}"))
+                rv.kinds[k].cpu_slot_q.sr_get_nowait(o)
+                rv.kinds[k].instances.append(PKDict(uid=o.msg.uid))
+        return rv
+
+    h = [_host("a", sequential=2), _host("b", parallel=1), _host("c")]
+    pkunit.pkeq(0, job_placement.utilization(h[2], 0))
+    pkunit.pkeq(1.0, job_placement.utilization(h[1], 0, kind="parallel"))
+    pkunit.pkeq("b", job_placement.choose(h, "parallel", now=0).name)
+    pkunit.pkeq("c", job_placement.choose(h, "sequential", now=0).name)
+    # the old policy counts agents of the kind, not what the host uses
+    pkunit.pkeq("a", job_placement.choose(h, "parallel", policy="count").name)
+    # b's parallel slots are full so the job does not fit
+    h[1].kinds.parallel.cpu_slot_q.sr_get_nowait(PKDict(msg=PKDict(uid="x")))
+    pkunit.pkeq("a", job_placement.choose(h, "parallel", now=0).name)
+    # live load from agents is used until it is stale
+    h[2].load = PKDict(
+        cpus=16, loadavg=15.0, mem_available_gb=30, mem_total_gb=32, time=0
+    )
+    pkunit.pkeq("a", job_placement.choose(h, "sequential", now=10).name)
+    pkunit.pkeq("c", job_placement.choose(h, "sequential", now=1000).name)
+    l = job_placement.live_load()
+    pkunit.pkok(0 < l.mem_available_gb <= l.mem_total_gb, "invalid live_load={}", l)
+
+
+def test_simulate():
+    from pykern import pkunit
+    from sirepo import job_placement
+
+    p = job_placement.simulate("pack", jobs=500)
+    s = job_placement.simulate("spread", jobs=500)
+    pkunit.pkok(
+        p.empty_hosts > s.empty_hosts,
+        "pack empty_hosts={} not more than spread={}",
+        p.empty_hosts,
+        s.empty_hosts,
+    )
+    pkunit.pkeq(p, job_placement.simulate("pack", jobs=500))
@@ -0,0 +1,66 @@
+"""test fair share allocation of CPU slots
+
+:copyright: Copyright (c) 2026 RadiaSoft LLC.  All Rights Reserved.
+:license: http://www.apache.org/licenses/LICENSE-2.0.html
+"""
+
+
+def test_fair_share():
+    from pykern import pkunit
+    from pykern.pkcollections import PKDict
+    from sirepo import job_scheduler
+    import asyncio
+
+    def _op(uid, plan="basic", op_name="run"):
+        return PKDict(msg=PKDict(activePlan=plan, uid=uid), op_name=op_name)
+
+    async def _main():
+        q = job_scheduler.SlotQueue(2)
+        a = _op("a")
+        held = [q.sr_get_nowait(a), q.sr_get_nowait(a)]
+        got = []
+
+        async def _wait(op):
+            got.append((op, await q.sr_get(op)))
+
+        w = [_op("a"), _op("a"), _op("b"), _op("c", op_name="analysis")]
+        t = [asyncio.create_task(_wait(o)) for o in w]
+        await asyncio.sleep(0)
+        # interactive first, then the user holding no slots
+        pkunit.pkeq(1, q.sr_queue_info(w[3]).position)
+        pkunit.pkeq(2, q.sr_queue_info(w[2]).position)
+        pkunit.pkeq(None, q.sr_queue_info(w[3]).estimated_secs)
+        pkunit.pkeq(None, q.sr_queue_info(a))
+        t[0].cancel()
+        q.sr_put(a, held.pop())
+        await asyncio.sleep(0)
+        pkunit.pkeq(w[3], got[0][0])
+        pkunit.pkok(
+            q.sr_queue_info(w[2]).estimated_secs is not None, "no estimate after free"
+        )
+        # user b holds no slots and user a still holds one
+        q.sr_put(w[3], got[0][1])
+        await asyncio.sleep(0)
+        pkunit.pkeq(w[2], got[1][0])
+        q.sr_put(a, held.pop())
+        await asyncio.sleep(0)
+        # canceled waiter did not get a slot
+        pkunit.pkeq([w[3], w[2], w[1]], [x[0] for x in got])
+        await asyncio.gather(*t, return_exceptions=True)
+        # premium share is larger so it is next even though it is later
+        q = job_scheduler.SlotQueue(3)
+        held = [
+            q.sr_get_nowait(_op(u, plan=p))
+            for u, p in (("d", "basic"), ("p", "premium"), ("x", "basic"))
+        ]
+        w = [_op("d"), _op("p", plan="premium")]
+        t = [asyncio.create_task(_wait(o)) for o in w]
+        await asyncio.sleep(0)
+        pkunit.pkeq(1, q.sr_queue_info(w[1]).position)
+        q.sr_put(None, held.pop())
+        await asyncio.sleep(0)
+        pkunit.pkeq(w[1], got[-1][0])
+        t[0].cancel()
+        await asyncio.gather(*t, return_exceptions=True)
+
+    asyncio.run(_main())
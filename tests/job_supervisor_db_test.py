@@ -0,0 +1,69 @@
+"""test job_supervisor_db backends
+
+:copyright: Copyright (c) 2026 RadiaSoft LLC.  All Rights Reserved.
+:license: http://www.apache.org/licenses/LICENSE-2.0.html
+"""
+
+
+def setup_module(module):
+    from sirepo import srunit
+    import os
+
+    srunit.setup_srdb_root()
+    os.environ.update(
+        SIREPO_JOB_SUPERVISOR_DB_BACKEND="sqlite",
+    )
+
+
+def test_sqlite():
+    from pykern import pkunit, pkjson
+    from pykern.pkcollections import PKDict
+    from sirepo import job, job_supervisor_db, srdb
+    import asyncio
+
+    def _db(uid, status, db_update_time):
+        return PKDict(
+            computeJid=f"{uid}-JzccRZNg-heightWeightReport",
+            dbUpdateTime=db_update_time,
+            jobRunMode="sequential",
+            lastUpdateTime=int(db_update_time),
+            status=status,
+            uid=uid,
+        )
+
+    # legacy files are imported on first initialization
+    d = srdb.supervisor_dir()
+    d.ensure(dir=True)
+    x = _db("00000001", job.COMPLETED, 10.0)
+    pkjson.dump_pretty(x, filename=d.join(x.computeJid + ".json"))
+    job_supervisor_db.init_module()
+    pkunit.pkeq(x, job_supervisor_db.load(x.computeJid))
+    pkunit.pkeq(None, job_supervisor_db.load("00000009-JzccRZNg-heightWeightReport"))
+    pkunit.pkok(job_supervisor_db.is_indexed(), "sqlite must be indexed")
+    job_supervisor_db.write(_db("00000002", job.RUNNING, 20.0))
+    job_supervisor_db.write(_db("00000003", job.PENDING, 30.0))
+    job_supervisor_db.write(_db("00000004", job.JOB_RUN_PURGED, 5.0))
+    pkunit.pkeq(
+        ["00000002", "00000003"],
+        sorted(d.uid for d in job_supervisor_db.running_pending()),
+    )
+    pkunit.pkeq(
+        ["00000003"],
+        [d.uid for d in job_supervisor_db.running_pending(uid="00000003")],
+    )
+    # single row update
+    job_supervisor_db.write(_db("00000002", job.COMPLETED, 25.0))
+    pkunit.pkeq(
+        ["00000003"],
+        [d.uid for d in job_supervisor_db.running_pending()],
+    )
+    pkunit.pkeq(
+        PKDict({"00000002": ["00000002-JzccRZNg-heightWeightReport"]}),
+        asyncio.run(
+            job_supervisor_db.purge_candidates(
+                too_old=25.0,
+                exclude_uids=set(["00000003"]),
+                exclude_jids=set([x.computeJid]),
+            ),
+        ),
+    )
@@ -119,6 +119,46 @@ def test_srw_delete(fc):
     pkunit.pkre("not_used_name.zip.*does not exist", pkcompat.from_bytes(r.data))
 
 
+def test_srw_lib_file_index(fc):
+    from pykern import pkjson, pkunit
+    from pykern.pkcollections import PKDict
+    from sirepo import srdb
+
+    def _delete():
+        return fc.sr_post(
+            "deleteLibFile",
+            PKDict(
+                fileType="undulatorTable",
+                filename=f,
+                simulationType=fc.sr_sim_type,
+            ),
+        )
+
+    d = fc.sr_sim_data("NSLS-II CHX beamline (tabulated)")
+    s = d.models.simulation.simulationId
+    f = d.models.tabulatedUndulator.magneticFile
+    p = srdb.root().join("user", fc.sr_uid, fc.sr_sim_type, "sim-index.json")
+    # saving creates and maintains the index
+    fc.sr_post("saveSimulationData", data=d)
+    pkunit.pkok(
+        f in pkjson.load_any(p).simulations[s].libFiles,
+        "file={} not in libFiles sid={} index={}",
+        f,
+        s,
+        p,
+    )
+    pkunit.pkre("in use", _delete().get("error", ""))
+    # missing index is rebuilt
+    p.remove()
+    pkunit.pkre("in use", _delete().get("error", ""))
+    pkunit.pkok(p.exists(), "index not rebuilt path={}", p)
+    # stale entries are not trusted
+    i = pkjson.load_any(p)
+    i.simulations[s].pkupdate(libFiles=[], mtime=0)
+    p.write(pkjson.dump_pretty(i))
+    pkunit.pkre("in use", _delete().get("error", ""))
+
+
 def test_srw_upload(fc):
     from pykern import pkunit, pkcompat
     from pykern.pkcollections import PKDict
@@ -0,0 +1,91 @@
+"""test batched sbatch status queries
+
+:copyright: Copyright (c) 2026 RadiaSoft LLC.  All Rights Reserved.
+:license: http://www.apache.org/licenses/LICENSE-2.0.html
+"""
+
+_SQUEUE = """#!/bin/bash
+echo "$@" >> squeue.log
+cat <<'END'
+101 RUNNING
+102 PENDING
+END
+"""
+
+_SACCT = """#!/bin/bash
+echo "$@" >> sacct.log
+cat <<'END'
+103|COMPLETED
+103.batch|COMPLETED
+104|CANCELLED by 1000
+104.batch|CANCELLED
+104.extern|COMPLETED
+END
+"""
+
+
+def test_sbatch_poller():
+    from pykern import pkio, pkunit
+    from pykern.pkcollections import PKDict
+    from sirepo import job
+    from sirepo.pkcli import job_agent
+    import asyncio
+    import os
+
+    class _Cmd(PKDict):
+        async def _sbatch_poll_query(self, state):
+            self.states.append(state)
+            self._sbatch_status.job_cmd_state = state
+
+    def _cmd(sbatch_id, state, next_request_seconds=15):
+        return _Cmd(
+            _destroying=False,
+            _sbatch_status=PKDict(job_cmd_state=state, sbatch_id=sbatch_id),
+            msg=PKDict(nextRequestSeconds=next_request_seconds),
+            states=[],
+        )
+
+    async def _main(poller, cmds):
+        for c in cmds:
+            poller.add(c)
+        await asyncio.sleep(0.1)
+        for c in cmds:
+            poller.remove(c)
+
+    async def _polls(poller, cmds):
+        poller._cmds = list(cmds)
+        for _ in range(3):
+            await poller._poll()
+        poller._cmds = []
+
+    with pkunit.save_chdir_work() as d:
+        for n, c in ("squeue", _SQUEUE), ("sacct", _SACCT):
+            pkio.write_text(n, c).chmod(0o755)
+        os.environ["PATH"] = f"{d}:{os.environ['PATH']}"
+        pkunit.pkeq(
+            PKDict(
+                {
+                    "101": job.RUNNING,
+                    "102": job.PENDING,
+                    "103": job.COMPLETED,
+                    "104": job.CANCELED,
+                }
+            ),
+            job_agent._SbatchPoller()._sbatch_query(["101", "102", "103", "104"]),
+        )
+        pkunit.pkre("--jobs=103,104 ", pkio.read_text("sacct.log"))
+        p = job_agent._SbatchPoller()
+        c = [_cmd("101", job.RUNNING), _cmd("102", job.PENDING)]
+        asyncio.run(_main(p, c))
+        # one squeue for both jobs
+        pkunit.pkeq(2, len(pkio.read_text("squeue.log").splitlines()))
+        pkunit.pkeq([job.RUNNING], c[0].states)
+        # nothing changed so back off
+        pkunit.pkeq(2 * job_agent._MIN_SBATCH_POLL_SECS, p._secs)
+        # the running interval is the client's nextRequestSeconds
+        asyncio.run(_polls(p, c))
+        pkunit.pkeq(15, p._secs)
+        p = job_agent._SbatchPoller()
+        c = [_cmd("101", job.RUNNING, next_request_seconds=3)]
+        asyncio.run(_main(p, c))
+        pkunit.pkeq(3, p._secs)
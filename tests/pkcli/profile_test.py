@@ -0,0 +1,21 @@
+"""test import time profiling
+
+:copyright: Copyright (c) 2026 RadiaSoft LLC.  All Rights Reserved.
+:license: http://www.apache.org/licenses/LICENSE-2.0.html
+"""
+
+
+def test_imports():
+    from pykern import pkunit
+    from sirepo.pkcli import profile
+
+    r = profile.import_times("server", sim_type="myapp")
+    n = set(m.name for m in r.modules)
+    for x in ("sirepo.server", "sirepo.template.myapp"):
+        pkunit.pkok(x in n, "module={} not imported", x)
+    # only used when a request has an unknown user agent
+    pkunit.pkok("user_agents" not in n, "user_agents imported at startup")
+    pkunit.pkok(r.total_ms > 0, "total_ms={}", r.total_ms)
+    pkunit.pkre("sirepo.server", profile.imports("server", top=1000))
+    with pkunit.pkexcept("must be one of"):
+        profile.import_times("no_such_target")
@@ -0,0 +1,131 @@
+"""test raydata analysis queue and workers
+
+:copyright: Copyright (c) 2026 RadiaSoft LLC.  All Rights Reserved.
+:license: http://www.apache.org/licenses/LICENSE-2.0.html
+"""
+
+import pytest
+
+pytest.importorskip("databroker")
+
+
+def test_queue():
+    from pykern import pkunit
+    from pykern.pkcollections import PKDict
+    from sirepo.raydata import scan_monitor
+    import asyncio
+
+    def _scan(rduid):
+        return PKDict(catalog_name="c", rduid=rduid)
+
+    async def _test():
+        q = scan_monitor._AnalysisQueue()
+        for u in "abcd":
+            q.put(_scan(u))
+        pkunit.pkeq(4, len(q))
+        pkunit.pkeq(1, q.position(_scan("a")))
+        pkunit.pkok(q.move(_scan("c"), first=True), "c not queued")
+        pkunit.pkok(q.move(_scan("a"), first=False), "a not queued")
+        pkunit.pkok(q.remove(_scan("b")), "b not queued")
+        pkunit.pkok(not q.remove(_scan("b")), "b removed twice")
+        pkunit.pkok(not q.move(_scan("x"), first=True), "x moved")
+        pkunit.pkok(_scan("b") not in q, "b still queued")
+        pkunit.pkeq(3, len(q))
+        pkunit.pkeq([1, 2, 3, 0], [q.position(_scan(u)) for u in "cdab"])
+        pkunit.pkeq(["c", "d", "a"], [(await q.get()).rduid for _ in range(3)])
+        pkunit.pkeq(0, len(q))
+        g = asyncio.create_task(q.get())
+        await asyncio.sleep(0)
+        pkunit.pkok(not g.done(), "get returned with empty queue")
+        q.put(_scan("e"))
+        pkunit.pkeq("e", (await asyncio.wait_for(g, 1)).rduid)
+
+    asyncio.run(_test())
+
+
+def test_workers():
+    from pykern import pkio, pkunit
+    from pykern.pkcollections import PKDict
+    from sirepo.raydata import scan_monitor
+    import asyncio
+    import sirepo.raydata.analysis_driver
+
+    class _Driver(PKDict):
+        def get_notebooks(self):
+            return [PKDict(input_f="in.ipynb", output_f="out.ipynb")]
+
+        def get_output_dir(self):
+            return d.join(self.rduid)
+
+        def render_papermill_script(self, input_f, output_f):
+            # subshell so an orphan would outlive the script
+            return pkio.write_text(
+                self.get_output_dir().join("run.sh"),
+                "touch started\n(sleep 1 && touch ../orphan-$(basename $PWD)); true\n",
+            )
+
+    def _cancel(rduid):
+        scan_monitor._RequestHandler._request_cancel_analysis(
+            None, PKDict(catalogName="c", rduid=rduid)
+        )
+
+    def _running():
+        return sorted(
+            w.status().scan.rduid
+            for w in scan_monitor._ANALYSIS_WORKERS
+            if w.status().scan
+        )
+
+    def _scan(rduid):
+        return PKDict(catalog_name="c", rduid=rduid)
+
+    def _set_scan_status(driver, status, analysis_elapsed_time=None):
+        statuses[driver.rduid] = status
+
+    async def _started(rduid):
+        for _ in range(50):
+            if d.join(rduid, "started").exists():
+                return
+            await asyncio.sleep(0.1)
+        pkunit.pkfail("scan={} not started", rduid)
+
+    async def _test():
+        scan_monitor._ANALYSIS_QUEUE = scan_monitor._AnalysisQueue()
+        scan_monitor._ANALYSIS_WORKERS = [
+            scan_monitor._AnalysisWorker(i) for i in range(2)
+        ]
+        t = [asyncio.create_task(w.run()) for w in scan_monitor._ANALYSIS_WORKERS]
+        for u in "abcd":
+            scan_monitor._ANALYSIS_QUEUE.put(_scan(u))
+        await _started("a")
+        await _started("b")
+        # no more than concurrent_analyses
+        pkunit.pkeq(["a", "b"], _running())
+        pkunit.pkeq(2, len(scan_monitor._ANALYSIS_QUEUE))
+        _cancel("c")
+        pkunit.pkeq(1, len(scan_monitor._ANALYSIS_QUEUE))
+        pkunit.pkeq(NONE, statuses.c)
+        _cancel("a")
+        await _started("d")
+        pkunit.pkeq(["b", "d"], _running())
+        # canceled running scan is the same as a canceled queued scan
+        pkunit.pkeq(NONE, statuses.a)
+        for _ in range(30):
+            if "d" in statuses and statuses.d != RUNNING:
+                break
+            await asyncio.sleep(0.1)
+        pkunit.pkeq(COMPLETED, statuses.b)
+        pkunit.pkeq(COMPLETED, statuses.d)
+        pkunit.pkok(not d.join("orphan-a").exists(), "canceled analysis still ran")
+        pkunit.pkok(not d.join("c").exists(), "canceled queued scan ran")
+        for x in t:
+            x.cancel()
+
+    COMPLETED = scan_monitor._AnalysisStatus.COMPLETED
+    NONE = scan_monitor._AnalysisStatus.NONE
+    RUNNING = scan_monitor._AnalysisStatus.RUNNING
+    statuses = PKDict()
+    scan_monitor._Analysis.set_scan_status = _set_scan_status
+    sirepo.raydata.analysis_driver.get = lambda scan: _Driver(scan)
+    with pkunit.save_chdir_work() as d:
+        asyncio.run(_test())
@@ -0,0 +1,82 @@
+"""test sequential results are shared across users
+
+:copyright: Copyright (c) 2026 RadiaSoft LLC.  All Rights Reserved.
+:license: http://www.apache.org/licenses/LICENSE-2.0.html
+"""
+
+
+def setup_module(module):
+    import os
+
+    os.environ.update(
+        SIREPO_RESULT_CACHE_SIM_TYPES="myapp",
+    )
+
+
+def test_shared(fc):
+    from pykern import pkio, pkunit
+    from sirepo import srdb
+
+    m = "heightWeightReport"
+    r = fc.sr_run_sim(fc.sr_sim_data(), m)
+    pkunit.pkeq(1, len(pkio.walk_tree(srdb.result_cache_dir())))
+    pkunit.pkok("resultCacheKey" not in r, "key returned to client reply={}", r)
+    fc.sr_login_as_guest()
+    d = fc.sr_sim_data()
+    pkunit.pkeq(r, fc.sr_run_sim(d, m))
+    # never reached the supervisor
+    pkunit.pkok(
+        not srdb.supervisor_dir()
+        .join(f"{fc.sr_uid}-{d.models.simulation.simulationId}-{m}.json")
+        .exists(),
+        "second user ran the simulation",
+    )
+    # forceRun always runs
+    fc.sr_run_sim(d, m, forceRun=True)
+    pkunit.pkok(
+        srdb.supervisor_dir()
+        .join(f"{fc.sr_uid}-{d.models.simulation.simulationId}-{m}.json")
+        .exists(),
+        "forceRun did not run the simulation",
+    )
+
+
+def test_evict(fc):
+    from pykern import pkio, pkunit
+    from pykern.pkcollections import PKDict
+    from sirepo import result_cache, srdb
+    import os
+    import sirepo.job
+
+    def _put(index):
+        result_cache.put(
+            PKDict(
+                resultCacheKey=f"myapp/{index:064x}",
+                state=sirepo.job.COMPLETED,
+                x="x" * 100,
+            ),
+        )
+        # distinct mtimes for LRU
+        os.utime(result_cache._path(f"myapp/{index:064x}"), (index, index))
+
+    def _count():
+        return len(pkio.walk_tree(srdb.result_cache_dir()))
+
+    pkio.unchecked_remove(srdb.result_cache_dir())
+    result_cache._cfg.max_bytes = 1000
+    result_cache._total = None
+    for i in range(1, 6):
+        _put(i)
+    pkunit.pkeq(5, _count())
+    for i in range(6, 20):
+        _put(i)
+    n = _count()
+    pkunit.pkok(n < 10, "not evicted count={}", n)
+    pkunit.pkok(
+        result_cache._total <= result_cache._cfg.max_bytes,
+        "total={} exceeds max_bytes",
+        result_cache._total,
+    )
+    # the most recently used remain
+    pkunit.pkok(result_cache._path(f"myapp/{19:064x}").exists(), "newest evicted")
+    pkunit.pkok(not result_cache._path(f"myapp/{1:064x}").exists(), "oldest remains")
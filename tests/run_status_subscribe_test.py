@@ -0,0 +1,49 @@
+"""test runStatusSubscribe pushes status over the websocket
+
+:copyright: Copyright (c) 2026 RadiaSoft LLC.  All Rights Reserved.
+:license: http://www.apache.org/licenses/LICENSE-2.0.html
+"""
+
+import os
+import pytest
+
+pytestmark = pytest.mark.skipif(
+    os.getenv("SIREPO_FEATURE_CONFIG_UI_WEBSOCKET", "1") != "1",
+    reason="SIREPO_FEATURE_CONFIG_UI_WEBSOCKET is not enabled",
+)
+
+
+def test_push_until_completed(fc):
+    from pykern import pkunit
+    from pykern.pkcollections import PKDict
+
+    d = fc.sr_sim_data()
+    r = fc.sr_post(
+        "runSimulation",
+        PKDict(
+            forceRun=True,
+            models=d.models,
+            report="activityAnimation",
+            simulationId=d.models.simulation.simulationId,
+            simulationType=d.simulationType,
+        ),
+    )
+    pkunit.pkok(r.state in ("pending", "running"), "did not start reply={}", r)
+    r = fc.sr_post("runStatusSubscribe", r.nextRequest)
+    if r.state == "completed":
+        # Ran faster than the subscription
+        return
+    s = r.pkdel("runStatusSubscription")
+    pkunit.pkok(s and s.id, "no subscription in reply={}", r)
+    for _ in range(30):
+        m = fc.sr_async_msg()
+        pkunit.pkeq(s.id, m.subscriptionId)
+        r.update(m.changed)
+        for k in m.removed:
+            r.pkdel(k)
+        if r.state not in ("pending", "running"):
+            break
+    else:
+        pkunit.pkfail("too many pushes last status={}", r)
+    pkunit.pkeq("completed", r.state)
+    pkunit.pkok("nextRequest" not in r, "stale nextRequest in status={}", r)
@@ -85,6 +85,19 @@ def test_srw_serial_stomp(fc):
     )
 
 
+def test_srw_save_changed_models(fc):
+    from pykern.pkunit import pkexcept, pkok
+
+    d = fc.sr_sim_data("Young's Double Slit Experiment")
+    d.models.simulation.sourceType = "not-a-source"
+    d.changedModels = ["electronBeam"]
+    d = fc.sr_post("saveSimulationData", d)
+    pkok("changedModels" not in d, "changedModels returned={}", d.get("changedModels"))
+    d.changedModels = ["simulation"]
+    with pkexcept("httpException"):
+        fc.sr_post("saveSimulationData", d)
+
+
 def test_user_alert(fc):
     from pykern.pkunit import pkeq
 
@@ -154,3 +154,41 @@ def test_srw_discard_example(fc):
         "incomplete python={}",
         r.data,
     )
+
+
+def test_index(fc):
+    from pykern import pkjson
+    from pykern.pkcollections import PKDict
+    from pykern.pkunit import pkeq, pkok
+    from sirepo import srdb
+    import os
+
+    def _names():
+        return sorted(
+            r.name
+            for r in fc.sr_post(
+                "listSimulations",
+                PKDict(simulationType=fc.sr_sim_type, search=PKDict()),
+            )
+        )
+
+    d = fc.sr_sim_data()
+    n = _names()
+    s = d.models.simulation.simulationId
+    p = srdb.root().join("user", fc.sr_uid, fc.sr_sim_type)
+    pkok(p.join("sim-index.json").exists(), "index not written dir={}", p)
+    # changed outside of save_simulation_json
+    f = p.join(s, "sirepo-data.json")
+    x = pkjson.load_any(f)
+    x.models.simulation.name = "renamed outside"
+    f.write(pkjson.dump_pretty(x))
+    os.utime(f, ns=(0, os.stat(f).st_mtime_ns + 1000))
+    pkeq(
+        sorted(["renamed outside" if i == d.models.simulation.name else i for i in n]),
+        _names(),
+    )
+    fc.sr_post(
+        "deleteSimulation",
+        PKDict(simulationType=fc.sr_sim_type, simulationId=s),
+    )
+    pkok("renamed outside" not in _names(), "deleted sim still listed")
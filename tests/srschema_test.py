@@ -0,0 +1,37 @@
+"""test compiled schema field validation
+
+:copyright: Copyright (c) 2026 RadiaSoft LLC.  All Rights Reserved.
+:license: http://www.apache.org/licenses/LICENSE-2.0.html
+"""
+
+
+def test_validate_fields():
+    from pykern import pkunit
+    from pykern.pkcollections import PKDict
+    from sirepo import simulation_db, srschema
+
+    s = simulation_db.get_schema("srw")
+
+    def _data(**kwargs):
+        return PKDict(
+            models=PKDict(
+                brillianceReport=PKDict(energyDelta=10),
+                simulation=PKDict(sourceType="u"),
+            ).pkupdate(kwargs),
+        )
+
+    srschema.validate_fields(_data(), s)
+    d = _data(simulation=PKDict(sourceType="not-a-source"))
+    with pkunit.pkexcept("not in schema"):
+        srschema.validate_fields(d, s)
+    srschema.validate_fields(d, s, models=["brillianceReport", "noSuchModel"])
+    d = _data(brillianceReport=PKDict(energyDelta="1001"))
+    with pkunit.pkexcept("out of range"):
+        srschema.validate_fields(d, s, models=["brillianceReport"])
+    d.models.brillianceReport.energyDelta = ""
+    srschema.validate_fields(d, s)
+    d.models.brillianceReport.energyDelta = "not-a-number"
+    srschema.validate_fields(d, s)
+    d.models.brillianceReport.energyDelta = 0
+    with pkunit.pkexcept("out of range"):
+        srschema.validate_fields(d, s)
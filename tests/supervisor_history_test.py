@@ -0,0 +1,37 @@
+"""Test job history is bounded in the supervisor db
+
+:copyright: Copyright (c) 2026 RadiaSoft LLC.  All Rights Reserved.
+:license: http://www.apache.org/licenses/LICENSE-2.0.html
+"""
+
+_HISTORY_MAX = 2
+
+
+def setup_module(module):
+    import os
+
+    os.environ.update(
+        SIREPO_JOB_SUPERVISOR_HISTORY_MAX=str(_HISTORY_MAX),
+    )
+
+
+def test_history_max(fc):
+    from pykern import pkjson, pkunit
+    from sirepo import srdb
+
+    m = "heightWeightReport"
+    d = fc.sr_sim_data()
+    for _ in range(_HISTORY_MAX + 3):
+        fc.sr_run_sim(d, m, forceRun=True)
+    r = pkjson.load_any(
+        srdb.supervisor_dir().join(
+            f"{fc.sr_uid}-{d.models.simulation.simulationId}-{m}.json",
+        ),
+    )
+    pkunit.pkeq(_HISTORY_MAX, len(r.history))
+    pkunit.pkok(r.historySummary.count >= 1, "no summary={}", r.historySummary)
+    pkunit.pkok(
+        r.historySummary.statusCounts.get("completed"),
+        "no completed runs in summary={}",
+        r.historySummary,
+    )
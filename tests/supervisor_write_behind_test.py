@@ -0,0 +1,30 @@
+"""Test coalesced supervisor db writes
+
+:copyright: Copyright (c) 2026 RadiaSoft LLC.  All Rights Reserved.
+:license: http://www.apache.org/licenses/LICENSE-2.0.html
+"""
+
+
+def setup_module(module):
+    import os
+
+    os.environ.update(
+        SIREPO_JOB_SUPERVISOR_DB_WRITE_BEHIND_SECS="60",
+    )
+
+
+def test_terminal_state_written(fc):
+    from pykern import pkjson, pkunit
+    from sirepo import srdb
+
+    m = "activityAnimation"
+    d = fc.sr_sim_data()
+    r = fc.sr_run_sim(d, m)
+    pkunit.pkeq("completed", r.state)
+    # flush timer is much longer than the run so completed must be written immediately
+    r = pkjson.load_any(
+        srdb.supervisor_dir().join(
+            f"{fc.sr_uid}-{d.models.simulation.simulationId}-{m}.json",
+        ),
+    )
+    pkunit.pkeq("completed", r.status)
@@ -60,3 +60,63 @@ def test_dict_to_from_h5():
     with h5py.File(_TEST_H5_FILE, "r") as f:
         d = template_common.h5_to_dict(f)
     pkunit.pkeq(_TEST_DICT, d)
+
+
+def test_numpy_to_h5():
+    from pykern import pkunit
+    from pykern.pkcollections import PKDict
+    from sirepo.template import template_common
+    import h5py
+    import numpy
+
+    p = pkunit.work_dir().join("numpy.h5")
+    v = numpy.linspace(0, 1, 3000)
+    template_common.write_dict_to_h5(
+        PKDict(data=[PKDict(vectors=PKDict(magnitudes=v, units="T"))]),
+        p,
+        h5_path="/f",
+    )
+    with h5py.File(p, "r") as f:
+        # one typed dataset, not a dataset per element
+        pkunit.pkeq("float64", str(f["/f/data/0/vectors/magnitudes"].dtype))
+        d = template_common.h5_to_dict(f, path="/f")
+    pkunit.pkeq(v.tolist(), d.data[0].vectors.magnitudes)
+    pkunit.pkeq("T", d.data[0].vectors.units)
+
+
+def test_typed_arrays():
+    from pykern import pkjson
+    from pykern import pkunit
+    from pykern.pkcollections import PKDict
+    from sirepo.template import template_common
+    import numpy
+
+    z = numpy.arange(50 * 40, dtype=float).reshape(50, 40) / 8
+    r = template_common.encode_typed_arrays(
+        PKDict(
+            points=[1.5, 2.5],
+            x_range=[0, 1, 40],
+            z_matrix=z.tolist(),
+        ),
+    )
+    pkunit.pkeq([1.5, 2.5], r.points)
+    pkunit.pkeq("float32", r.z_matrix.typedArray)
+    pkunit.pkeq([50, 40], r.z_matrix.shape)
+    r = template_common.decode_typed_arrays(pkjson.load_any(pkjson.dump_bytes(r)))
+    pkunit.pkeq(z.tolist(), r.z_matrix)
+    # points keep their precision
+    p = (numpy.arange(2000) / 3).tolist()
+    r = template_common.encode_typed_arrays(PKDict(points=p))
+    pkunit.pkeq("float64", r.points.typedArray)
+    r = template_common.decode_typed_arrays(pkjson.load_any(pkjson.dump_bytes(r)))
+    pkunit.pkeq(p, r.points)
+    # ragged and non-numeric are left alone
+    r = PKDict(points=[[1.0] * 1000, [1.0]], z_matrix=[None] * 1000)
+    pkunit.pkeq(r.copy(), template_common.encode_typed_arrays(r))
+    r = template_common.encode_typed_arrays(
+        PKDict(magnitudes=numpy.ones(2000), points=numpy.ones(2000)),
+        fields=PKDict(magnitudes="float32"),
+    )
+    pkunit.pkeq("float32", r.magnitudes.typedArray)
+    pkunit.pkeq([2000], r.magnitudes.shape)
+    pkunit.pkok(isinstance(r.points, numpy.ndarray), "points encoded={}", r.points)
@@ -0,0 +1,31 @@
+"""test typed arrays are only sent to clients which request them
+
+:copyright: Copyright (c) 2026 RadiaSoft LLC.  All Rights Reserved.
+:license: http://www.apache.org/licenses/LICENSE-2.0.html
+"""
+
+import os
+
+
+def setup_module(module):
+    os.environ.update(
+        SIREPO_FEATURE_CONFIG_TYPED_ARRAY_FRAMES="1",
+    )
+
+
+def test_srw(fc):
+    from pykern import pkunit
+    from sirepo.template import template_common
+
+    d = fc.sr_sim_data("Young's Double Slit Experiment")
+    # clients which do not decode typed arrays (e.g. vue) get lists
+    z = fc.sr_run_sim(d, "initialIntensityReport").z_matrix
+    pkunit.pkok(isinstance(z, list), "z_matrix encoded={}", z)
+    # completed so the same result is read again
+    r = fc.sr_run_sim(d, "initialIntensityReport", typedArrays=True)
+    pkunit.pkeq("float32", r.z_matrix.typedArray)
+    pkunit.pkeq([len(z), len(z[0])], r.z_matrix.shape)
+    pkunit.pkeq(
+        len(z) * len(z[0]),
+        len(sum(template_common.decode_typed_arrays(r).z_matrix, [])),
+    )
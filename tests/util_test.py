@@ -56,3 +56,20 @@ def test_import_submodule():
         util.import_submodule("template", "apperr")
     with pkunit.pkexcept("sim_type=appmissing"):
         util.import_submodule("template", "appmissing")
+
+
+def test_lru():
+    from sirepo import util
+    from pykern import pkunit
+
+    c = util.LRU(2)
+    c.set("a", 1)
+    c.set("b", 2)
+    pkunit.pkeq(1, c.get("a"))
+    # "b" is least recently used
+    c.set("c", 3)
+    pkunit.pkok("b" not in c, "b was not evicted")
+    pkunit.pkeq(2, len(c))
+    pkunit.pkeq(None, c.get("b"))
+    pkunit.pkeq(3, c.pop("c"))
+    pkunit.pkeq(1, len(c))